@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class ActivityConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'activity'
+
+    def ready(self):
+        from celery.signals import worker_process_shutdown, worker_shutdown
+        from .recorder import flush_activity
+
+        # Celery workers may exit without running atexit hooks; flush queued entries first.
+        worker_shutdown.connect(lambda **kwargs: flush_activity(), weak=False)
+        worker_process_shutdown.connect(lambda **kwargs: flush_activity(), weak=False)
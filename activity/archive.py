@@ -0,0 +1,198 @@
+"""
+Retention for the activity log.
+
+Months older than settings.ACTIVITY_LOG_RETENTION["RETENTION_DAYS"] are streamed to
+ARCHIVE_DIR as gzip-compressed JSON lines (one file per month, `YYYY-MM.jsonl.gz`) and then
+removed from the database:
+- on PostgreSQL the month's partition is detached, read with a server-side cursor and
+  dropped, so removal is O(1) whatever the month's size (see activity/partitions.py)
+- elsewhere the month is read with a chunked iterator and removed with one ranged DELETE;
+  so are expired rows in PostgreSQL's default partition, which belong to no monthly one
+
+Each archive gets an ActivityArchive row and a sidecar `YYYY-MM.tasks.gz` listing the task
+ids it contains. With ARCHIVE_LOOKUP enabled, `archived_task_logs()` uses those to serve a
+task's archived history without opening unrelated months.
+"""
+import gzip
+import json
+import os
+from datetime import timezone as dt_timezone
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import partitions
+from .models import ActivityArchive, ActivityLog
+
+DEFAULTS = {
+    "RETENTION_DAYS": 180,   # months that ended more than this long ago are archived
+    "ARCHIVE_DIR": None,     # where archives are written; required to archive
+    "PARTITIONS_AHEAD": 2,   # future monthly partitions kept ready (PostgreSQL)
+    "ARCHIVE_LOOKUP": False, # let per-task log queries read archived months
+    "CHUNK_SIZE": 2000,      # rows fetched per round trip while archiving
+}
+
+COLUMNS = ("id", "task_id", "user_id", "action", "details", "timestamp")
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "ACTIVITY_LOG_RETENTION", {})}
+
+
+def retention_cutoff(now=None):
+    """Months ending on or before this instant are expired."""
+    return (now or timezone.now()) - timezone.timedelta(days=get_config()["RETENTION_DAYS"])
+
+
+def expired_months(cutoff):
+    """[(start, end, partition name or None)] for every month that ended by `cutoff`."""
+    if partitions.is_partitioned():
+        months = [(start, end, name) for name, start, end, _ in partitions.partitions() if end <= cutoff]
+        covered = {start for start, _, _ in months}
+        # Rows outside every monthly range sit in the default partition; its expired months
+        # go through the ranged DELETE like a single table.
+        months += [
+            (start, partitions.add_months(start, 1), None)
+            for start in partitions.default_partition_months(partitions.month_start(cutoff))
+            if start not in covered
+        ]
+        return sorted(months, key=lambda month: month[0])
+    months = ActivityLog.objects.filter(timestamp__lt=partitions.month_start(cutoff)).datetimes(
+        "timestamp", "month", tzinfo=dt_timezone.utc
+    )
+    return [(start, partitions.add_months(start, 1), None) for start in months]
+
+
+def _partition_rows(name, chunk_size):
+    # Server-side cursor: the partition is never held in memory at once.
+    with transaction.atomic(), connection.chunked_cursor() as cursor:
+        columns = ", ".join(connection.ops.quote_name(column) for column in COLUMNS)
+        cursor.execute(f"SELECT {columns} FROM {connection.ops.quote_name(name)} ORDER BY \"timestamp\"")
+        while rows := cursor.fetchmany(chunk_size):
+            for row in rows:
+                row = dict(zip(COLUMNS, row))
+                if isinstance(row["details"], str):
+                    row["details"] = json.loads(row["details"])
+                yield row
+
+
+def _table_rows(start, end, chunk_size):
+    rows = ActivityLog.objects.filter(timestamp__gte=start, timestamp__lt=end).order_by("timestamp")
+    yield from rows.values(*COLUMNS).iterator(chunk_size=chunk_size)
+
+
+def _json_default(value):
+    # isoformat() keeps microseconds, which DjangoJSONEncoder would truncate.
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _archive_paths(directory, label):
+    # A month archived again (late rows on the single-table path) gets its own file.
+    for suffix in ["", *(f".{n}" for n in range(1, 1000))]:
+        path = directory / f"{label}{suffix}.jsonl.gz"
+        if not path.exists():
+            return path, directory / f"{label}{suffix}.tasks.gz"
+    raise FileExistsError(f"Too many archives for {label} in {directory}")
+
+
+def write_archive(directory, label, rows):
+    """
+    Write rows to a new `label`.jsonl.gz plus its task index. Returns (path, index path,
+    row count), or None if there were no rows.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path, index_path = _archive_paths(directory, label)
+    count, task_ids = 0, set()
+    # Write under a temporary name so a crash never leaves a truncated archive in place.
+    with gzip.open(f"{path}.tmp", "wt", encoding="utf-8") as archive:
+        for row in rows:
+            archive.write(json.dumps(row, default=_json_default) + "\n")
+            count += 1
+            if row["task_id"]:
+                task_ids.add(str(row["task_id"]))
+    if not count:
+        os.remove(f"{path}.tmp")
+        return None
+    with gzip.open(f"{index_path}.tmp", "wt", encoding="utf-8") as index:
+        index.write("\n".join(sorted(task_ids)))
+    os.replace(f"{index_path}.tmp", index_path)
+    os.replace(f"{path}.tmp", path)
+    return str(path), str(index_path), count
+
+
+def archive_month(start, end, partition=None):
+    """Archive one month and remove it from the database. Returns its ActivityArchive, if any rows."""
+    config = get_config()
+    if partition:
+        if partition in {name for name, *_, attached in partitions.partitions() if attached}:
+            # Detaching first means the parent table isn't locked while the month is streamed.
+            partitions.detach_partition(partition)
+        rows = _partition_rows(partition, config["CHUNK_SIZE"])
+    else:
+        rows = _table_rows(start, end, config["CHUNK_SIZE"])
+    written = write_archive(config["ARCHIVE_DIR"], f"{start:%Y-%m}", rows)
+
+    with transaction.atomic():
+        if partition:
+            partitions.drop_partition(partition)
+        elif written:
+            ActivityLog.objects.filter(timestamp__gte=start, timestamp__lt=end).delete()
+        if not written:
+            return None
+        path, index_path, count = written
+        return ActivityArchive.objects.create(
+            label=f"{start:%Y-%m}", start=start, end=end, path=path, index_path=index_path, rows=count
+        )
+
+
+def archive_expired(now=None, dry_run=False):
+    """Archive every expired month. Returns [(start, end, partition)] that were (or would be) archived."""
+    if not get_config()["ARCHIVE_DIR"]:
+        raise ValueError("ACTIVITY_LOG_RETENTION['ARCHIVE_DIR'] is not set.")
+    months = expired_months(retention_cutoff(now))
+    if not dry_run:
+        for start, end, partition in months:
+            archive_month(start, end, partition)
+    return months
+
+
+@lru_cache(maxsize=64)
+def _archived_task_ids(index_path, mtime):
+    with gzip.open(index_path, "rt", encoding="utf-8") as index:
+        return frozenset(index.read().split())
+
+
+def archived_task_logs(task_id, since=None):
+    """
+    Archived entries for one task, newest month first, as dicts with parsed timestamps.
+    Yielded lazily, so a caller that stops early doesn't open older months. Empty unless
+    ACTIVITY_LOG_RETENTION["ARCHIVE_LOOKUP"] is enabled.
+    """
+    if not get_config()["ARCHIVE_LOOKUP"]:
+        return
+    archives = ActivityArchive.objects.all()
+    if since is not None:
+        # A task has no activity from before it was created.
+        archives = archives.filter(end__gt=since)
+    task_id = str(task_id)
+    for archive in archives:
+        try:
+            task_ids = _archived_task_ids(archive.index_path, os.path.getmtime(archive.index_path))
+        except FileNotFoundError:
+            continue
+        if task_id not in task_ids:
+            continue
+        with gzip.open(archive.path, "rt", encoding="utf-8") as lines:
+            month = [json.loads(line) for line in lines if task_id in line]
+        yield from (
+            {**row, "timestamp": parse_datetime(row["timestamp"])}
+            for row in reversed(month)
+            if row["task_id"] == task_id
+        )
@@ -0,0 +1,24 @@
+from django_filters.rest_framework import CharFilter, FilterSet, IsoDateTimeFilter, UUIDFilter
+
+from .models import ActivityLog
+
+
+class ActivityLogFilter(FilterSet):
+    """
+    Filters for the activity feed.
+    - action: one action or several, comma-separated (?action=created,updated)
+    - task: entries for one task id
+    - since, until: timestamp range, ISO 8601; since is inclusive, until exclusive
+    """
+    action = CharFilter(method='filter_action')
+    task = UUIDFilter(field_name="task_id")
+    since = IsoDateTimeFilter(field_name="timestamp", lookup_expr="gte")
+    until = IsoDateTimeFilter(field_name="timestamp", lookup_expr="lt")
+
+    class Meta:
+        model = ActivityLog
+        fields = ["action", "task", "since", "until"]
+
+    def filter_action(self, queryset, name, value):
+        actions = [a.strip() for a in value.split(",") if a.strip()]
+        return queryset.filter(action__in=actions) if actions else queryset
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from activity import archive, partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Create upcoming activity log partitions, then stream months past the retention "
+        "period to compressed JSONL archives and drop them from the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only list the months that would be archived")
+        parser.add_argument("--now", help="Pretend it is this ISO timestamp (for backfills)")
+
+    def handle(self, *args, **options):
+        now = parse_datetime(options["now"]) if options["now"] else None
+        if options["now"] and now is None:
+            raise CommandError(f"Invalid --now: {options['now']}")
+
+        if partitions.is_partitioned() and not options["dry_run"]:
+            for name in partitions.ensure_partitions(archive.get_config()["PARTITIONS_AHEAD"], now=now):
+                self.stdout.write(f"Created partition {name}")
+
+        try:
+            months = archive.archive_expired(now=now, dry_run=options["dry_run"])
+        except ValueError as error:
+            raise CommandError(str(error))
+        for start, end, partition in months:
+            verb = "Would archive" if options["dry_run"] else "Archived"
+            self.stdout.write(f"{verb} {start:%Y-%m}" + (f" ({partition})" if partition else ""))
+        self.stdout.write(self.style.SUCCESS(f"{len(months)} expired months."))
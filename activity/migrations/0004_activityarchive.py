@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activity', '0003_activitylog_event_timestamp'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(max_length=7)),
+                ('start', models.DateTimeField()),
+                ('end', models.DateTimeField()),
+                ('path', models.CharField(max_length=500)),
+                ('index_path', models.CharField(max_length=500)),
+                ('rows', models.PositiveIntegerField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-start'],
+            },
+        ),
+    ]
@@ -0,0 +1,75 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import migrations
+from django.utils import timezone
+
+# Monthly partitions created ahead of the current month; activity/partitions.py keeps
+# them coming from here on. The partitioning is spelled out rather than imported from
+# that module so later changes to it can't change what this migration does.
+MONTHS_AHEAD = 2
+
+
+def add_months(start, months):
+    index = start.year * 12 + start.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=dt_timezone.utc)
+
+
+def month_start(value):
+    value = value.astimezone(dt_timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def partition_activity_log(apps, schema_editor):
+    """
+    Rebuild activity_activitylog as a table range-partitioned on "timestamp" (one partition
+    per UTC month plus a default one), copying its rows. PostgreSQL requires the partition
+    key in the primary key, so it becomes (id, "timestamp").
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    ActivityLog = apps.get_model("activity", "ActivityLog")
+    Task = apps.get_model("tasks", "Task")
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    qn, execute = schema_editor.quote_name, schema_editor.execute
+
+    table = ActivityLog._meta.db_table
+    new = f"{table}_new"
+    oldest = ActivityLog.objects.order_by("timestamp").values_list("timestamp", flat=True).first()
+
+    execute(f'CREATE TABLE {qn(new)} (LIKE {qn(table)} INCLUDING DEFAULTS) PARTITION BY RANGE ("timestamp")')
+    execute(f'ALTER TABLE {qn(new)} ADD CONSTRAINT {qn(new + "_pkey")} PRIMARY KEY (id, "timestamp")')
+    execute(f"CREATE TABLE {qn(table + '_default')} PARTITION OF {qn(new)} DEFAULT")
+    start = month_start(oldest or timezone.now())
+    last = add_months(month_start(timezone.now()), MONTHS_AHEAD)
+    while start <= last:
+        end = add_months(start, 1)
+        execute(
+            f"CREATE TABLE {qn(f'{table}_p{start:%Y%m}')} PARTITION OF {qn(new)} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        start = end
+    execute(f"INSERT INTO {qn(new)} SELECT * FROM {qn(table)}")
+    execute(f"DROP TABLE {qn(table)}")
+    execute(f"ALTER TABLE {qn(new)} RENAME TO {qn(table)}")
+    execute(f"ALTER TABLE {qn(table)} RENAME CONSTRAINT {qn(new + '_pkey')} TO {qn(table + '_pkey')}")
+    for column, model in (("task_id", Task), ("user_id", User)):
+        execute(
+            f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(f'{table}_{column}_fk')} FOREIGN KEY ({column}) "
+            f"REFERENCES {qn(model._meta.db_table)} ({qn(model._meta.pk.column)}) DEFERRABLE INITIALLY DEFERRED"
+        )
+        execute(f"CREATE INDEX {qn(f'{table}_{column}_idx')} ON {qn(table)} ({column})")
+
+
+class Migration(migrations.Migration):
+    # Copies the existing log into the new partitioned table; on a large table run it in
+    # a maintenance window.
+
+    dependencies = [
+        ('activity', '0004_activityarchive'),
+        ('tasks', '0008_task_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_activity_log, migrations.RunPython.noop),
+    ]
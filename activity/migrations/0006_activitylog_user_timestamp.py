@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activity', '0005_partition_activitylog'),
+        ('tasks', '0008_task_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activitylog',
+            index=models.Index(fields=['user', '-timestamp', '-id'], name='activity_user_ts_idx'),
+        ),
+    ]
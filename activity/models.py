@@ -1,6 +1,7 @@
 import uuid
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from tasks.models import Task
 
 
@@ -10,12 +11,35 @@ class ActivityLog(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     action = models.CharField(max_length=50)  # e.g. created, updated, deleted
     details = models.JSONField(null=True, blank=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the event happens, not when the (possibly buffered) row is written.
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            # The per-user feed: filter on user, page on (timestamp, id) descending.
+            models.Index(fields=['user', '-timestamp', '-id'], name='activity_user_ts_idx'),
+        ]
 
     def __str__(self):
         task_title = self.task.title if self.task else "No Task"
         username = self.user.email if self.user else "No User"
         return f"{username} {self.action} {task_title} at {self.timestamp}"
+
+
+class ActivityArchive(models.Model):
+    """One month of activity log that was moved out of the database (see activity/archive.py)."""
+    label = models.CharField(max_length=7)  # YYYY-MM
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    path = models.CharField(max_length=500)
+    # Task ids present in the archive, so per-task lookups can skip unrelated months.
+    index_path = models.CharField(max_length=500)
+    rows = models.PositiveIntegerField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-start']
+
+    def __str__(self):
+        return f"Activity {self.label} ({self.rows} rows)"
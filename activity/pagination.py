@@ -0,0 +1,72 @@
+from itertools import islice
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class ActivityCursorPagination(CursorPagination):
+    """
+    Keyset pagination for activity entries, newest first.
+    - Walks the (user, -timestamp, -id) index, so page 100 costs the same as page 1
+    """
+    ordering = ('-timestamp', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class ActivityArchivePagination(ActivityCursorPagination):
+    """
+    ActivityCursorPagination over live entries, followed by archived ones.
+    - Archived months are older than anything still in the table, so once the live pages
+      run out, `next` moves on to the archived entries, paged by position with ?archived=
+    - Archived pages only link among themselves: the first one has no `previous`
+    """
+    archived_query_param = 'archived'
+
+    def paginate_queryset(self, queryset, request, view=None, archived=None):
+        """
+        `archived`: the archived entries (newest first) to serve after `queryset`, as an
+        iterable that is only consumed as far as the requested page; None for live entries only.
+        """
+        self.archived_offset = None
+        self.has_archived = False
+        offset = request.query_params.get(self.archived_query_param)
+        if archived is None or offset is None:
+            page = super().paginate_queryset(queryset, request, view)
+            if archived is not None and page is not None and not self.has_next:
+                # Only link to the archive if it has anything for this page to lead to.
+                self.has_archived = next(iter(archived), None) is not None
+            return page
+
+        try:
+            self.archived_offset = int(offset)
+        except ValueError:
+            self.archived_offset = -1
+        if self.archived_offset < 0:
+            raise NotFound(self.invalid_cursor_message)
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        page = list(islice(archived, self.archived_offset, self.archived_offset + self.page_size + 1))
+        self.has_archived = len(page) > self.page_size
+        return page[:self.page_size]
+
+    def _archived_link(self, offset):
+        url = remove_query_param(self.base_url, self.cursor_query_param)
+        return replace_query_param(url, self.archived_query_param, offset)
+
+    def get_next_link(self):
+        if self.archived_offset is not None:
+            return self._archived_link(self.archived_offset + self.page_size) if self.has_archived else None
+        link = super().get_next_link()
+        if link is None and self.has_archived:
+            return self._archived_link(0)
+        return link
+
+    def get_previous_link(self):
+        if self.archived_offset is not None:
+            if self.archived_offset == 0:
+                return None
+            return self._archived_link(max(self.archived_offset - self.page_size, 0))
+        return super().get_previous_link()
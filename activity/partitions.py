@@ -0,0 +1,130 @@
+"""
+Monthly partitions for the activity log (PostgreSQL).
+
+Migration 0005 turns activity_activitylog into a table range-partitioned on "timestamp":
+one partition per calendar month (UTC) named activity_activitylog_pYYYYMM, plus a default
+partition that catches rows outside every range. Partitions are created ahead of time by
+`ensure_partitions()`, and expired months are detached and dropped whole by
+activity/archive.py instead of being deleted row by row. Expired rows in the default
+partition (older than the first monthly partition, or written before ensure_partitions()
+caught up) are archived with a ranged DELETE instead.
+
+On other databases the log stays a single table and `is_partitioned()` is False.
+"""
+import re
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import ActivityLog
+
+TABLE = ActivityLog._meta.db_table
+DEFAULT_PARTITION = f"{TABLE}_default"
+PARTITION_RE = re.compile(rf"^{TABLE}_p(\d{{4}})(\d{{2}})$")
+
+
+def month_start(value):
+    value = value.astimezone(dt_timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def add_months(start, months):
+    index = start.year * 12 + start.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=dt_timezone.utc)
+
+
+def partition_name(start):
+    return f"{TABLE}_p{start:%Y%m}"
+
+
+def _qn(name):
+    return connection.ops.quote_name(name)
+
+
+def _bounds(start):
+    end = add_months(start, 1)
+    return f"FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+
+
+def is_partitioned():
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def partitions():
+    """[(name, start, end, attached)] for every monthly partition table, attached or not."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, EXISTS (SELECT 1 FROM pg_inherits i WHERE i.inhrelid = c.oid) "
+            "FROM pg_class c WHERE c.relkind = 'r' AND c.relname LIKE %s AND pg_table_is_visible(c.oid)",
+            [f"{TABLE}_p%"],
+        )
+        rows = cursor.fetchall()
+    found = []
+    for name, attached in rows:
+        match = PARTITION_RE.match(name)
+        if match:
+            start = datetime(int(match[1]), int(match[2]), 1, tzinfo=dt_timezone.utc)
+            found.append((name, start, add_months(start, 1), attached))
+    return sorted(found, key=lambda partition: partition[1])
+
+
+def default_partition_months(before):
+    """Starts of the months (UTC) that have rows in the default partition from before `before`."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT DISTINCT date_trunc('month', \"timestamp\" AT TIME ZONE 'UTC') "
+            f"FROM {_qn(DEFAULT_PARTITION)} WHERE \"timestamp\" < %s",
+            [before],
+        )
+        return sorted(month.replace(tzinfo=dt_timezone.utc) for month, in cursor.fetchall())
+
+
+def create_partition(start):
+    """
+    Attach the partition for the month starting at `start`. Rows of that month already
+    sitting in the default partition are moved into it in the same transaction.
+    """
+    name, bounds = partition_name(start), _bounds(start)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"CREATE TABLE {_qn(name)} (LIKE {_qn(TABLE)} INCLUDING DEFAULTS)")
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {_qn(DEFAULT_PARTITION)} "
+            f"WHERE \"timestamp\" >= %s AND \"timestamp\" < %s RETURNING *) "
+            f"INSERT INTO {_qn(name)} SELECT * FROM moved",
+            [start, add_months(start, 1)],
+        )
+        # Indexes, the primary key and foreign keys are cloned from the parent on attach.
+        cursor.execute(f"ALTER TABLE {_qn(TABLE)} ATTACH PARTITION {_qn(name)} FOR VALUES {bounds}")
+    return name
+
+
+def ensure_partitions(ahead, now=None):
+    """Create the partitions for the current month and the `ahead` months after it. Returns the new names."""
+    existing = {name for name, *_ in partitions()}
+    current = month_start(now or timezone.now())
+    created = []
+    for offset in range(ahead + 1):
+        start = add_months(current, offset)
+        if partition_name(start) not in existing:
+            created.append(create_partition(start))
+    return created
+
+
+def detach_partition(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {_qn(TABLE)} DETACH PARTITION {_qn(name)}")
+
+
+def drop_partition(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE {_qn(name)}")
+
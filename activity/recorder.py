@@ -0,0 +1,187 @@
+"""
+Write-behind activity logging.
+
+Views call `record_activity()` instead of `ActivityLog.objects.create()`. Depending on
+settings.ACTIVITY_LOG["MODE"] the entry is either written immediately ("sync", used by
+tests and management commands) or queued in-process and written by a background thread
+with bulk_create ("buffered"), either when BATCH_SIZE entries are waiting or every
+FLUSH_INTERVAL seconds. Entries are only queued once the surrounding transaction commits,
+and the queue is flushed on interpreter exit and Celery worker shutdown.
+"""
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .models import ActivityLog
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "MODE": "buffered",      # "buffered" or "sync"
+    "BATCH_SIZE": 200,       # flush as soon as this many entries are waiting
+    "FLUSH_INTERVAL": 2.0,   # ...or after this many seconds
+    "MAX_PENDING": 10000,    # callers flush inline past this, bounding memory
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "ACTIVITY_LOG", {})}
+
+
+def write_entries(entries):
+    """
+    bulk_create a batch of ActivityLog entries.
+
+    A task or user may be deleted while its entries wait in the queue. Mirror the FK
+    rules in that case: entries for deleted tasks keep their row with task=NULL, and
+    entries for deleted users are dropped.
+
+    If the batch still can't be written, entries are saved one by one and any entry that
+    fails on its own (e.g. details that aren't JSON serializable) is logged and dropped,
+    so it can't hold back the rest of the queue.
+    """
+    if not entries:
+        return
+    try:
+        with transaction.atomic():
+            ActivityLog.objects.bulk_create(entries)
+        return
+    except Exception:
+        # IntegrityError/ValueError: a task or user is gone (bulk_create refuses entries
+        # whose cached instance was deleted; the ids on the entry are still usable).
+        # Anything else is sorted out row by row below.
+        pass
+    from tasks.models import Task
+    from users.models import User
+
+    task_ids = {e.task_id for e in entries if e.task_id}
+    user_ids = {e.user_id for e in entries}
+    live_tasks = set(Task.objects.filter(pk__in=task_ids).values_list("pk", flat=True))
+    live_users = set(User.objects.filter(pk__in=user_ids).values_list("pk", flat=True))
+    kept = []
+    for entry in entries:
+        for name in ("task", "user"):
+            field = ActivityLog._meta.get_field(name)
+            if field.is_cached(entry):
+                field.delete_cached_value(entry)
+        if entry.user_id not in live_users:
+            continue
+        if entry.task_id and entry.task_id not in live_tasks:
+            entry.task = None
+        kept.append(entry)
+    try:
+        with transaction.atomic():
+            ActivityLog.objects.bulk_create(kept)
+        return
+    except Exception:
+        pass
+    for entry in kept:
+        try:
+            with transaction.atomic():
+                entry.save(force_insert=True)
+        except Exception:
+            logger.exception(
+                "Dropped activity log entry %r (task %s, user %s, details %r)",
+                entry.action, entry.task_id, entry.user_id, entry.details,
+            )
+
+
+class ActivityBuffer:
+    def __init__(self, batch_size, flush_interval, max_pending):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def add(self, entries):
+        with self._lock:
+            self._pending.extend(entries)
+            pending = len(self._pending)
+        self._ensure_thread()
+        if pending >= self.max_pending:
+            # The writer is falling behind; apply backpressure to the caller.
+            self.flush()
+        elif pending >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                entries, self._pending = self._pending, []
+            for start in range(0, len(entries), self.batch_size):
+                batch = entries[start:start + self.batch_size]
+                try:
+                    write_entries(batch)
+                except Exception:
+                    # write_entries already isolates bad entries, so this is the database
+                    # itself failing. Drop the batch rather than retry it forever, and
+                    # requeue the entries that were never tried for the next flush.
+                    logger.exception("Dropped %d activity log entries", len(batch))
+                    with self._lock:
+                        self._pending[:0] = entries[start + self.batch_size:]
+                    break
+        return len(entries)
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="activity-log-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                config = get_config()
+                _buffer = ActivityBuffer(config["BATCH_SIZE"], config["FLUSH_INTERVAL"], config["MAX_PENDING"])
+    return _buffer
+
+
+def record_activities(entries):
+    """Log unsaved ActivityLog instances according to settings.ACTIVITY_LOG["MODE"]."""
+    entries = list(entries)
+    if not entries:
+        return
+    if get_config()["MODE"] == "sync":
+        write_entries(entries)
+        return
+    # Entries for work that gets rolled back must never be written.
+    transaction.on_commit(lambda: get_buffer().add(entries))
+
+
+def record_activity(task, user, action, details=None):
+    record_activities([ActivityLog(task=task, user=user, action=action, details=details)])
+
+
+def flush_activity():
+    """Write every queued entry now. Returns the number of entries flushed."""
+    if _buffer is None:
+        return 0
+    return _buffer.flush()
+
+
+atexit.register(flush_activity)
@@ -2,6 +2,9 @@ from rest_framework import serializers
 from .models import ActivityLog
 
 class ActivityLogSerializer(serializers.ModelSerializer):
+    # The feed is always the requesting user's own, so the user isn't repeated per entry.
+    task_title = serializers.CharField(source='task.title', read_only=True, default=None)
+
     class Meta:
         model = ActivityLog
-        fields = '__all__'
+        fields = ['id', 'task', 'task_title', 'action', 'details', 'timestamp']
@@ -0,0 +1,18 @@
+import logging
+
+from celery import shared_task
+
+from . import archive, partitions
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def maintain_activity_log():
+    """Keep future partitions ready and archive months past the retention period."""
+    created = []
+    if partitions.is_partitioned():
+        created = partitions.ensure_partitions(archive.get_config()["PARTITIONS_AHEAD"])
+    archived = archive.archive_expired() if archive.get_config()["ARCHIVE_DIR"] else []
+    logger.info("[Celery] Activity log: %d partitions created, %d months archived", len(created), len(archived))
+    return {"created": created, "archived": [f"{start:%Y-%m}" for start, _, _ in archived]}
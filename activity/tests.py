@@ -1,3 +1,156 @@
-from django.test import TestCase
+import gzip
+import json
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from tasks.models import Task
+from users.models import User
+from . import archive, partitions
+from .models import ActivityArchive, ActivityLog
+from .recorder import ActivityBuffer, write_entries
+
+
+class WriteEntriesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="activity@example.com", password=None)
+
+    def test_entries_for_deleted_tasks_keep_their_row(self):
+        task = Task.objects.create(user=self.user, title="Gone")
+        entry = ActivityLog(task=task, user=self.user, action="deleted")
+        task.delete()
+        write_entries([entry])
+        self.assertIsNone(ActivityLog.objects.get(action="deleted").task_id)
+
+    def test_entries_for_deleted_users_are_dropped(self):
+        user = User.objects.create_user(email="leaving@example.com", password=None)
+        entry = ActivityLog(user=user, action="created")
+        user.delete()
+        write_entries([entry])
+        self.assertFalse(ActivityLog.objects.exists())
+
+    def test_bad_entry_is_dropped_without_the_rest(self):
+        entries = [
+            ActivityLog(user=self.user, action="created"),
+            ActivityLog(user=self.user, action="updated", details={"due_date": timezone.now()}),
+            ActivityLog(user=self.user, action="deleted"),
+        ]
+        with self.assertLogs("activity.recorder", "ERROR"):
+            write_entries(entries)
+        self.assertCountEqual(ActivityLog.objects.values_list("action", flat=True), ["created", "deleted"])
+
+
+@mock.patch.object(ActivityBuffer, "_ensure_thread")
+class ActivityBufferTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="buffer@example.com", password=None)
+
+    def test_bad_entry_does_not_block_the_queue(self, ensure_thread):
+        buffer = ActivityBuffer(batch_size=2, flush_interval=60, max_pending=100)
+        buffer.add([
+            ActivityLog(user=self.user, action="updated", details={"due_date": timezone.now()}),
+            ActivityLog(user=self.user, action="created"),
+            ActivityLog(user=self.user, action="retrieved"),
+        ])
+        with self.assertLogs("activity.recorder", "ERROR"):
+            self.assertEqual(buffer.flush(), 3)
+        self.assertEqual(buffer.flush(), 0)
+        self.assertEqual(ActivityLog.objects.count(), 2)
+
+    def test_database_failure_requeues_untried_entries(self, ensure_thread):
+        buffer = ActivityBuffer(batch_size=2, flush_interval=60, max_pending=100)
+        buffer.add([ActivityLog(user=self.user, action=str(i)) for i in range(5)])
+        with mock.patch("activity.recorder.write_entries", side_effect=[None, RuntimeError("down")]):
+            with self.assertLogs("activity.recorder", "ERROR"):
+                buffer.flush()
+        self.assertEqual([entry.action for entry in buffer._pending], ["4"])
+
+
+class ActivityFeedTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="feed@example.com", password=None)
+        other = User.objects.create_user(email="feed-other@example.com", password=None)
+        task = Task.objects.create(user=cls.user, title="Fed")
+        for action in ("created", "updated", "retrieved"):
+            ActivityLog.objects.create(task=task, user=cls.user, action=action)
+        ActivityLog.objects.create(user=other, action="created")
+
+    def test_feed_pages_through_the_users_entries_newest_first(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get("/api/activity/", {"page_size": 2})
+        self.assertEqual(response.status_code, 200)
+        actions = [entry["action"] for entry in response.data["results"]]
+        response = self.client.get(response.data["next"])
+        actions += [entry["action"] for entry in response.data["results"]]
+        self.assertEqual(actions, ["retrieved", "updated", "created"])
+        self.assertIsNone(response.data["next"])
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="archive@example.com", password=None)
+        cls.task = Task.objects.create(user=cls.user, title="Archived")
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        self.now = datetime(2026, 6, 15, tzinfo=dt_timezone.utc)
+        for timestamp in (datetime(2026, 1, 10, tzinfo=dt_timezone.utc), datetime(2026, 1, 20, tzinfo=dt_timezone.utc)):
+            ActivityLog.objects.create(task=self.task, user=self.user, action="updated", timestamp=timestamp)
+        ActivityLog.objects.create(user=self.user, action="created", timestamp=datetime(2026, 2, 3, tzinfo=dt_timezone.utc))
+        # Inside the retention period.
+        ActivityLog.objects.create(task=self.task, user=self.user, action="retrieved", timestamp=datetime(2026, 5, 1, tzinfo=dt_timezone.utc))
+
+    def archive(self, **options):
+        if partitions.is_partitioned():
+            self.skipTest("covers the single-table path")
+        config = {"RETENTION_DAYS": 90, "ARCHIVE_DIR": str(self.directory), "ARCHIVE_LOOKUP": True}
+        with override_settings(ACTIVITY_LOG_RETENTION=config):
+            call_command("archive_activity", now=self.now.isoformat(), stdout=StringIO(), **options)
+
+    def test_expired_months_are_written_out_and_deleted(self):
+        self.archive()
+        self.assertEqual(list(ActivityLog.objects.values_list("action", flat=True)), ["retrieved"])
+        self.assertEqual(
+            list(ActivityArchive.objects.order_by("start").values_list("label", "rows")),
+            [("2026-01", 2), ("2026-02", 1)],
+        )
+        with gzip.open(self.directory / "2026-01.jsonl.gz", "rt") as lines:
+            rows = [json.loads(line) for line in lines]
+        self.assertEqual([row["timestamp"] for row in rows], ["2026-01-10T00:00:00+00:00", "2026-01-20T00:00:00+00:00"])
+
+        with override_settings(ACTIVITY_LOG_RETENTION={"ARCHIVE_LOOKUP": True}):
+            entries = archive.archived_task_logs(self.task.pk)
+        self.assertEqual([entry["timestamp"].day for entry in entries], [20, 10])
+
+    def test_dry_run_changes_nothing(self):
+        self.archive(dry_run=True)
+        self.assertEqual(ActivityLog.objects.count(), 4)
+        self.assertFalse(ActivityArchive.objects.exists())
+        self.assertEqual(list(self.directory.iterdir()), [])
+
+    def test_expired_rows_in_the_default_partition_are_archived(self):
+        january, march = (datetime(2026, month, 1, tzinfo=dt_timezone.utc) for month in (1, 3))
+        monthly = [("activity_activitylog_p202602", datetime(2026, 2, 1, tzinfo=dt_timezone.utc), datetime(2026, 3, 1, tzinfo=dt_timezone.utc), True)]
+        with override_settings(ACTIVITY_LOG_RETENTION={"RETENTION_DAYS": 90}), \
+                mock.patch.object(partitions, "is_partitioned", return_value=True), \
+                mock.patch.object(partitions, "partitions", return_value=monthly), \
+                mock.patch.object(partitions, "default_partition_months", return_value=[january]) as default_months:
+            months = archive.expired_months(archive.retention_cutoff(self.now))
+        default_months.assert_called_once_with(march)
+        self.assertEqual(
+            [(start.month, partition) for start, _, partition in months],
+            [(1, None), (2, "activity_activitylog_p202602")],
+        )
@@ -2,4 +2,6 @@ from rest_framework.routers import DefaultRouter
 from .views import ActivityLogViewSet
 
 router = DefaultRouter()
-urlpatterns = []
\ No newline at end of file
+router.register('activity', ActivityLogViewSet, basename='activity')
+
+urlpatterns = router.urls
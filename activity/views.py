@@ -1,8 +1,39 @@
+from django_filters.rest_framework import DjangoFilterBackend
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
 from rest_framework import viewsets, permissions
+from .filters import ActivityLogFilter
 from .models import ActivityLog
+from .pagination import ActivityCursorPagination
 from .serializers import ActivityLogSerializer
 
+SWAGGER_ACTIVITY_LIST_PARAMS = [
+    openapi.Parameter("action", openapi.IN_QUERY, description="Filter by action (comma-separated)", type=openapi.TYPE_STRING),
+    openapi.Parameter("task", openapi.IN_QUERY, description="Filter by task id", type=openapi.TYPE_STRING, format=openapi.FORMAT_UUID),
+    openapi.Parameter("since", openapi.IN_QUERY, description="Entries at or after this time (ISO 8601)", type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+    openapi.Parameter("until", openapi.IN_QUERY, description="Entries before this time (ISO 8601)", type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+    openapi.Parameter("cursor", openapi.IN_QUERY, description="Opaque cursor from the previous page's next/previous link", type=openapi.TYPE_STRING),
+    openapi.Parameter("page_size", openapi.IN_QUERY, description="Entries per page (max 500)", type=openapi.TYPE_INTEGER),
+]
+
+
 class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = ActivityLog.objects.all().order_by('-timestamp')
+    """
+    The current user's activity feed (GET /api/activity/), newest first.
+    - Cursor-paginated over the (user, timestamp) index
+    - Filters: action, task, since, until
+    """
     serializer_class = ActivityLogSerializer
     permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = ActivityLogFilter
+    pagination_class = ActivityCursorPagination
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return ActivityLog.objects.none()
+        return ActivityLog.objects.filter(user=self.request.user).select_related("task")
+
+    @swagger_auto_schema(manual_parameters=SWAGGER_ACTIVITY_LIST_PARAMS)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
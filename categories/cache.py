@@ -0,0 +1,5 @@
+from task_manager.lookup_cache import LookupCache
+from .models import Category
+
+# TaskFilter matches categories by name case-insensitively.
+category_cache = LookupCache(Category, case_insensitive=True)
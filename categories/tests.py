@@ -1,3 +1,26 @@
 from django.test import TestCase
 
-# Create your tests here.
+from .cache import category_cache
+from .models import Category
+
+
+class CategoryCacheTests(TestCase):
+    def setUp(self):
+        category_cache.clear()
+        self.addCleanup(category_cache.clear)
+        self.category = Category.objects.create(name="Work")
+
+    def test_lookups_are_served_from_the_cache(self):
+        self.assertEqual(category_cache.get(self.category.pk), self.category)
+        self.assertEqual(category_cache.ids_for_name("work"), [self.category.pk])
+        with self.assertNumQueries(0):
+            self.assertEqual(category_cache.get(self.category.pk).name, "Work")
+            self.assertEqual(category_cache.ids_for_name("WORK"), [self.category.pk])
+
+    def test_rename_drops_the_old_name(self):
+        category_cache.ids_for_name("Work")
+        self.category.name = "Office"
+        self.category.save()
+        self.assertEqual(category_cache.ids_for_name("Work"), [])
+        self.assertEqual(category_cache.ids_for_name("office"), [self.category.pk])
+        self.assertEqual(category_cache.get(self.category.pk).name, "Office")
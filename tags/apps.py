@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class TagsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tags'
+
+    def ready(self):
+        from .cache import tag_cache
+
+        tag_cache.connect()
@@ -0,0 +1,4 @@
+from task_manager.lookup_cache import LookupCache
+from .models import Tag
+
+tag_cache = LookupCache(Tag)
@@ -1,3 +1,29 @@
 from django.test import TestCase
 
-# Create your tests here.
+from .cache import tag_cache
+from .models import Tag
+
+
+class TagCacheTests(TestCase):
+    def setUp(self):
+        tag_cache.clear()
+        self.addCleanup(tag_cache.clear)
+        self.tags = [Tag.objects.create(name=name) for name in ("urgent", "later")]
+
+    def test_get_many_loads_misses_with_one_query(self):
+        pks = [tag.pk for tag in self.tags]
+        with self.assertNumQueries(1):
+            self.assertEqual(set(tag_cache.get_many(pks + [pks[0]])), set(pks))
+        with self.assertNumQueries(0):
+            tag_cache.get_many(pks)
+
+    def test_names_are_case_sensitive(self):
+        self.assertEqual(tag_cache.ids_for_name("urgent"), [self.tags[0].pk])
+        self.assertEqual(tag_cache.ids_for_name("Urgent"), [])
+
+    def test_deleted_tag_leaves_the_cache(self):
+        tag = self.tags[0]
+        tag_cache.get(tag.pk)
+        pk = tag.pk
+        tag.delete()
+        self.assertIsNone(tag_cache.get(pk))
@@ -3,6 +3,10 @@ ASGI config for task_manager project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Requests served here resolve against task_manager/urls_asgi.py (see
+task_manager.middleware): native async task reads, and the task event stream
+(Server-Sent Events at /api/tasks/events/), which needs ASGI to hold connections open.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -0,0 +1,238 @@
+"""
+Per-user event fan-out for push connections (the task event stream, tasks/async_views.py).
+
+A Broker takes events from any thread (request handlers, Celery workers) and delivers
+them to the Subscriptions of that user, which live on the event loop of the ASGI server:
+- InMemoryBroker (default) delivers within the process: enough for a single ASGI node,
+  and for tests. Events published by other processes (WSGI workers, Celery) don't arrive.
+- RedisBroker publishes through Redis pub/sub, so every node receives every event and
+  delivers it to its own subscribers. Needs the `redis` package.
+settings.TASK_EVENTS["BROKER"] is the dotted path of the class to use.
+
+Backpressure: publishers never wait. Each subscription queues at most QUEUE_SIZE events;
+a subscriber that falls further behind has its backlog replaced by a single RESYNC
+event, telling the client to catch up through /api/tasks/changes/ instead. Idle
+subscribers cost a queue and a waiting coroutine each, so one node can hold thousands.
+
+MAX_CONNECTIONS and MAX_CONNECTIONS_PER_USER cap subscriptions per process; `metrics()`
+reports current and peak connections and event counts.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "BROKER": "task_manager.broker.InMemoryBroker",
+    "REDIS_URL": None,                # RedisBroker; defaults to CELERY_BROKER_URL
+    "CHANNEL_PREFIX": "task-events",  # RedisBroker channels are "<prefix>:<user id>"
+    "QUEUE_SIZE": 100,                # events held per subscriber before it is told to resync
+    "HEARTBEAT": 15,                  # seconds between keep-alive comments on idle streams
+    "MAX_CONNECTIONS": 10000,         # subscriptions per process
+    "MAX_CONNECTIONS_PER_USER": 10,
+}
+
+RESYNC = "resync"
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "TASK_EVENTS", {})}
+
+
+class TooManyConnections(Exception):
+    def __init__(self, message, per_user=False):
+        super().__init__(message)
+        self.per_user = per_user
+
+
+class Subscription:
+    """One connection's queue of (event type, JSON data) pairs; used on the event loop only."""
+
+    def __init__(self, broker, user_id, loop, queue_size):
+        self.broker = broker
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=queue_size)
+
+    def push(self, event):
+        if self.queue.full():
+            # Too far behind to catch up event by event: drop the backlog for one resync.
+            dropped = 0
+            while not self.queue.empty():
+                self.queue.get_nowait()
+                dropped += 1
+            self.broker.count("dropped", dropped)
+            event = (RESYNC, "{}")
+        self.queue.put_nowait(event)
+        self.broker.count("delivered")
+
+    def close(self):
+        while self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    async def get(self):
+        """The next event, or None once the broker is closed."""
+        return await self.queue.get()
+
+
+class InMemoryBroker:
+    def __init__(self, config=None):
+        self.config = config or get_config()
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+        self._connections = 0
+        self._counters = Counter()
+
+    def publish(self, user_id, event_type, data):
+        """Send an event to the user's subscribers. Safe to call from any thread."""
+        self.send(str(user_id), (event_type, json.dumps(data, separators=(",", ":"))))
+        self.count("published")
+
+    def send(self, user_id, event):
+        self.deliver(user_id, event)
+
+    def deliver(self, user_id, event):
+        """Queue an (event type, JSON data) pair on this process's subscriptions of the user."""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.push, event)
+            except RuntimeError:
+                # The subscriber's event loop has been closed.
+                pass
+
+    def subscribe(self, user_id):
+        """A Subscription for the running event loop. Raises TooManyConnections past the limits."""
+        user_id = str(user_id)
+        with self._lock:
+            subscriptions = self._subscriptions.get(user_id, set())
+            if self._connections >= self.config["MAX_CONNECTIONS"]:
+                self._counters["rejected"] += 1
+                raise TooManyConnections("Too many open event streams on this server.")
+            if len(subscriptions) >= self.config["MAX_CONNECTIONS_PER_USER"]:
+                self._counters["rejected"] += 1
+                raise TooManyConnections("Too many open event streams for this user.", per_user=True)
+            subscription = Subscription(self, user_id, asyncio.get_running_loop(), self.config["QUEUE_SIZE"])
+            self._subscriptions[user_id] = subscriptions | {subscription}
+            self._connections += 1
+            self._counters["peak_connections"] = max(self._counters["peak_connections"], self._connections)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id, set())
+            if subscription in subscriptions:
+                self._connections -= 1
+                if len(subscriptions) > 1:
+                    self._subscriptions[subscription.user_id] = subscriptions - {subscription}
+                else:
+                    del self._subscriptions[subscription.user_id]
+
+    def close(self):
+        """End every subscription (their get() returns None)."""
+        with self._lock:
+            subscriptions = [subscription for group in self._subscriptions.values() for subscription in group]
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.close)
+            except RuntimeError:
+                pass
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "connections": self._connections,
+                "peak_connections": self._counters["peak_connections"],
+                "users": len(self._subscriptions),
+                "published": self._counters["published"],
+                "delivered": self._counters["delivered"],
+                "dropped": self._counters["dropped"],
+                "rejected": self._counters["rejected"],
+            }
+
+
+class RedisBroker(InMemoryBroker):
+    """
+    Publishes to Redis; each process listens on "<prefix>:*" from its event loop (started
+    with the first subscription) and delivers to its own subscribers. Events published
+    while the listener reconnects are lost, so its subscribers are sent RESYNC afterwards.
+    """
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        try:
+            import redis
+            import redis.asyncio
+        except ImportError as exc:
+            raise ImproperlyConfigured("RedisBroker needs the 'redis' package.") from exc
+        self._redis = redis
+        self.url = self.config["REDIS_URL"] or settings.CELERY_BROKER_URL
+        self.prefix = self.config["CHANNEL_PREFIX"]
+        self._client = None
+        self._listener = None
+
+    def send(self, user_id, event):
+        if self._client is None:
+            self._client = self._redis.Redis.from_url(self.url)
+        self._client.publish(f"{self.prefix}:{user_id}", " ".join(event))
+
+    def subscribe(self, user_id):
+        subscription = super().subscribe(user_id)
+        if self._listener is None or self._listener.done():
+            self._listener = subscription.loop.create_task(self._listen())
+        return subscription
+
+    async def _listen(self):
+        connected_before = False
+        while True:
+            try:
+                client = self._redis.asyncio.Redis.from_url(self.url)
+                async with client.pubsub() as pubsub:
+                    await pubsub.psubscribe(f"{self.prefix}:*")
+                    if connected_before:
+                        self._resync_all()
+                    connected_before = True
+                    async for message in pubsub.listen():
+                        if message["type"] != "pmessage":
+                            continue
+                        user_id = message["channel"].decode().rpartition(":")[2]
+                        event_type, _, data = message["data"].decode().partition(" ")
+                        self.deliver(user_id, (event_type, data))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Task event listener lost its Redis connection; reconnecting")
+                await asyncio.sleep(1)
+
+    def _resync_all(self):
+        with self._lock:
+            user_ids = list(self._subscriptions)
+        for user_id in user_ids:
+            self.deliver(user_id, (RESYNC, "{}"))
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                config = get_config()
+                _broker = import_string(config["BROKER"])(config)
+    return _broker
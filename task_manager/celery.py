@@ -13,6 +13,18 @@ app.conf.beat_schedule = {
         'task': 'tasks.tasks.send_due_reminders',
         'schedule': 60.0,  # every minute
     },
+    'maintain-activity-log-daily': {
+        'task': 'activity.tasks.maintain_activity_log',
+        'schedule': 24 * 60 * 60.0,  # daily
+    },
+    'prune-revoked-tokens-hourly': {
+        'task': 'users.tasks.prune_revoked_tokens',
+        'schedule': 60 * 60.0,  # hourly
+    },
+    'prune-task-tombstones-daily': {
+        'task': 'tasks.tasks.prune_task_tombstones',
+        'schedule': 24 * 60 * 60.0,  # daily
+    },
 }
 
 __all__ = ('app',)
@@ -0,0 +1,191 @@
+"""
+Bounded lookup cache for small, hot reference tables (categories, tags).
+
+A LookupCache answers "object by id" and "ids by name" for one model, loading misses
+with a single query. It is invalidated from post_save/post_delete signals (see the
+categories and tags apps).
+
+Storage comes from settings.LOOKUP_CACHE:
+- by default an in-process LRU capped at MAX_ENTRIES, with entries expiring after TTL
+  seconds, which bounds how stale another process's copy can be
+- with CACHE_ALIAS set, the named Django cache (e.g. Redis) instead, so invalidation is
+  seen by every process at once
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.functions import Lower
+
+DEFAULTS = {
+    "MAX_ENTRIES": 2048,
+    "TTL": 60,
+    "CACHE_ALIAS": None,
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "LOOKUP_CACHE", {})}
+
+
+class LocalStore:
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                expires, value = entry
+                if expires < now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = value
+        return found
+
+    def set_many(self, values):
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            for key, value in values.items():
+                self._entries[key] = (expires, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DjangoCacheStore:
+    def __init__(self, alias, prefix, ttl):
+        self.cache = caches[alias]
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def _key(self, key):
+        return f"{self.prefix}:{key}"
+
+    def get_many(self, keys):
+        found = self.cache.get_many([self._key(key) for key in keys])
+        return {key: found[self._key(key)] for key in keys if self._key(key) in found}
+
+    def set_many(self, values):
+        self.cache.set_many({self._key(key): value for key, value in values.items()}, timeout=self.ttl)
+
+    def delete_many(self, keys):
+        self.cache.delete_many([self._key(key) for key in keys])
+
+    def clear(self):
+        # Entries expire on their own; clearing a shared cache would hit other apps.
+        pass
+
+
+class LookupCache:
+    def __init__(self, model, name_field="name", case_insensitive=False):
+        self.model = model
+        self.name_field = name_field
+        self.case_insensitive = case_insensitive
+        self._store = None
+
+    @property
+    def store(self):
+        if self._store is None:
+            config = get_config()
+            if config["CACHE_ALIAS"]:
+                prefix = f"lookup:{self.model._meta.label_lower}"
+                self._store = DjangoCacheStore(config["CACHE_ALIAS"], prefix, config["TTL"])
+            else:
+                self._store = LocalStore(config["MAX_ENTRIES"], config["TTL"])
+        return self._store
+
+    def _normalize(self, name):
+        return name.lower() if self.case_insensitive else name
+
+    def _name_key(self, name):
+        return f"name:{self._normalize(name)}"
+
+    def _id_key(self, pk):
+        return f"id:{pk}"
+
+    def get_many(self, pks):
+        """{pk: instance} for the given ids that exist; misses are loaded with one query."""
+        pks = [self.model._meta.pk.to_python(pk) for pk in pks]
+        cached = self.store.get_many([self._id_key(pk) for pk in pks])
+        found = {pk: cached[self._id_key(pk)] for pk in pks if self._id_key(pk) in cached}
+        missing = [pk for pk in pks if pk not in found]
+        if missing:
+            loaded = {obj.pk: obj for obj in self.model.objects.filter(pk__in=missing)}
+            self.store.set_many({self._id_key(pk): obj for pk, obj in loaded.items()})
+            found.update(loaded)
+        return found
+
+    def get(self, pk):
+        pk = self.model._meta.pk.to_python(pk)
+        return self.get_many([pk]).get(pk)
+
+    def ids_for_names(self, names):
+        """{name: [pk, ...]} for the given names (compared case-insensitively if configured)."""
+        names = list(dict.fromkeys(names))
+        cached = self.store.get_many([self._name_key(name) for name in names])
+        result = {name: cached[self._name_key(name)] for name in names if self._name_key(name) in cached}
+        missing = [name for name in names if name not in result]
+        if missing:
+            if self.case_insensitive:
+                query = self.model.objects.annotate(lookup_name=Lower(self.name_field)).filter(
+                    lookup_name__in=[self._normalize(name) for name in missing]
+                )
+            else:
+                query = self.model.objects.filter(**{f"{self.name_field}__in": missing})
+            by_normalized = {self._normalize(name): name for name in missing}
+            loaded = {name: [] for name in missing}
+            for pk, value in query.values_list("pk", self.name_field):
+                name = by_normalized.get(self._normalize(value))
+                if name is not None:
+                    loaded[name].append(pk)
+            # Unknown names aren't cached: a matching row may be created at any moment.
+            self.store.set_many({self._name_key(name): pks for name, pks in loaded.items() if pks})
+            result.update(loaded)
+        return result
+
+    def ids_for_name(self, name):
+        return self.ids_for_names([name])[name]
+
+    def invalidate(self, instance, **kwargs):
+        keys = [self._id_key(instance.pk), self._name_key(getattr(instance, self.name_field))]
+        old_name = getattr(instance, "_lookup_cache_name", None)
+        if old_name is not None:
+            keys.append(self._name_key(old_name))
+        self.store.delete_many(keys)
+
+    def remember_name(self, instance, **kwargs):
+        # pre_save: note the stored name so a rename also drops the old name's entry.
+        if instance.pk and not instance._state.adding:
+            instance._lookup_cache_name = (
+                self.model.objects.filter(pk=instance.pk).values_list(self.name_field, flat=True).first()
+            )
+
+    def connect(self):
+        from django.db.models.signals import post_delete, post_save, pre_save
+
+        pre_save.connect(self.remember_name, sender=self.model, weak=False)
+        post_save.connect(self.invalidate, sender=self.model, weak=False)
+        post_delete.connect(self.invalidate, sender=self.model, weak=False)
+
+    def clear(self):
+        self.store.clear()
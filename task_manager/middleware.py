@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.utils.decorators import sync_and_async_middleware
+from asgiref.sync import iscoroutinefunction
+
+
+@sync_and_async_middleware
+def AsgiUrlconfMiddleware(get_response):
+    """Resolve ASGI requests against settings.ASGI_URLCONF (async task views); WSGI is untouched."""
+    def select_urlconf(request):
+        if isinstance(request, ASGIRequest) and settings.ASGI_URLCONF:
+            request.urlconf = settings.ASGI_URLCONF
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            select_urlconf(request)
+            return await get_response(request)
+    else:
+        def middleware(request):
+            select_urlconf(request)
+            return get_response(request)
+    return middleware
@@ -0,0 +1,117 @@
+"""
+Faster JSON, and MessagePack, for the API (settings.REST_FRAMEWORK renderers and parsers).
+
+- FastJSONRenderer / FastJSONParser: DRF's JSON classes, encoding and decoding with orjson
+  when it is installed. The output is the same as DRF's: UUIDs as strings, aware datetimes
+  in ISO 8601 with "Z" for UTC, \\u2028/\\u2029 escaped. Requests for indented output
+  ("application/json; indent=4", the browsable API) use DRF's encoder.
+- MessagePackRenderer / MessagePackParser: "application/msgpack", when msgpack is
+  installed. Aware datetimes are packed as MessagePack timestamps; timestamps in request
+  bodies are parsed into ISO 8601 strings (UTC), the same values a JSON body carries, so
+  request.data stays JSON serializable. UUIDs and the other types DRF's JSON encoder knows
+  are packed as it would write them.
+
+Clients choose with the Accept header (responses) and Content-Type (request bodies);
+JSON stays the default. Both libraries are optional: without orjson the JSON classes
+behave exactly like DRF's, and without msgpack ContentNegotiation leaves the MessagePack
+classes out, so asking for it gets the usual 406/415.
+"""
+from datetime import datetime
+
+from rest_framework.exceptions import ParseError
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    available = True
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or self.ensure_ascii or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = orjson.dumps(
+            data, default=self.encoder_class().default, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS,
+        )
+        # Same as JSONRenderer: keep the output a strict JavaScript subset.
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    available = True
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        # orjson only reads UTF-8 and always rejects NaN/Infinity (STRICT_JSON).
+        encoding = (parser_context or {}).get("encoding", "utf-8").lower().replace("_", "-")
+        if orjson is None or not self.strict or encoding not in ("utf-8", "utf8"):
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+
+
+class MessagePackRenderer(BaseRenderer):
+    available = msgpack is not None
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+    encoder_class = encoders.JSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=self.encoder_class().default, datetime=True)
+
+
+def _timestamp_as_string(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class MessagePackParser(BaseParser):
+    available = msgpack is not None
+    media_type = "application/msgpack"
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            # timestamp=3 decodes timestamps as aware datetimes; the hooks turn them into
+            # strings inside every map and array (serializers parse those like JSON input).
+            return _timestamp_as_string(msgpack.unpackb(
+                stream.read(),
+                raw=False,
+                timestamp=3,
+                object_hook=lambda obj: {key: _timestamp_as_string(value) for key, value in obj.items()},
+                list_hook=lambda items: [_timestamp_as_string(value) for value in items],
+            ))
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError(f"MessagePack parse error - {exc or type(exc).__name__}")
+
+
+class ContentNegotiation(DefaultContentNegotiation):
+    """DRF's content negotiation, skipping renderers and parsers whose library isn't installed."""
+
+    def select_parser(self, request, parsers):
+        return super().select_parser(request, [parser for parser in parsers if getattr(parser, "available", True)])
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        renderers = [renderer for renderer in renderers if getattr(renderer, "available", True)]
+        return super().select_renderer(request, renderers, format_suffix)
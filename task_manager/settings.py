@@ -45,6 +45,26 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
+# How JWT-authenticated requests resolve their user (users/authentication.py): "cached"
+# serves Users from a short-lived cache evicted on User changes, "stateless" trusts the
+# token's claims without any lookup, "off" queries the User on every request.
+JWT_USER_CACHE = {
+    'MODE': config('JWT_USER_CACHE_MODE', default='cached'),
+    'TTL': config('JWT_USER_CACHE_TTL', default=30, cast=int),
+    'MAX_ENTRIES': config('JWT_USER_CACHE_MAX_ENTRIES', default=10000, cast=int),
+    'CACHE_ALIAS': config('JWT_USER_CACHE_ALIAS', default=None),
+}
+
+# Token revocation (users/revocation.py): each process checks an in-memory Bloom filter
+# first and pulls other processes' revocations every SYNC_INTERVAL seconds.
+TOKEN_REVOCATION = {
+    'FILTER_CAPACITY': config('TOKEN_REVOCATION_FILTER_CAPACITY', default=100000, cast=int),
+    'FILTER_ERROR_RATE': 0.001,
+    'SYNC_INTERVAL': config('TOKEN_REVOCATION_SYNC_INTERVAL', default=5, cast=int),
+    'SYNC_OVERLAP': 30,
+    'REBUILD_INTERVAL': 3600,
+}
+
 # Middleware
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
@@ -55,9 +75,13 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'task_manager.middleware.AsgiUrlconfMiddleware',
 ]
 
 ROOT_URLCONF = 'task_manager.urls'
+# Requests served over ASGI resolve here instead, so the task read endpoints run as native
+# async views (tasks/async_views.py). Set ASGI_URLCONF= (empty) to serve the sync views.
+ASGI_URLCONF = config('ASGI_URLCONF', default='task_manager.urls_asgi')
 
 # Templates
 TEMPLATES = [
@@ -78,27 +102,119 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'task_manager.wsgi.application'
 
-# Database (PostgreSQL from .env)
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': config('DB_NAME'),
-        'USER': config('DB_USER'),
-        'PASSWORD': config('DB_PASSWORD'),
-        'HOST': config('DB_HOST', default='localhost'),
-        'PORT': config('DB_PORT', default='5432'),
+# Database (PostgreSQL from .env; DB_ENGINE=django.db.backends.sqlite3 for a local setup)
+DB_ENGINE = config('DB_ENGINE', default='django.db.backends.postgresql')
+if DB_ENGINE == 'django.db.backends.sqlite3':
+    DATABASES = {
+        'default': {
+            'ENGINE': DB_ENGINE,
+            'NAME': config('DB_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+        }
     }
-}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': DB_ENGINE,
+            'NAME': config('DB_NAME'),
+            'USER': config('DB_USER'),
+            'PASSWORD': config('DB_PASSWORD'),
+            'HOST': config('DB_HOST', default='localhost'),
+            'PORT': config('DB_PORT', default='5432'),
+        }
+    }
+
+# Text search configuration used for the task search index (PostgreSQL only)
+TASK_SEARCH_CONFIG = config('TASK_SEARCH_CONFIG', default='english')
 
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend']
+    'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+    # JSON through orjson, and MessagePack, when installed (task_manager/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'task_manager.renderers.FastJSONRenderer',
+        'task_manager.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'task_manager.renderers.FastJSONParser',
+        'task_manager.renderers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_CONTENT_NEGOTIATION_CLASS': 'task_manager.renderers.ContentNegotiation',
+}
+
+# Activity log writes are queued and bulk-inserted off the request path (activity/recorder.py).
+# Use ACTIVITY_LOG_MODE=sync to write each entry inside the request instead.
+ACTIVITY_LOG = {
+    'MODE': config('ACTIVITY_LOG_MODE', default='buffered'),
+    'BATCH_SIZE': config('ACTIVITY_LOG_BATCH_SIZE', default=200, cast=int),
+    'FLUSH_INTERVAL': config('ACTIVITY_LOG_FLUSH_INTERVAL', default=2.0, cast=float),
+}
+
+# Activity log retention (activity/archive.py): months that ended more than RETENTION_DAYS
+# ago are moved to gzip JSONL files in ARCHIVE_DIR by `manage.py archive_activity` (and the
+# daily Celery task). ARCHIVE_LOOKUP lets /tasks/<id>/logs/?include_archived=true read them.
+ACTIVITY_LOG_RETENTION = {
+    'RETENTION_DAYS': config('ACTIVITY_LOG_RETENTION_DAYS', default=180, cast=int),
+    'ARCHIVE_DIR': config('ACTIVITY_LOG_ARCHIVE_DIR', default=str(BASE_DIR / 'archive' / 'activity')),
+    'PARTITIONS_AHEAD': 2,
+    'ARCHIVE_LOOKUP': config('ACTIVITY_LOG_ARCHIVE_LOOKUP', default=True, cast=bool),
+}
+
+# Log a "retrieved" activity entry for every task detail view
+TASK_AUDIT_READS = config('TASK_AUDIT_READS', default=True, cast=bool)
+
+# Serve the task list from plain rows instead of TaskSerializer (tasks/rows.py); same JSON
+TASK_LIST_FAST_PATH = config('TASK_LIST_FAST_PATH', default=True, cast=bool)
+
+# Largest payload accepted by the /api/tasks/bulk/ endpoints
+TASK_BULK_MAX_ITEMS = config('TASK_BULK_MAX_ITEMS', default=1000, cast=int)
+
+# Rows read (and held in memory) at a time by the streaming task export (tasks/export.py)
+TASK_EXPORT_CHUNK_SIZE = config('TASK_EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# Bulk task imports (tasks/importer.py): rows per batch/transaction, where uploads wait for
+# their Celery job, and how long a running import may stall before it can be resumed
+TASK_IMPORT = {
+    'BATCH_SIZE': config('TASK_IMPORT_BATCH_SIZE', default=1000, cast=int),
+    'UPLOAD_DIR': config('TASK_IMPORT_UPLOAD_DIR', default=str(BASE_DIR / 'imports')),
+    'STALE_AFTER': config('TASK_IMPORT_STALE_AFTER', default=600, cast=int),
+}
+
+# Delta sync (tasks/sync.py, /api/tasks/changes/): changes per page, how far the last
+# cursor trails the clock, and how many days tombstones (and so cursors) are kept
+TASK_SYNC = {
+    'PAGE_SIZE': config('TASK_SYNC_PAGE_SIZE', default=500, cast=int),
+    'MAX_PAGE_SIZE': 2000,
+    'SETTLE_TIME': config('TASK_SYNC_SETTLE_TIME', default=5, cast=int),
+    'TOMBSTONE_RETENTION': config('TASK_SYNC_TOMBSTONE_RETENTION', default=90, cast=int),
+}
+
+# Task event streams (GET /api/tasks/events/ over ASGI, task_manager/broker.py). The
+# in-memory broker only reaches streams in the publishing process; use
+# task_manager.broker.RedisBroker when writes, Celery or several ASGI nodes are involved.
+TASK_EVENTS = {
+    'BROKER': config('TASK_EVENTS_BROKER', default='task_manager.broker.InMemoryBroker'),
+    'REDIS_URL': config('TASK_EVENTS_REDIS_URL', default=None),
+    'QUEUE_SIZE': config('TASK_EVENTS_QUEUE_SIZE', default=100, cast=int),
+    'HEARTBEAT': config('TASK_EVENTS_HEARTBEAT', default=15, cast=int),
+    'MAX_CONNECTIONS': config('TASK_EVENTS_MAX_CONNECTIONS', default=10000, cast=int),
+    'MAX_CONNECTIONS_PER_USER': config('TASK_EVENTS_MAX_CONNECTIONS_PER_USER', default=10, cast=int),
+}
+
+# Category/tag lookups by id and name (task_manager/lookup_cache.py). Entries live in a
+# per-process LRU unless LOOKUP_CACHE_ALIAS names a shared Django cache.
+LOOKUP_CACHE = {
+    'MAX_ENTRIES': config('LOOKUP_CACHE_MAX_ENTRIES', default=2048, cast=int),
+    'TTL': config('LOOKUP_CACHE_TTL', default=60, cast=int),
+    'CACHE_ALIAS': config('LOOKUP_CACHE_ALIAS', default=None),
 }
 
 SWAGGER_SETTINGS = {
@@ -122,6 +238,12 @@ CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
 
+# Reminder dispatch (tasks/tasks.py): rows claimed per transaction, how far back a run
+# looks for reminders that earlier runs missed, and how often a refused one is retried
+REMINDER_BATCH_SIZE = config('REMINDER_BATCH_SIZE', default=500, cast=int)
+REMINDER_CATCHUP_WINDOW = timedelta(hours=config('REMINDER_CATCHUP_HOURS', default=24, cast=int))
+REMINDER_MAX_ATTEMPTS = config('REMINDER_MAX_ATTEMPTS', default=3, cast=int)
+
 # Email
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
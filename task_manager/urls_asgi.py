@@ -0,0 +1,14 @@
+"""
+URLconf for requests served over ASGI (selected by task_manager.middleware).
+
+Identical to task_manager.urls except that the read-heavy task endpoints are answered by
+native async views first; see tasks/async_views.py.
+"""
+from django.urls import include, path
+
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path('api/tasks/', include('tasks.async_urls')),
+    *sync_urlpatterns,
+]
@@ -0,0 +1,15 @@
+# tasks/async_urls.py -- read endpoints answered by native async views under ASGI
+from django.urls import path
+from .async_views import task_detail, task_event_metrics, task_events, task_list, task_logs, task_reminders
+
+# Only UUIDs reach the detail views; every other path (stats/, bulk/, ...) falls through
+# to the TaskViewSet router in tasks/urls.py.
+urlpatterns = [
+    path("", task_list, name="task-list-async"),
+    path("reminders/", task_reminders, name="task-reminders-async"),
+    # ASGI only: Server-Sent Events need a connection held open without a thread.
+    path("events/", task_events, name="task-events"),
+    path("events/metrics/", task_event_metrics, name="task-event-metrics"),
+    path("<uuid:pk>/", task_detail, name="task-detail-async"),
+    path("<uuid:pk>/logs/", task_logs, name="task-logs-async"),
+]
@@ -0,0 +1,248 @@
+"""
+Native async handlers for the read-heavy task endpoints, served under ASGI.
+
+task_manager.middleware.AsgiUrlconfMiddleware routes ASGI requests through
+task_manager/urls_asgi.py, where GET on the task list, task detail, reminders and logs is
+answered by the coroutines below instead of running TaskViewSet in a worker thread. They
+reuse the viewset's queryset, filters, paginators and serializers, so responses are
+identical:
+- the viewset's authentication, permission and throttle classes, checked in
+  APIView.initial()'s order; authenticators with an aauthenticate() coroutine (such as
+  users.authentication.CachedJWTAuthentication) are awaited on the event loop, others
+  run in sync_to_async, as do permission and throttle checks that may query
+- TaskFilter, cursor/offset pagination, ETag/Last-Modified and read auditing as in the
+  viewset
+- content negotiation, exception handling and response headers through the viewset's
+  own DRF hooks
+Other methods on these URLs, and requests for the browsable API, are handed to
+TaskViewSet unchanged.
+
+GET /api/tasks/events/ only exists here: a Server-Sent Events stream of the user's task
+and reminder events (tasks/events.py, task_manager/broker.py). The connection holds no
+thread or database connection while idle, only a queue and a waiting coroutine; a
+comment line every HEARTBEAT seconds keeps proxies from closing it.
+GET /api/tasks/events/metrics/ reports this process's stream counters to staff users.
+
+Task, user and aggregate queries use the async ORM (aget, afirst, aaggregate, async
+iteration). Resolving filters (the category/tag lookup caches may query) and fetching a
+page through DRF's paginators still run in sync_to_async, which is also what the async
+ORM does internally.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from activity.recorder import record_activity
+from task_manager.broker import TooManyConnections, get_broker, get_config as get_events_config
+from .conditional import alist_validators, detail_validators, not_modified, set_validators
+from .models import Task
+from .views import TaskViewSet, reminder_data
+
+SAFE_METHODS = ("GET", "HEAD")
+# Permissions whose checks only look at the request, so they can run on the event loop.
+LOOP_SAFE_PERMISSIONS = (AllowAny, IsAuthenticated)
+
+
+def _view(request, actions, action, kwargs):
+    """A TaskViewSet instance prepared the way ViewSet.as_view() and APIView.initial() would."""
+    view = TaskViewSet(action_map=actions, action=action, args=(), kwargs=kwargs, format_kwarg=None)
+    for method, name in actions.items():
+        setattr(view, method, getattr(view, name))
+    if "get" in actions and "head" not in actions:
+        view.head = view.get
+    view.request = Request(request, parsers=view.get_parsers(), authenticators=view.get_authenticators(), negotiator=view.get_content_negotiator())
+    view.headers = view.default_response_headers
+    return view
+
+
+async def _authenticate(request):
+    """Request._authenticate(), awaiting authenticators that provide aauthenticate()."""
+    for authenticator in request.authenticators:
+        try:
+            if hasattr(authenticator, "aauthenticate"):
+                user_auth = await authenticator.aauthenticate(request)
+            else:
+                user_auth = await sync_to_async(authenticator.authenticate)(request)
+        except exceptions.APIException:
+            request._not_authenticated()
+            raise
+        if user_auth is not None:
+            request._authenticator = authenticator
+            request.user, request.auth = user_auth
+            return
+    request._not_authenticated()
+
+
+def _check_access(view):
+    view.check_permissions(view.request)
+    view.check_throttles(view.request)
+
+
+async def _acheck_access(view):
+    if not view.get_throttles() and all(type(permission) in LOOP_SAFE_PERMISSIONS for permission in view.get_permissions()):
+        _check_access(view)
+    else:
+        await sync_to_async(_check_access)(view)
+
+
+def _finalize(view, response):
+    # Same headers (Allow, Vary) and rendering as APIView.finalize_response; the JSON
+    # renderers don't touch the database, so this is safe on the event loop.
+    response = view.finalize_response(view.request, response)
+    return response.render() if isinstance(response, Response) else response
+
+
+def async_task_view(actions, action):
+    fallback = TaskViewSet.as_view(actions)
+
+    def decorator(handler):
+        @csrf_exempt
+        async def wrapper(request, **kwargs):
+            kwargs = {key: str(value) for key, value in kwargs.items()}
+            if request.method not in SAFE_METHODS:
+                return await sync_to_async(fallback)(request, **kwargs)
+            view = _view(request, actions, action, kwargs)
+            try:
+                renderer, media_type = view.perform_content_negotiation(view.request)
+            except exceptions.NotAcceptable:
+                renderer = None
+            if renderer is None or isinstance(renderer, BrowsableAPIRenderer):
+                # The browsable API renders forms from the database: leave it to the sync view.
+                return await sync_to_async(fallback)(request, **kwargs)
+            view.request.accepted_renderer, view.request.accepted_media_type = renderer, media_type
+            try:
+                view.request.version, view.request.versioning_scheme = view.determine_version(view.request)
+                await _authenticate(view.request)
+                await _acheck_access(view)
+                response = await handler(view, **kwargs)
+            except Exception as exc:
+                response = view.handle_exception(exc)
+            return _finalize(view, response)
+        return wrapper
+    return decorator
+
+
+@async_task_view({"get": "list", "post": "create"}, "list")
+async def task_list(view):
+    request = view.request
+    queryset = await sync_to_async(view.filter_queryset)(view.get_queryset())
+    etag, last_modified = await alist_validators(request, queryset)
+    cached = not_modified(request, etag, last_modified)
+    if cached is not None:
+        return set_validators(cached, etag, last_modified)
+    data = await sync_to_async(view.list_page)(queryset)
+    return set_validators(view.get_paginated_response(data), etag, last_modified)
+
+
+async def _get_task(view, pk):
+    try:
+        return await view.get_queryset().aget(pk=pk)
+    except (Task.DoesNotExist, ValueError, ValidationError):
+        # get_object_or_404's message, which the sync view returns.
+        raise Http404("No Task matches the given query.")
+
+
+@async_task_view({"get": "retrieve", "put": "update", "patch": "partial_update", "delete": "destroy"}, "retrieve")
+async def task_detail(view, pk):
+    request = view.request
+    if request.headers.get("If-None-Match") or request.headers.get("If-Modified-Since"):
+        updated_at = await (
+            Task.objects.filter(user=request.user, pk=pk).values_list("updated_at", flat=True).afirst()
+        )
+        if updated_at is not None:
+            etag, last_modified = detail_validators(pk, updated_at, view.selected_fields)
+            cached = not_modified(request, etag, last_modified)
+            if cached is not None:
+                return set_validators(cached, etag, last_modified)
+
+    task = await _get_task(view, pk)
+    data = view.get_serializer(task).data
+    if settings.TASK_AUDIT_READS:
+        await sync_to_async(record_activity)(task, request.user, "retrieved")
+    return set_validators(Response(data), *detail_validators(task.pk, task.updated_at, view.selected_fields))
+
+
+@async_task_view({"get": "reminders"}, "reminders")
+async def task_reminders(view):
+    return Response([reminder_data(task) async for task in view.get_reminders_queryset()])
+
+
+@async_task_view({"get": "logs"}, "logs")
+async def task_logs(view, pk):
+    task = await _get_task(view, pk)
+    paginator, data = await sync_to_async(view.logs_page)(task)
+    return paginator.get_paginated_response(data)
+
+
+async def _authenticated_user(request):
+    """(user, None), or (None, error response) when the request isn't authenticated."""
+    request = Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+    try:
+        await _authenticate(request)
+        if not request.user.is_authenticated:
+            raise exceptions.NotAuthenticated()
+    except exceptions.APIException as exc:
+        response = JsonResponse({"detail": exc.detail}, status=exc.status_code)
+        if exc.status_code == 401 and request.authenticators:
+            response["WWW-Authenticate"] = request.authenticators[0].authenticate_header(request)
+        return None, response
+    return request.user, None
+
+
+async def _event_stream(broker, subscription):
+    heartbeat = get_events_config()["HEARTBEAT"]
+    try:
+        # EventSource clients reconnect after `retry` ms; "ready" marks the point from which
+        # events are delivered, so a client syncs through /changes/ after receiving it.
+        yield "retry: 5000\nevent: ready\ndata: {}\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if event is None:
+                return
+            event_type, data = event
+            yield f"event: {event_type}\ndata: {data}\n\n"
+    finally:
+        # Also reached when the client disconnects (the response task is cancelled).
+        broker.unsubscribe(subscription)
+
+
+@csrf_exempt
+async def task_events(request):
+    if request.method != "GET":
+        return JsonResponse({"detail": f'Method "{request.method}" not allowed.'}, status=405, headers={"Allow": "GET"})
+    user, error = await _authenticated_user(request)
+    if error is not None:
+        return error
+    broker = get_broker()
+    try:
+        subscription = broker.subscribe(user.pk)
+    except TooManyConnections as exc:
+        return JsonResponse({"detail": str(exc)}, status=429 if exc.per_user else 503)
+    response = StreamingHttpResponse(_event_stream(broker, subscription), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Ask nginx-style proxies not to buffer the stream.
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+async def task_event_metrics(request):
+    user, error = await _authenticated_user(request)
+    if error is not None:
+        return error
+    if not user.is_staff:
+        return JsonResponse({"detail": exceptions.PermissionDenied.default_detail}, status=403)
+    return JsonResponse(get_broker().metrics())
@@ -0,0 +1,178 @@
+"""
+Bulk create/update/delete for tasks.
+
+Every item is validated with BulkTaskSerializer in a single pass, and the categories and
+tags referenced by the whole payload are checked against the lookup caches (one query
+each for whatever isn't cached yet). Valid items are
+then written in one transaction with bulk_create/bulk_update, together with their tag
+links and activity entries. Invalid items are reported by index. With atomic=True any
+error rejects the whole batch and nothing is written.
+"""
+import uuid
+
+from django.db import transaction
+from django.utils import timezone
+
+from activity.models import ActivityLog
+from activity.recorder import record_activities
+from categories.cache import category_cache
+from tags.cache import tag_cache
+from . import stats
+from .models import Task, stats_snapshot
+from .search import get_search_backend
+from .serializers import BulkTaskSerializer
+from .signals import batch_deletes
+from .tagging import REPLACE, diff_tags
+
+TaskTag = Task.tags.through
+
+WRITE_BATCH_SIZE = 500
+
+
+def _error(index, errors):
+    return {"index": index, "errors": errors}
+
+
+def _as_uuid(value):
+    try:
+        return uuid.UUID(str(value))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def _validate(items, context, instances=None):
+    """Return ([(index, instance, validated_data)], errors). `instances` switches to partial updates."""
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append(_error(index, {"non_field_errors": ["Expected an object."]}))
+            continue
+        instance = None
+        if instances is not None:
+            instance = instances.get(_as_uuid(item.get("id")))
+            if instance is None:
+                errors.append(_error(index, {"id": ["Task not found."]}))
+                continue
+        serializer = BulkTaskSerializer(instance, data=item, partial=instance is not None, context=context)
+        if serializer.is_valid():
+            valid.append((index, instance, serializer.validated_data))
+        else:
+            errors.append(_error(index, serializer.errors))
+
+    category_ids = {data["category_id"] for _, _, data in valid if data.get("category_id")}
+    tag_ids = {tag_id for _, _, data in valid for tag_id in data.get("tag_ids", [])}
+    known_categories = category_cache.get_many(category_ids)
+    known_tags = tag_cache.get_many(tag_ids)
+
+    checked = []
+    for index, instance, data in valid:
+        item_errors = {}
+        if data.get("category_id") and data["category_id"] not in known_categories:
+            item_errors["category_id"] = ["Category not found."]
+        missing = [str(tag_id) for tag_id in data.get("tag_ids", []) if tag_id not in known_tags]
+        if missing:
+            item_errors["tag_ids"] = [f"Tags not found: {missing}"]
+        if item_errors:
+            errors.append(_error(index, item_errors))
+        else:
+            checked.append((index, instance, data))
+
+    errors.sort(key=lambda error: error["index"])
+    return checked, errors
+
+
+def _tag_links(task_tag_ids):
+    return [
+        TaskTag(task_id=task_id, tag_id=tag_id)
+        for task_id, tag_ids in task_tag_ids.items()
+        for tag_id in dict.fromkeys(tag_ids)
+    ]
+
+
+def bulk_create_tasks(items, user, context, atomic=False):
+    """Create tasks from a list payload. Returns (created tasks, errors)."""
+    valid, errors = _validate(items, context)
+    if not valid or (atomic and errors):
+        return [], errors
+
+    tasks, task_tag_ids = [], {}
+    for _, _, data in valid:
+        data = dict(data)
+        tag_ids = data.pop("tag_ids", [])
+        data.setdefault("reminder_sent", False)
+        task = Task(user=user, **data)
+        tasks.append(task)
+        if tag_ids:
+            task_tag_ids[task.pk] = tag_ids
+
+    with transaction.atomic(), stats.batch():
+        Task.objects.bulk_create(tasks, batch_size=WRITE_BATCH_SIZE)
+        TaskTag.objects.bulk_create(_tag_links(task_tag_ids), batch_size=WRITE_BATCH_SIZE)
+        for task in tasks:
+            stats.record_change(user.pk, None, stats_snapshot(task))
+        get_search_backend().index([task.pk for task in tasks])
+        record_activities(
+            ActivityLog(task=task, user=user, action="created", details={"title": task.title})
+            for task in tasks
+        )
+    return tasks, errors
+
+
+def bulk_update_tasks(items, user, context, atomic=False):
+    """
+    Partially update tasks from a list of objects carrying their "id". `tag_ids`, when
+    given, replaces the task's tags (only the links that change are written). Returns (updated tasks, errors).
+    """
+    ids = {_as_uuid(item.get("id")) for item in items if isinstance(item, dict)}
+    instances = {task.pk: task for task in Task.objects.filter(user=user, pk__in=ids - {None})}
+    valid, errors = _validate(items, context, instances=instances)
+    if not valid or (atomic and errors):
+        return [], errors
+
+    now = timezone.now()
+    fields, task_tag_ids, updated = {"updated_at"}, {}, {}
+    logs = []
+    for index, task, data in valid:
+        data = dict(data)
+        if "tag_ids" in data:
+            task_tag_ids[task.pk] = data.pop("tag_ids")
+        for attr, value in data.items():
+            setattr(task, attr, value)
+        # bulk_update bypasses save(), so auto_now has to be applied by hand.
+        task.updated_at = now
+        fields.update(data)
+        updated[task.pk] = task
+        logs.append(ActivityLog(task=task, user=user, action="updated", details={"updated_fields": items[index]}))
+
+    tasks = list(updated.values())
+    with transaction.atomic(), stats.batch():
+        Task.objects.bulk_update(tasks, sorted(fields), batch_size=WRITE_BATCH_SIZE)
+        for task in tasks:
+            stats.record_change(user.pk, task._stats_snapshot, stats_snapshot(task))
+        if task_tag_ids:
+            diff_tags(task_tag_ids, REPLACE)
+        get_search_backend().index(updated)
+        record_activities(logs)
+    return tasks, errors
+
+
+def bulk_delete_tasks(ids, user, atomic=False):
+    """Delete the user's tasks with the given ids. Returns (deleted ids, errors)."""
+    errors, wanted = [], {}
+    for index, value in enumerate(ids):
+        task_id = _as_uuid(value)
+        if task_id is None:
+            errors.append(_error(index, {"id": ["Must be a valid UUID."]}))
+        else:
+            wanted[task_id] = index
+    found = set(Task.objects.filter(user=user, pk__in=wanted).values_list("pk", flat=True))
+    errors.extend(_error(index, {"id": ["Task not found."]}) for task_id, index in wanted.items() if task_id not in found)
+    errors.sort(key=lambda error: error["index"])
+    if not found or (atomic and errors):
+        return [], errors
+
+    # Deletes go through model signals (one per task); batch() sums their counter deltas
+    # and batch_deletes() writes their tombstones and search removals together.
+    with transaction.atomic(), stats.batch(), batch_deletes():
+        Task.objects.filter(user=user, pk__in=found).delete()
+    return [task_id for task_id in wanted if task_id in found], errors
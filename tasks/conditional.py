@@ -0,0 +1,89 @@
+"""
+Conditional GET (ETag / Last-Modified) for the task endpoints.
+
+Validators are derived from Task.updated_at so an unchanged resource can be answered with
+304 before anything is serialized:
+- detail: the task's id and updated_at (one indexed single-row lookup), plus the sparse
+  fieldset if one was requested
+- list: max(updated_at) and count over the filtered queryset, plus the user's latest
+  TaskTombstone, so a deletion changes the validator even though it leaves no row behind
+
+Everything that changes what a task serializes to must bump updated_at: save() does it
+via auto_now, and the bulk/queryset update paths set it explicitly.
+
+Last-Modified has whole-second precision, so it is only sent once the newest change is
+in a past second: otherwise a write later in that same second would be answered with a
+stale 304 to If-Modified-Since. The ETag carries full precision and is always sent.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .models import TaskTombstone
+
+
+def _etag(*parts):
+    digest = hashlib.md5("|".join(str(part) for part in parts).encode(), usedforsecurity=False).hexdigest()
+    return f'"{digest}"'
+
+
+def _last_modified(stamp):
+    """`stamp` as a Last-Modified value, or None while it is within the current second."""
+    if stamp is None or int(stamp.timestamp()) >= int(timezone.now().timestamp()):
+        return None
+    return stamp
+
+
+def list_validators(request, queryset):
+    """(etag, last_modified) for a filtered task list; the query string is part of the tag."""
+    stats = queryset.order_by().aggregate(last_updated=Max("updated_at"), count=Count("pk"))
+    last_deleted = TaskTombstone.objects.filter(user=request.user).aggregate(last=Max("deleted_at"))["last"]
+    return _list_validators(request, stats, last_deleted)
+
+
+async def alist_validators(request, queryset):
+    """list_validators() through the async ORM."""
+    stats = await queryset.order_by().aaggregate(last_updated=Max("updated_at"), count=Count("pk"))
+    last_deleted = (await TaskTombstone.objects.filter(user=request.user).aaggregate(last=Max("deleted_at")))["last"]
+    return _list_validators(request, stats, last_deleted)
+
+
+def _list_validators(request, stats, last_deleted):
+    changes = [stamp for stamp in (stats["last_updated"], last_deleted) if stamp is not None]
+    last_modified = _last_modified(max(changes)) if changes else None
+    etag = _etag(
+        request.user.pk,
+        request.get_full_path(),
+        stats["count"],
+        stats["last_updated"] and stats["last_updated"].isoformat(),
+        last_deleted and last_deleted.isoformat(),
+    )
+    return etag, last_modified
+
+
+def detail_validators(task_id, updated_at, fields=None):
+    # A sparse fieldset (?fields=/?exclude=) is a different representation: tag it apart.
+    if fields is None:
+        return _etag(task_id, updated_at.isoformat()), _last_modified(updated_at)
+    return _etag(task_id, updated_at.isoformat(), ",".join(fields)), _last_modified(updated_at)
+
+
+def not_modified(request, etag, last_modified):
+    """Return a 304 (or 412) response if the request's preconditions allow it, else None."""
+    return get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+
+
+def set_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    # Responses are per user and must be revalidated on every poll.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
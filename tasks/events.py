@@ -0,0 +1,47 @@
+"""
+Task events for push clients (GET /api/tasks/events/, served under ASGI by
+tasks/async_views.py), fanned out per user through task_manager/broker.py.
+
+Events carry ids, not task bodies: clients fetch what they need (the task, or
+/api/tasks/changes/), so fan-out stays cheap and the stream never holds stale copies.
+- task.created / task.updated / task.deleted: {"task_ids": [...]}
+- reminder.due: {"task_id": ..., "title": ..., "remind_at": ...}
+- resync: events were dropped for this connection; catch up through /api/tasks/changes/
+
+Events are published when the writing transaction commits, and on a best-effort basis:
+a broker failure is logged, never raised into the write.
+"""
+import logging
+
+from django.db import transaction
+
+from task_manager.broker import get_broker
+
+logger = logging.getLogger(__name__)
+
+CREATED = "task.created"
+UPDATED = "task.updated"
+DELETED = "task.deleted"
+REMINDER_DUE = "reminder.due"
+
+
+def _send(user_id, event_type, data):
+    try:
+        get_broker().publish(user_id, event_type, data)
+    except Exception:
+        logger.exception("Could not publish %s for user %s", event_type, user_id)
+
+
+def publish(user_id, event_type, data):
+    """Publish an event to `user_id`'s streams once the current transaction commits."""
+    transaction.on_commit(lambda: _send(user_id, event_type, data))
+
+
+def tasks_changed(user_id, event_type, task_ids):
+    task_ids = [str(task_id) for task_id in task_ids]
+    if task_ids:
+        publish(user_id, event_type, {"task_ids": task_ids})
+
+
+def reminder_due(user_id, task_id, title, remind_at):
+    publish(user_id, REMINDER_DUE, {"task_id": str(task_id), "title": title, "remind_at": remind_at.isoformat()})
@@ -0,0 +1,72 @@
+"""
+Sparse fieldsets for the task list and detail: ?fields=id,title,status,due_date keeps only
+those fields, ?exclude=description drops fields (both take comma-separated names and may
+be combined).
+
+The selection trims TaskSerializer's output and narrows the query to the columns the
+chosen fields read: only() for model instances, values() on the list's fast path
+(tasks/rows.py). The category is only joined for category_name, and tag links are only
+loaded for tag_names.
+"""
+from rest_framework.exceptions import ValidationError
+
+# TaskSerializer's fields, in its output order.
+FIELDS = (
+    "id", "category_name", "tag_names", "title", "status", "priority", "description", "due_date",
+    "remind_at", "reminder_sent",
+)
+
+# The column each field reads. tag_names comes from the tags relation, loaded separately.
+COLUMNS = {
+    "id": "id",
+    "category_name": "category__name",
+    "tag_names": None,
+    "title": "title",
+    "status": "status",
+    "priority": "priority",
+    "description": "description",
+    "due_date": "due_date",
+    "remind_at": "remind_at",
+    "reminder_sent": "reminder_sent",
+}
+
+# Always loaded: pagination orders on created_at and ETags read updated_at.
+REQUIRED_COLUMNS = ("id", "created_at", "updated_at")
+
+
+def _names(params, key):
+    return [name.strip() for value in params.getlist(key) for name in value.split(",") if name.strip()]
+
+
+def selected_fields(params):
+    """The fields picked by ?fields= and ?exclude=, in FIELDS order; None if neither is given."""
+    if "fields" not in params and "exclude" not in params:
+        return None
+    included, excluded = _names(params, "fields"), _names(params, "exclude")
+    errors = {}
+    for key, names in (("fields", included), ("exclude", excluded)):
+        unknown = [name for name in names if name not in COLUMNS]
+        if unknown:
+            errors[key] = [f"Unknown fields: {', '.join(unknown)}. Choose from: {', '.join(FIELDS)}."]
+    if errors:
+        raise ValidationError(errors)
+    chosen = set(included or FIELDS) - set(excluded)
+    return tuple(name for name in FIELDS if name in chosen)
+
+
+def columns(fields=None):
+    """The columns to load for `fields` (None: every field)."""
+    fields = FIELDS if fields is None else fields
+    return REQUIRED_COLUMNS + tuple(
+        COLUMNS[name] for name in fields if COLUMNS[name] and COLUMNS[name] not in REQUIRED_COLUMNS
+    )
+
+
+def narrow(queryset, fields):
+    """`queryset` loading only what TaskSerializer needs to render `fields`."""
+    queryset = queryset.only(*columns(fields))
+    if "category_name" in fields:
+        queryset = queryset.select_related("category")
+    if "tag_names" in fields:
+        queryset = queryset.prefetch_related("tags")
+    return queryset
@@ -1,17 +1,76 @@
-import django_filters
-from django.db.models import Q
+from django.db.models import Count, Exists, OuterRef
+from django_filters.rest_framework import FilterSet, CharFilter, DateFilter, ChoiceFilter
+from categories.cache import category_cache
+from tags.cache import tag_cache
 from .models import Task
+from .search import get_search_backend
 
-class TaskFilter(django_filters.FilterSet):
-    due_before = django_filters.DateFilter(field_name="due_date", lookup_expr="lte")
-    due_after = django_filters.DateFilter(field_name="due_date", lookup_expr="gte")
-    search = django_filters.CharFilter(method='filter_search', label='Search title/description')
+
+class TaskFilter(FilterSet):
+    """
+    Explicit/structured filters for tasks list endpoint.
+    - priority, status: Choice filters using Task model choices
+    - category: match by category name (case-insensitive)
+    - tags: comma-separated tag names -> tasks that have any of these tags
+    - tags_mode: "any" (default) or "all" -> tasks that have every listed tag
+    - due_before, due_after: date filters against due_date
+    - search: full-text search over title, description, tag and category names,
+      ordered by relevance (see tasks/search.py)
+    """
+    TAGS_MODE_CHOICES = [("any", "any"), ("all", "all")]
+
+    # Choice validation already requires an exact match, so compare exactly and let the
+    # user/status indexes apply; iexact would wrap the column in UPPER().
+    priority = ChoiceFilter(field_name="priority", choices=Task.PRIORITY_CHOICES)
+    status = ChoiceFilter(field_name="status", choices=Task.STATUS_CHOICES)
+    category = CharFilter(method='filter_category')
+    tags = CharFilter(method='filter_tags')  # comma-separated names
+    tags_mode = ChoiceFilter(choices=TAGS_MODE_CHOICES, method='filter_tags_mode')
+    due_before = DateFilter(field_name="due_date", lookup_expr="lte")
+    due_after = DateFilter(field_name="due_date", lookup_expr="gte")
+    search = CharFilter(method='filter_search', label='Search title/description/tags/category')
 
     class Meta:
         model = Task
-        fields = ['priority', 'status', 'due_before', 'due_after']
+        fields = ["priority", "status", "category", "tags", "tags_mode", "due_before", "due_after", "search"]
+
+    def filter_category(self, queryset, name, value):
+        # Names resolve to ids through the lookup cache, so the task query needs no join.
+        category_ids = category_cache.ids_for_name(value)
+        if not category_ids:
+            return queryset.none()
+        return queryset.filter(category_id__in=category_ids)
+
+    def filter_tags(self, queryset, name, value):
+        # allow comma-separated tag names: ?tags=Urgent,Important
+        names = {t.strip() for t in value.split(",") if t.strip()}
+        if not names:
+            return queryset
+        ids_by_name = tag_cache.ids_for_names(names)
+        tag_ids = [tag_id for ids in ids_by_name.values() for tag_id in ids]
+        all_mode = self.form.cleaned_data.get("tags_mode") == "all"
+        if not tag_ids or (all_mode and not all(ids_by_name.values())):
+            return queryset.none()
+        task_tags = Task.tags.through.objects.filter(tag_id__in=tag_ids)
+        if all_mode:
+            # One grouped pass over the through table: tasks linked to every requested tag.
+            # Tag names are unique, so matching all of them means one link row per name.
+            matching = (
+                task_tags.values("task_id")
+                .annotate(matched=Count("tag_id"))
+                .filter(matched=len(names))
+                .values("task_id")
+            )
+            return queryset.filter(pk__in=matching)
+        # Semi-join: each task appears once however many of its tags match, so no DISTINCT.
+        return queryset.filter(Exists(task_tags.filter(task_id=OuterRef("pk"))))
+
+    def filter_tags_mode(self, queryset, name, value):
+        # Only changes how `tags` is applied; see filter_tags.
+        return queryset
 
     def filter_search(self, queryset, name, value):
-        return queryset.filter(
-            Q(title__icontains=value) | Q(description__icontains=value)
-        )
+        value = value.strip()
+        if not value:
+            return queryset
+        return get_search_backend(queryset.db).search(queryset, value)
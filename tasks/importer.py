@@ -0,0 +1,259 @@
+"""
+Bulk import of tasks from CSV or NDJSON files (POST /api/tasks/imports/ and
+`manage.py import_tasks`).
+
+The file is read row by row and processed BATCH_SIZE rows at a time:
+- rows are validated with TaskImportRowSerializer; rejected rows are stored as
+  TaskImportError entries (the per-row error report) and the import carries on
+- category and tag names are resolved through a name -> id map kept for the whole import;
+  names it hasn't seen yet are looked up through the lookup caches, and created if missing
+- tasks and tag links are written with bulk_create, together with their counters, search
+  index entries and activity entries, in one transaction per batch
+
+The same transaction advances TaskImport.rows_read, the checkpoint: a resumed import skips
+the rows up to it and carries on with the first uncommitted batch. The checkpoint only
+moves from the value the runner started the batch at, so if two runners end up on the
+same import, the one that falls behind rolls its batch back (ImportConflict) instead of
+creating the same tasks again.
+
+Columns are the ones `manage.py export_tasks` writes; `category`/`category_name` and
+`tags`/`tag_names` hold names (comma-separated in CSV). Other columns are ignored.
+"""
+import csv
+import json
+import os
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from activity.models import ActivityLog
+from activity.recorder import record_activities
+from categories.cache import category_cache
+from categories.models import Category
+from tags.cache import tag_cache
+from tags.models import Tag
+from . import stats
+from .models import Task, TaskImport, TaskImportError, stats_snapshot
+from .search import get_search_backend
+from .serializers import TaskImportRowSerializer
+
+TaskTag = Task.tags.through
+
+DEFAULTS = {
+    "BATCH_SIZE": 1000,    # rows validated and written per transaction
+    "UPLOAD_DIR": None,    # where uploaded files are kept until their import completes
+    "STALE_AFTER": 600,    # seconds without progress before a running import may be resumed
+}
+
+EXTENSIONS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+ALIASES = {"category": "category_name", "tags": "tag_names"}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "TASK_IMPORT", {})}
+
+
+class ImportConflict(Exception):
+    """Another runner has moved the import's checkpoint since this one read it."""
+
+
+def detect_format(filename):
+    return EXTENSIONS.get(Path(filename).suffix.lower())
+
+
+def _item(row):
+    for alias, name in ALIASES.items():
+        if alias in row and name not in row:
+            row[name] = row.pop(alias)
+    return row
+
+
+def _csv_item(row):
+    # Empty cells mean "not given", so optional columns fall back to their defaults.
+    row = {key: value for key, value in row.items() if key and value not in ("", None)}
+    row = _item(row)
+    if "tag_names" in row:
+        row["tag_names"] = [name for name in (part.strip() for part in row["tag_names"].split(",")) if name]
+    return row
+
+
+def read_rows(path, import_format, after=0):
+    """
+    Yield (row number, item) for the rows of a file after row `after`. Rows are numbered
+    from 1: data rows for CSV, lines for NDJSON. `item` is a dict, or an error message.
+    """
+    with open(path, newline="", encoding="utf-8-sig") as source:
+        if import_format == "csv":
+            for number, row in enumerate(csv.DictReader(source), 1):
+                if number > after:
+                    yield number, _csv_item(row)
+            return
+        for number, line in enumerate(source, 1):
+            if number <= after or not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError as exc:
+                yield number, f"Invalid JSON: {exc}"
+                continue
+            yield number, _item(item) if isinstance(item, dict) else "Expected an object."
+
+
+class NameMap:
+    """name -> id for the categories or tags of one import, creating the ones that are missing."""
+
+    def __init__(self, model, cache):
+        self.model = model
+        self.cache = cache
+        self.ids = {}
+
+    def _key(self, name):
+        return name.lower() if self.cache.case_insensitive else name
+
+    def resolve(self, names):
+        unseen = {self._key(name): name for name in names if self._key(name) not in self.ids}
+        if not unseen:
+            return
+        found = self.cache.ids_for_names(unseen.values())
+        missing = [name for name in unseen.values() if not found.get(name)]
+        if missing:
+            # Concurrent imports may create the same names: ignore the conflicts and read back.
+            self.model.objects.bulk_create([self.model(name=name) for name in missing], ignore_conflicts=True)
+            found.update(self.cache.ids_for_names(missing))
+        for name, ids in found.items():
+            if ids:
+                self.ids[self._key(name)] = ids[0]
+
+    def get(self, name):
+        return self.ids[self._key(name)]
+
+
+def _batches(rows, size):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def _write_batch(task_import, batch, categories, tags):
+    user = task_import.user
+    valid, errors = [], []
+    for number, item in batch:
+        if not isinstance(item, dict):
+            errors.append(TaskImportError(task_import=task_import, row=number, errors={"non_field_errors": [item]}))
+            continue
+        serializer = TaskImportRowSerializer(data=item)
+        if serializer.is_valid():
+            valid.append(serializer.validated_data)
+        else:
+            errors.append(TaskImportError(task_import=task_import, row=number, errors=serializer.errors))
+
+    # Categories and tags are created outside the batch transaction, so a batch that
+    # rolls back can't leave ids in the maps that no longer exist.
+    categories.resolve({data["category_name"] for data in valid if data.get("category_name")})
+    tags.resolve({name for data in valid for name in data.get("tag_names", [])})
+
+    tasks, links = [], []
+    for data in valid:
+        data = dict(data)
+        category_name = data.pop("category_name", None)
+        tag_names = data.pop("tag_names", [])
+        task = Task(user=user, category_id=categories.get(category_name) if category_name else None, **data)
+        tasks.append(task)
+        links.extend(TaskTag(task_id=task.pk, tag_id=tag_id) for tag_id in dict.fromkeys(map(tags.get, tag_names)))
+
+    with transaction.atomic(), stats.batch():
+        # Compare-and-set: also locks the row, so a concurrent runner's batch waits here and
+        # then finds the checkpoint moved.
+        advanced = TaskImport.objects.filter(pk=task_import.pk, rows_read=task_import.rows_read).update(
+            rows_read=batch[-1][0],
+            created=F("created") + len(tasks),
+            failed=F("failed") + len(errors),
+            updated_at=timezone.now(),
+        )
+        if not advanced:
+            raise ImportConflict(f"Import {task_import.pk} was advanced past row {task_import.rows_read} by another runner.")
+        Task.objects.bulk_create(tasks, batch_size=task_import.batch_size)
+        TaskTag.objects.bulk_create(links, batch_size=task_import.batch_size)
+        for task in tasks:
+            stats.record_change(user.pk, None, stats_snapshot(task))
+        get_search_backend().index([task.pk for task in tasks])
+        record_activities(
+            ActivityLog(task=task, user=user, action="created", details={"title": task.title, "import": str(task_import.pk)})
+            for task in tasks
+        )
+        TaskImportError.objects.bulk_create(errors, batch_size=task_import.batch_size)
+    task_import.rows_read = batch[-1][0]
+    task_import.created += len(tasks)
+    task_import.failed += len(errors)
+
+
+def _set_status(task_import, status, error=""):
+    task_import.status = status
+    task_import.error = error
+    task_import.finished_at = timezone.now() if status in (TaskImport.COMPLETED, TaskImport.FAILED) else None
+    task_import.save(update_fields=["status", "error", "finished_at", "updated_at"])
+
+
+def run_import(task_import, progress=None):
+    """
+    Import `task_import`'s file from its checkpoint to the end. `progress(task_import)` is
+    called after every committed batch. Errors mark the import failed and are re-raised;
+    an ImportConflict leaves its status to the runner that holds it.
+    """
+    _set_status(task_import, TaskImport.RUNNING)
+    categories, tags = NameMap(Category, category_cache), NameMap(Tag, tag_cache)
+    try:
+        rows = read_rows(task_import.source, task_import.format, after=task_import.rows_read)
+        for batch in _batches(rows, task_import.batch_size):
+            _write_batch(task_import, batch, categories, tags)
+            if progress is not None:
+                progress(task_import)
+    except ImportConflict:
+        raise
+    except Exception as exc:
+        _set_status(task_import, TaskImport.FAILED, f"{type(exc).__name__}: {exc}")
+        raise
+    _set_status(task_import, TaskImport.COMPLETED)
+    return task_import
+
+
+def is_resumable(task_import, now=None):
+    """Failed imports can be resumed, and queued or running ones that stopped making progress."""
+    if task_import.status == TaskImport.FAILED:
+        return True
+    if task_import.status == TaskImport.COMPLETED:
+        return False
+    now = now or timezone.now()
+    return (now - task_import.updated_at).total_seconds() > get_config()["STALE_AFTER"]
+
+
+def save_upload(uploaded_file, user, import_format, batch_size=None):
+    """Store an uploaded file in UPLOAD_DIR and create its (pending) TaskImport."""
+    config = get_config()
+    if not config["UPLOAD_DIR"]:
+        raise ImproperlyConfigured("settings.TASK_IMPORT['UPLOAD_DIR'] must be set to accept uploads.")
+    upload_dir = Path(config["UPLOAD_DIR"])
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    task_import = TaskImport(user=user, format=import_format, batch_size=batch_size or config["BATCH_SIZE"])
+    task_import.source = str(upload_dir / f"{task_import.pk}.{import_format}")
+    with open(task_import.source, "wb") as out:
+        for chunk in uploaded_file.chunks():
+            out.write(chunk)
+    task_import.save()
+    return task_import
+
+
+def discard_upload(task_import):
+    """Delete the stored upload of a completed import (files imported from the shell are left alone)."""
+    upload_dir = get_config()["UPLOAD_DIR"]
+    if upload_dir and Path(task_import.source).parent == Path(upload_dir):
+        try:
+            os.remove(task_import.source)
+        except FileNotFoundError:
+            pass
+
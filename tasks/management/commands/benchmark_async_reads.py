@@ -0,0 +1,164 @@
+import asyncio
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from activity.models import ActivityLog
+from tags.models import Tag
+from tasks.models import Task
+from users.models import User
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare throughput and tail latency of the task read endpoints served synchronously "
+        "(WSGI, a thread per request) and by the native async views (ASGI)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500, help="Requests per mode (default 500)")
+        parser.add_argument("--concurrency", type=int, default=50, help="Requests in flight (default 50)")
+        parser.add_argument("--tasks", type=int, default=200, help="Tasks to seed for the benchmark user (default 200)")
+        parser.add_argument(
+            "--db-latency", type=float, default=0.0,
+            help="Milliseconds added to every query, to simulate a database across the network",
+        )
+        parser.add_argument("--wsgi-url", help="Benchmark a running WSGI server at this base URL instead of in-process")
+        parser.add_argument("--asgi-url", help="Benchmark a running ASGI server at this base URL instead of in-process")
+
+    def handle(self, *args, **options):
+        if bool(options["wsgi_url"]) != bool(options["asgi_url"]):
+            raise CommandError("Pass both --wsgi-url and --asgi-url, or neither.")
+        if options["concurrency"] < 1 or options["requests"] < 1:
+            raise CommandError("--requests and --concurrency must be positive.")
+
+        # The benchmark user and its data are committed (the requests run on other threads
+        # and connections) and deleted again at the end.
+        user, paths = self._seed(options["tasks"])
+        token = str(AccessToken.for_user(user))
+        try:
+            if options["db_latency"]:
+                self._add_db_latency(options["db_latency"] / 1000)
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"], TASK_AUDIT_READS=False):
+                if options["wsgi_url"]:
+                    results = {
+                        "sync (WSGI)": self._run_http(options["wsgi_url"], paths, token, options),
+                        "async (ASGI)": self._run_http(options["asgi_url"], paths, token, options),
+                    }
+                else:
+                    results = {
+                        "sync (WSGI)": self._run_sync(paths, token, options),
+                        "async (ASGI)": asyncio.run(self._run_async(paths, token, options)),
+                    }
+        finally:
+            connection_created.disconnect(dispatch_uid="benchmark_db_latency")
+            user.delete()
+
+        self.stdout.write(
+            f"{options['requests']} requests per mode, concurrency {options['concurrency']}, "
+            f"{options['db_latency']:g} ms added per query"
+        )
+        self.stdout.write(f"{'mode':<14}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'errors':>8}")
+        for mode, (elapsed, latencies, errors) in results.items():
+            latencies = sorted(latencies)
+            self.stdout.write(
+                f"{mode:<14}{len(latencies) / elapsed:>9.1f}"
+                f"{percentile(latencies, 0.50) * 1000:>9.1f}{percentile(latencies, 0.95) * 1000:>9.1f}"
+                f"{percentile(latencies, 0.99) * 1000:>9.1f}{latencies[-1] * 1000:>9.1f}{errors:>8}"
+            )
+
+    def _seed(self, count):
+        user = User.objects.create_user(
+            email=f"benchmark-{uuid.uuid4().hex[:12]}@example.com", password=uuid.uuid4().hex,
+            username=f"benchmark-{uuid.uuid4().hex[:12]}",
+        )
+        tags = [Tag.objects.get_or_create(name=f"benchmark-{i}")[0] for i in range(3)]
+        tasks = Task.objects.bulk_create(
+            Task(user=user, title=f"Benchmark task {i}", status="Incomplete", priority="Medium",
+                 remind_at="2999-01-01T00:00:00Z")
+            for i in range(count)
+        )
+        Task.tags.through.objects.bulk_create(
+            Task.tags.through(task_id=task.pk, tag_id=tags[i % len(tags)].pk) for i, task in enumerate(tasks)
+        )
+        ActivityLog.objects.bulk_create(ActivityLog(task=task, user=user, action="created") for task in tasks)
+        task_id = tasks[0].pk
+        paths = [
+            "/api/tasks/",
+            "/api/tasks/?status=Incomplete&tags=benchmark-1",
+            f"/api/tasks/{task_id}/",
+            "/api/tasks/reminders/",
+            f"/api/tasks/{task_id}/logs/",
+        ]
+        return user, paths
+
+    def _add_db_latency(self, seconds):
+        def slow(execute, sql, params, many, context):
+            time.sleep(seconds)
+            return execute(sql, params, many, context)
+
+        # Every connection opened from now on, on any thread, sleeps before each query.
+        connection_created.connect(
+            lambda connection, **kwargs: connection.execute_wrappers.append(slow),
+            dispatch_uid="benchmark_db_latency", weak=False,
+        )
+        connection.execute_wrappers.append(slow)
+
+    def _run_sync(self, paths, token, options):
+        headers = {"Authorization": f"Bearer {token}"}
+
+        def fetch(i):
+            started = time.perf_counter()
+            response = Client().get(paths[i % len(paths)], headers=headers)
+            return time.perf_counter() - started, response.status_code != 200
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            outcomes = list(pool.map(fetch, range(options["requests"])))
+        return time.perf_counter() - started, [lat for lat, _ in outcomes], sum(err for _, err in outcomes)
+
+    async def _run_async(self, paths, token, options):
+        headers = {"Authorization": f"Bearer {token}"}
+        client, slots = AsyncClient(), asyncio.Semaphore(options["concurrency"])
+
+        async def fetch(i):
+            async with slots:
+                started = time.perf_counter()
+                response = await client.get(paths[i % len(paths)], headers=headers)
+                return time.perf_counter() - started, response.status_code != 200
+
+        started = time.perf_counter()
+        outcomes = await asyncio.gather(*(fetch(i) for i in range(options["requests"])))
+        return time.perf_counter() - started, [lat for lat, _ in outcomes], sum(err for _, err in outcomes)
+
+    def _run_http(self, base_url, paths, token, options):
+        headers = {"Authorization": f"Bearer {token}"}
+
+        def fetch(i):
+            started = time.perf_counter()
+            try:
+                with urlopen(Request(base_url.rstrip("/") + paths[i % len(paths)], headers=headers)) as response:
+                    response.read()
+                    failed = response.status != 200
+            except (HTTPError, OSError):
+                failed = True
+            return time.perf_counter() - started, failed
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            outcomes = list(pool.map(fetch, range(options["requests"])))
+        return time.perf_counter() - started, [lat for lat, _ in outcomes], sum(err for _, err in outcomes)
@@ -0,0 +1,97 @@
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from categories.models import Category
+from tags.models import Tag
+from tasks import rows as task_rows
+from tasks.models import Task
+from tasks.serializers import TaskSerializer
+from users.models import User
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare serializing the task list with TaskSerializer and with the values()-based "
+        "fast path (tasks/rows.py). Benchmark data is created in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", default="1000,10000", help="Comma-separated numbers of tasks to serialize (default 1000,10000)",
+        )
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per size and path; the median is reported (default 5)")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options["sizes"].split(",")]
+        except ValueError as exc:
+            raise CommandError("--sizes must be comma-separated integers.") from exc
+        if options["repeat"] < 1 or any(size < 1 for size in sizes):
+            raise CommandError("--sizes and --repeat must be positive.")
+
+        self.stdout.write(f"Median of {options['repeat']} runs: query + serialization + JSON rendering")
+        self.stdout.write(f"{'tasks':>8}{'serializer ms':>15}{'fast path ms':>14}{'speedup':>9}")
+        try:
+            with transaction.atomic():
+                queryset = self._seed(max(sizes))
+                for size in sizes:
+                    self._compare(queryset.order_by("-created_at", "-id")[:size], size, options["repeat"])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def _seed(self, count):
+        user = User.objects.create_user(
+            email=f"benchmark-{uuid.uuid4().hex[:12]}@example.com", password=uuid.uuid4().hex,
+            username=f"benchmark-{uuid.uuid4().hex[:12]}",
+        )
+        categories = [Category.objects.get_or_create(name=f"benchmark-{i}")[0] for i in range(5)]
+        tags = [Tag.objects.get_or_create(name=f"benchmark-{i}")[0] for i in range(5)]
+        tasks = Task.objects.bulk_create(
+            (
+                Task(user=user, title=f"Benchmark task {i}", description="Benchmark" if i % 2 else None,
+                     status="Incomplete", priority="Medium", category=categories[i % 6] if i % 6 < 5 else None,
+                     due_date="2999-01-01T00:00:00Z", remind_at="2998-12-31T09:30:00Z")
+                for i in range(count)
+            ),
+            batch_size=1000,
+        )
+        Task.tags.through.objects.bulk_create(
+            (
+                Task.tags.through(task_id=task.pk, tag_id=tag.pk)
+                for i, task in enumerate(tasks) for tag in tags[:i % 3]
+            ),
+            batch_size=1000,
+        )
+        return Task.objects.filter(user=user)
+
+    def _compare(self, page, size, repeat):
+        def with_serializer():
+            tasks = page.select_related("category").prefetch_related("tags")
+            return JSONRenderer().render(TaskSerializer(tasks, many=True).data)
+
+        def with_fast_path():
+            return JSONRenderer().render(task_rows.serialize(task_rows.project(page)))
+
+        if with_serializer() != with_fast_path():
+            raise CommandError(f"The fast path's output differs from TaskSerializer's for {size} tasks.")
+        slow = self._time(with_serializer, repeat)
+        fast = self._time(with_fast_path, repeat)
+        self.stdout.write(f"{size:>8}{slow * 1000:>15.1f}{fast * 1000:>14.1f}{slow / fast:>8.1f}x")
+
+    def _time(self, function, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings)
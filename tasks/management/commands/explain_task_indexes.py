@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from tasks.filters import TaskFilter
+from tasks.models import Task
+from tasks.pagination import TaskCursorPagination
+from tasks.tasks import due_reminders
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the task list filters and the reminder scan and check that each one is served "
+        "by its index from Task.Meta.indexes. On PostgreSQL sequential scans are disabled for "
+        "the check, so the result doesn't depend on how much data the database holds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--verbose-plans", action="store_true", help="Print the full plan for every query")
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        page_size = TaskCursorPagination.page_size
+        ordering = TaskCursorPagination.ordering
+
+        def task_list(**params):
+            # Same filtering and ordering the list endpoint applies for one user.
+            queryset = TaskFilter(params, queryset=Task.objects.filter(user_id=1)).qs
+            return queryset.order_by(*ordering)[:page_size]
+
+        checks = [
+            ("list", task_list(), "task_user_created_idx"),
+            ("list ?status=", task_list(status="Completed"), "task_user_status_idx"),
+            ("list ?status=&priority=", task_list(status="Incomplete", priority="High"), "task_user_status_prio_idx"),
+            ("list ?due_before=", task_list(due_before=now.date().isoformat()), "task_user_due_idx"),
+            ("list ?due_after=", task_list(due_after=now.date().isoformat()), "task_user_due_idx"),
+            ("reminders endpoint", Task.objects.filter(user_id=1, remind_at__isnull=False, remind_at__gte=now), "task_user_remind_idx"),
+            ("send_due_reminders", due_reminders(now, now + timezone.timedelta(minutes=1)), "task_remind_pending_idx"),
+        ]
+
+        missing = []
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+            for label, queryset, index in checks:
+                plan = queryset.explain()
+                used = index in plan
+                style = self.style.SUCCESS if used else self.style.ERROR
+                self.stdout.write(style(f"{label}: {'uses' if used else 'does NOT use'} {index}"))
+                if options["verbose_plans"] or not used:
+                    self.stdout.write(plan)
+                if not used:
+                    missing.append(label)
+
+        if missing:
+            raise CommandError(f"Queries not using their index: {', '.join(missing)}")
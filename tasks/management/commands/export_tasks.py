@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.http import QueryDict
+
+from tasks import export
+from tasks.filters import TaskFilter
+from tasks.models import Task
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream tasks as NDJSON or CSV to a file or stdout, in constant memory. "
+        "Filters take the same names and values as the /api/tasks/ query parameters."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Only this user's tasks (email); default is every user, with a user_id column")
+        parser.add_argument("--format", choices=list(export.FORMATS), default=export.NDJSON, dest="export_format")
+        parser.add_argument("--output", "-o", help="File to write (default stdout)")
+        parser.add_argument("--chunk-size", type=int, help="Rows per chunk (default settings.TASK_EXPORT_CHUNK_SIZE)")
+        parser.add_argument(
+            "--filter", action="append", default=[], metavar="NAME=VALUE",
+            help="A TaskFilter parameter, e.g. --filter status=Incomplete --filter tags=work,home (repeatable)",
+        )
+
+    def handle(self, *args, **options):
+        queryset = Task.objects.all()
+        if options["user"]:
+            try:
+                queryset = queryset.filter(user=User.objects.get(email=options["user"]))
+            except User.DoesNotExist:
+                raise CommandError(f"No user with email {options['user']!r}.")
+
+        params = QueryDict(mutable=True)
+        for item in options["filter"]:
+            name, sep, value = item.partition("=")
+            if not sep:
+                raise CommandError(f"--filter expects NAME=VALUE, got {item!r}.")
+            params[name] = value
+        filterset = TaskFilter(params, queryset=queryset)
+        unknown = set(params) - set(filterset.filters)
+        if unknown:
+            raise CommandError(f"Unknown filters: {', '.join(sorted(unknown))}.")
+        if not filterset.is_valid():
+            raise CommandError(f"Invalid filters: {filterset.errors.as_json()}")
+
+        chunks = export.stream_tasks(
+            filterset.qs, options["export_format"], options["chunk_size"], include_user=not options["user"],
+        )
+        if not options["output"]:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+        with open(options["output"], "w", newline="", encoding="utf-8") as out:
+            for chunk in chunks:
+                out.write(chunk)
@@ -0,0 +1,95 @@
+import json
+import time
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks import importer
+from tasks.models import TaskImport
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Import tasks for a user from a CSV or NDJSON file, in batches, with a resumable "
+        "checkpoint. Rejected rows are recorded per row and can be written out with --error-report."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("file", nargs="?", help="CSV or NDJSON file to import")
+        parser.add_argument("--user", help="Email of the user who will own the tasks")
+        parser.add_argument("--format", choices=["csv", "ndjson"], dest="import_format", help="Default: from the file extension")
+        parser.add_argument("--batch-size", type=int, help="Rows per batch (default settings.TASK_IMPORT['BATCH_SIZE'])")
+        parser.add_argument("--resume", metavar="IMPORT_ID", help="Continue an earlier import from its checkpoint")
+        parser.add_argument("--error-report", metavar="PATH", help="Write the rejected rows as NDJSON to this file")
+
+    def handle(self, *args, **options):
+        if options["resume"]:
+            try:
+                task_import = TaskImport.objects.select_related("user").get(pk=options["resume"])
+            except (TaskImport.DoesNotExist, ValidationError):
+                raise CommandError(f"No import with id {options['resume']!r}.")
+            if task_import.status == TaskImport.COMPLETED:
+                raise CommandError(f"Import {task_import.pk} is already complete.")
+            if not importer.is_resumable(task_import):
+                raise CommandError(
+                    f"Import {task_import.pk} is {task_import.status} and made progress at {task_import.updated_at:%Y-%m-%d %H:%M:%S}; "
+                    f"it can be resumed once it has been idle for {importer.get_config()['STALE_AFTER']} seconds."
+                )
+            if options["batch_size"]:
+                task_import.batch_size = options["batch_size"]
+                task_import.save(update_fields=["batch_size"])
+            self.stdout.write(f"Resuming import {task_import.pk} after row {task_import.rows_read}.")
+        else:
+            task_import = self._create(options)
+            self.stdout.write(f"Started import {task_import.pk} (resume with --resume {task_import.pk}).")
+
+        started, start_row = time.monotonic(), task_import.rows_read
+
+        def progress(task_import):
+            elapsed = time.monotonic() - started
+            rate = (task_import.rows_read - start_row) / elapsed if elapsed else 0.0
+            self.stdout.write(
+                f"  row {task_import.rows_read}: {task_import.created} created, "
+                f"{task_import.failed} rejected ({rate:.0f} rows/s)"
+            )
+
+        try:
+            importer.run_import(task_import, progress=progress)
+        except importer.ImportConflict as exc:
+            raise CommandError(f"{exc} Stopped; the other runner carries on.") from exc
+        except Exception as exc:
+            raise CommandError(f"Import {task_import.pk} failed at row {task_import.rows_read + 1}: {exc}") from exc
+        finally:
+            if options["error_report"]:
+                self._write_errors(task_import, options["error_report"])
+
+        importer.discard_upload(task_import)
+        self.stdout.write(self.style.SUCCESS(
+            f"Import {task_import.pk} complete: {task_import.created} tasks created, {task_import.failed} rows rejected."
+        ))
+
+    def _create(self, options):
+        if not options["file"] or not options["user"]:
+            raise CommandError("Pass a file and --user, or --resume IMPORT_ID.")
+        path = Path(options["file"]).resolve()
+        if not path.is_file():
+            raise CommandError(f"{path} is not a file.")
+        import_format = options["import_format"] or importer.detect_format(path.name)
+        if import_format is None:
+            raise CommandError("Could not tell the format from the file name; pass --format.")
+        try:
+            user = User.objects.get(email=options["user"])
+        except User.DoesNotExist:
+            raise CommandError(f"No user with email {options['user']!r}.")
+        return TaskImport.objects.create(
+            user=user, format=import_format, source=str(path),
+            batch_size=options["batch_size"] or importer.get_config()["BATCH_SIZE"],
+        )
+
+    def _write_errors(self, task_import, path):
+        with open(path, "w", encoding="utf-8") as out:
+            for row, errors in task_import.row_errors.order_by("row").values_list("row", "errors").iterator():
+                out.write(json.dumps({"row": row, "errors": errors}) + "\n")
+        self.stdout.write(f"Rejected rows written to {path}.")
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from tasks.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search documents for every task."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        backend = get_search_backend(options["database"])
+        backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt task search index ({type(backend).__name__})."))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks import stats
+
+
+class Command(BaseCommand):
+    help = "Recount the per-user task statistics (TaskCounter) from the tasks table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, action="append", dest="users", help="Only this user id (repeatable)")
+        parser.add_argument(
+            "--check", action="store_true",
+            help="Only report counters that drifted from the tasks table; exit non-zero if any did",
+        )
+
+    def handle(self, *args, **options):
+        users = options["users"]
+        if options["check"]:
+            expected = stats.compute_counters(users)
+            stored = stats.stored_counters(users)
+            drifted = sorted(
+                (key, stored.get(key, 0), expected.get(key, 0))
+                for key in expected.keys() | stored.keys()
+                if stored.get(key, 0) != expected.get(key, 0)
+            )
+            for (user_id, dimension, key), have, want in drifted:
+                self.stdout.write(f"user {user_id} {dimension}={key or '-'}: stored {have}, actual {want}")
+            if drifted:
+                raise CommandError(f"{len(drifted)} counters drifted; run without --check to rebuild.")
+            self.stdout.write(self.style.SUCCESS("Task counters match the tasks table."))
+            return
+
+        written = stats.rebuild(users)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} task counters."))
@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.db import migrations
+
+# The search table as of this migration; tasks/search.py maintains it from here on.
+# Everything is spelled out rather than imported so later changes to that module can't
+# change what this migration does.
+CREATE_SQL = {
+    "postgresql": [
+        """
+        CREATE TABLE tasks_task_search (
+            task_id uuid PRIMARY KEY REFERENCES tasks_task (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+            document tsvector NOT NULL
+        )
+        """,
+        "CREATE INDEX tasks_task_search_document_idx ON tasks_task_search USING gin (document)",
+    ],
+    "sqlite": [
+        """
+        CREATE VIRTUAL TABLE tasks_task_search USING fts5(
+            task_id UNINDEXED, title, tags, category, description, tokenize = 'porter unicode61'
+        )
+        """,
+    ],
+}
+
+# Index the tasks that already exist.
+BACKFILL_SQL = {
+    "postgresql": """
+        INSERT INTO tasks_task_search (task_id, document)
+        SELECT t.id,
+               setweight(to_tsvector(%(config)s::regconfig, coalesce(t.title, '')), 'A') ||
+               setweight(to_tsvector(%(config)s::regconfig, coalesce(string_agg(tg.name, ' '), '')), 'B') ||
+               setweight(to_tsvector(%(config)s::regconfig, coalesce(c.name, '')), 'B') ||
+               setweight(to_tsvector(%(config)s::regconfig, coalesce(t.description, '')), 'C')
+        FROM tasks_task t
+        LEFT JOIN categories_category c ON c.id = t.category_id
+        LEFT JOIN tasks_task_tags tt ON tt.task_id = t.id
+        LEFT JOIN tags_tag tg ON tg.id = tt.tag_id
+        GROUP BY t.id, c.name
+    """,
+    "sqlite": """
+        INSERT INTO tasks_task_search (task_id, title, tags, category, description)
+        SELECT t.id, t.title, coalesce(group_concat(tg.name, ' '), ''), coalesce(c.name, ''),
+               coalesce(t.description, '')
+        FROM tasks_task t
+        LEFT JOIN categories_category c ON c.id = t.category_id
+        LEFT JOIN tasks_task_tags tt ON tt.task_id = t.id
+        LEFT JOIN tags_tag tg ON tg.id = tt.tag_id
+        GROUP BY t.id
+    """,
+}
+
+
+def create_search_table(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in CREATE_SQL:
+        return
+    for statement in CREATE_SQL[vendor]:
+        schema_editor.execute(statement)
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(BACKFILL_SQL[vendor], {"config": settings.TASK_SEARCH_CONFIG} if vendor == "postgresql" else None)
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor in CREATE_SQL:
+        schema_editor.execute("DROP TABLE IF EXISTS tasks_task_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0001_initial'),
+        ('tags', '0001_initial'),
+        ('tasks', '0005_task_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
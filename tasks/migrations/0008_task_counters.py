@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_existing_tasks(apps, schema_editor):
+    # Same recount as tasks.stats.rebuild(), on the historical models, so counters start
+    # out matching the tasks that already exist.
+    Task = apps.get_model('tasks', 'Task')
+    TaskCounter = apps.get_model('tasks', 'TaskCounter')
+    db = schema_editor.connection.alias
+    counters = []
+    for dimension, field in (('status', 'status'), ('priority', 'priority'), ('category', 'category_id')):
+        for row in Task.objects.using(db).order_by().values('user_id', field).annotate(n=Count('pk')):
+            key = row[field]
+            counters.append(TaskCounter(user_id=row['user_id'], dimension=dimension, key=str(key) if key else '', count=row['n']))
+    TaskCounter.objects.using(db).bulk_create(counters, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_task_tombstones'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('status', 'Status'), ('priority', 'Priority'), ('category', 'Category')], max_length=20)),
+                ('key', models.CharField(blank=True, max_length=64)),
+                ('count', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='task_counters', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'dimension', 'key'), name='task_counter_unique')],
+            },
+        ),
+        migrations.RunPython(count_existing_tasks, migrations.RunPython.noop),
+    ]
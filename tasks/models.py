@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from categories.models import Category
 from tags.models import Tag
 import uuid
@@ -24,9 +25,12 @@ class Task(models.Model):
     due_date = models.DateTimeField(null=True, blank=True)
     remind_at = models.DateTimeField(null=True, blank=True)
     reminder_sent = models.BooleanField(default=False)
+    # Failed sends of this reminder; dispatch gives up after REMINDER_MAX_ATTEMPTS.
+    reminder_attempts = models.PositiveSmallIntegerField(default=0)
 
     # Relationships
-    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='tasks')
+    # No standalone index: user_id leads every composite index in Meta.indexes.
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='tasks', db_index=False)
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True)
     tags = models.ManyToManyField(Tag, blank=True)
 
@@ -36,6 +40,149 @@ class Task(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        # Every API query is scoped by user first; see `manage.py explain_task_indexes`.
+        indexes = [
+            # default list ordering / cursor pagination
+            models.Index(fields=['user', '-created_at', '-id'], name='task_user_created_idx'),
+            # ?status= (open/completed tasks in list order)
+            models.Index(fields=['user', 'status', '-created_at', '-id'], name='task_user_status_idx'),
+            # ?status=&priority=
+            models.Index(fields=['user', 'status', 'priority', '-created_at', '-id'], name='task_user_status_prio_idx'),
+            # ?due_before= / ?due_after=
+            models.Index(fields=['user', 'due_date'], name='task_user_due_idx'),
+            # /tasks/reminders/
+            models.Index(fields=['user', 'remind_at'], condition=models.Q(remind_at__isnull=False), name='task_user_remind_idx'),
+            # list validators (max updated_at per user) for conditional GET; delta sync
+            # (/tasks/changes/) pages through it in (updated_at, id) order
+            models.Index(fields=['user', 'updated_at', 'id'], name='task_user_updated_idx'),
+            # send_due_reminders only ever looks at reminders that haven't gone out yet
+            models.Index(fields=['remind_at'], condition=models.Q(reminder_sent=False), name='task_remind_pending_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the counted dimensions as loaded, so saves/deletes can update
+        # TaskCounter by difference (see tasks/stats.py).
+        if STATS_FIELDS.issubset(field_names):
+            instance._stats_snapshot = stats_snapshot(instance)
+        return instance
 
     def __str__(self):
         return self.title
+
+
+STATS_FIELDS = {'status', 'priority', 'category_id'}
+
+
+def stats_snapshot(task):
+    """The TaskCounter keys a task contributes to: {dimension: key}."""
+    return {
+        TaskCounter.STATUS: task.status,
+        TaskCounter.PRIORITY: task.priority,
+        TaskCounter.CATEGORY: str(task.category_id or ''),
+    }
+
+
+class TaskCounter(models.Model):
+    """
+    Per-user task counts by status, priority and category, maintained incrementally on
+    every task write so /api/tasks/stats/ never scans tasks. `key` is the status or
+    priority value, or the category id ('' for uncategorized).
+    """
+    STATUS = 'status'
+    PRIORITY = 'priority'
+    CATEGORY = 'category'
+    DIMENSION_CHOICES = [
+        (STATUS, 'Status'),
+        (PRIORITY, 'Priority'),
+        (CATEGORY, 'Category'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='task_counters', db_index=False)
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES)
+    key = models.CharField(max_length=64, blank=True)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'dimension', 'key'], name='task_counter_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.dimension}={self.key}: {self.count}"
+
+
+class TaskTombstone(models.Model):
+    """
+    Marks a hard-deleted task, so clients that cache task lists can tell that something
+    disappeared (see tasks/conditional.py) and delta sync can report it (tasks/sync.py).
+    """
+    task_id = models.UUIDField()
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='task_tombstones', db_index=False)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'deleted_at', 'task_id'], name='tombstone_user_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id} deleted at {self.deleted_at}"
+
+
+class TaskImport(models.Model):
+    """
+    One bulk import of tasks from a CSV or NDJSON file (tasks/importer.py). `rows_read` is
+    the checkpoint: the number of input rows whose batches have been committed, so an
+    interrupted import resumes from the next row.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (COMPLETED, 'Completed'),
+        (FAILED, 'Failed'),
+    ]
+    FORMAT_CHOICES = [
+        ('csv', 'CSV'),
+        ('ndjson', 'NDJSON'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='task_imports')
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    source = models.CharField(max_length=500)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    batch_size = models.PositiveIntegerField()
+    rows_read = models.PositiveBigIntegerField(default=0)
+    created = models.PositiveBigIntegerField(default=0)
+    failed = models.PositiveBigIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Import {self.id} ({self.status}, {self.rows_read} rows)"
+
+
+class TaskImportError(models.Model):
+    """A rejected input row of a TaskImport: its 1-based row number and the validation errors."""
+    task_import = models.ForeignKey(TaskImport, on_delete=models.CASCADE, related_name='row_errors', db_index=False)
+    row = models.PositiveBigIntegerField()
+    errors = models.JSONField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['task_import', 'row'], name='task_import_error_row_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task_import_id} row {self.row}"
@@ -0,0 +1,30 @@
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+
+class TaskCursorPagination(CursorPagination):
+    """
+    Keyset pagination for the task list.
+    - Ordered by -created_at with id as a tiebreaker, matching Task.Meta.ordering
+    - The cursor encodes a position instead of an offset, so every page costs the same
+      and rows inserted between requests don't shift or duplicate results
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class TaskOffsetPagination(LimitOffsetPagination):
+    """
+    Classic ?limit=&offset= pagination, kept as an opt-in for older clients.
+    """
+    default_limit = 50
+    max_limit = 500
+
+
+class TaskImportErrorPagination(CursorPagination):
+    """Keyset pagination for an import's error report, in input row order."""
+    ordering = ('row', 'id')
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
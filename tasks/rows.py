@@ -0,0 +1,64 @@
+"""
+Read-only fast path for the task list (settings.TASK_LIST_FAST_PATH).
+
+TaskSerializer builds a field tree per request and walks it for every task. For reads
+the list needs none of that: `project()` selects just the serialized columns (with the
+category name joined in) as dicts, and `serialize()` turns a page of them into the same
+JSON shape as TaskSerializer, fetching every tag name of the page with one query.
+
+Both take the request's sparse fieldset (tasks/fieldsets.py): unselected columns aren't
+read, and the category join and the tag query only happen when their field is selected.
+"""
+from rest_framework import serializers
+
+from . import fieldsets
+from .models import Task
+
+TaskTag = Task.tags.through
+
+# Only used for its to_representation(): the same formatting and timezone handling as
+# the serializer's DateTimeFields.
+_datetime = serializers.DateTimeField()
+
+# Fields that TaskSerializer converts; the others are copied as they are.
+CONVERTERS = {
+    "id": str,
+    "due_date": _datetime.to_representation,
+    "remind_at": _datetime.to_representation,
+}
+
+
+def project(queryset, fields=None):
+    """The task queryset as plain rows; keeps its filters and ordering."""
+    return queryset.values(*fieldsets.columns(fields))
+
+
+def _tag_names(rows):
+    tag_names = {row["id"]: [] for row in rows}
+    if tag_names:
+        for task_id, name in TaskTag.objects.filter(task_id__in=list(tag_names)).values_list("task_id", "tag__name"):
+            tag_names[task_id].append(name)
+    return tag_names
+
+
+def serialize(rows, fields=None):
+    """TaskSerializer(many=True).data for rows from project(), as plain dicts."""
+    fields = fieldsets.FIELDS if fields is None else fields
+    tag_names = _tag_names(rows) if "tag_names" in fields else {}
+    plan = [(name, fieldsets.COLUMNS[name], CONVERTERS.get(name)) for name in fields]
+    data = []
+    for row in rows:
+        item = {}
+        for name, column, convert in plan:
+            if column is None:
+                item[name] = tag_names[row["id"]]
+                continue
+            value = row[column]
+            if value is None:
+                # Like TaskSerializer, which skips category_name for tasks without a category.
+                if name != "category_name":
+                    item[name] = None
+            else:
+                item[name] = convert(value) if convert else value
+        data.append(item)
+    return data
@@ -0,0 +1,183 @@
+"""
+Full-text search over tasks.
+
+Each task's title, description, tag names and category name are kept in a search table
+next to tasks_task (created by migration 0006) and queried with the database's own
+full-text engine:
+- PostgreSQL: a weighted tsvector per task with a GIN index, ranked by ts_rank_cd
+- SQLite: an FTS5 virtual table, ranked by bm25 (local setups and tests)
+Any other database falls back to icontains matching on title/description.
+
+The table is maintained from tasks/signals.py; bulk writers that bypass model signals
+must call `get_search_backend().index(task_ids)` themselves.
+"""
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import F, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.fields import FloatField
+
+SEARCH_TABLE = "tasks_task_search"
+
+# SQLite caps the number of bound parameters per statement.
+BATCH_SIZE = 500
+
+
+def _batches(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), BATCH_SIZE):
+        yield ids[start:start + BATCH_SIZE]
+
+
+class BaseSearchBackend:
+    def __init__(self, using="default"):
+        self.using = using
+
+    @property
+    def connection(self):
+        return connections[self.using]
+
+    def index(self, task_ids):
+        """(Re)build the search documents for the given tasks."""
+
+    def remove(self, task_ids):
+        """Drop the search documents for deleted tasks."""
+
+    def rebuild(self):
+        """Rebuild the search documents for every task."""
+
+    def search(self, queryset, value):
+        """Filter `queryset` to tasks matching `value`, ordered by relevance."""
+        raise NotImplementedError
+
+
+class IContainsSearchBackend(BaseSearchBackend):
+    def search(self, queryset, value):
+        return queryset.filter(Q(title__icontains=value) | Q(description__icontains=value))
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    DOCUMENT_SQL = f"""
+        INSERT INTO {SEARCH_TABLE} (task_id, document)
+        SELECT t.id,
+               setweight(to_tsvector(%(config)s::regconfig, coalesce(t.title, '')), 'A') ||
+               setweight(to_tsvector(%(config)s::regconfig, coalesce(string_agg(tg.name, ' '), '')), 'B') ||
+               setweight(to_tsvector(%(config)s::regconfig, coalesce(c.name, '')), 'B') ||
+               setweight(to_tsvector(%(config)s::regconfig, coalesce(t.description, '')), 'C')
+        FROM tasks_task t
+        LEFT JOIN categories_category c ON c.id = t.category_id
+        LEFT JOIN tasks_task_tags tt ON tt.task_id = t.id
+        LEFT JOIN tags_tag tg ON tg.id = tt.tag_id
+        {{where}}
+        GROUP BY t.id, c.name
+        ON CONFLICT (task_id) DO UPDATE SET document = EXCLUDED.document
+    """
+
+    @property
+    def config(self):
+        return settings.TASK_SEARCH_CONFIG
+
+    def index(self, task_ids):
+        with self.connection.cursor() as cursor:
+            for batch in _batches(task_ids):
+                cursor.execute(
+                    self.DOCUMENT_SQL.format(where="WHERE t.id = ANY(%(ids)s)"),
+                    {"config": self.config, "ids": batch},
+                )
+
+    def remove(self, task_ids):
+        # Rows go with their task through ON DELETE CASCADE.
+        pass
+
+    def rebuild(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(self.DOCUMENT_SQL.format(where=""), {"config": self.config})
+
+    def search(self, queryset, value):
+        params = [self.config, value]
+        matches = RawSQL(
+            f"SELECT task_id FROM {SEARCH_TABLE} WHERE document @@ websearch_to_tsquery(%s::regconfig, %s)",
+            params,
+        )
+        rank = RawSQL(
+            f"SELECT ts_rank_cd(document, websearch_to_tsquery(%s::regconfig, %s)) "
+            f'FROM {SEARCH_TABLE} WHERE task_id = "tasks_task"."id"',
+            params,
+            output_field=FloatField(),
+        )
+        return (
+            queryset.filter(pk__in=matches)
+            .annotate(search_rank=rank)
+            .order_by(F("search_rank").desc(), "-created_at", "-id")
+        )
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    DOCUMENT_SQL = f"""
+        INSERT INTO {SEARCH_TABLE} (task_id, title, tags, category, description)
+        SELECT t.id, t.title, coalesce(group_concat(tg.name, ' '), ''), coalesce(c.name, ''),
+               coalesce(t.description, '')
+        FROM tasks_task t
+        LEFT JOIN categories_category c ON c.id = t.category_id
+        LEFT JOIN tasks_task_tags tt ON tt.task_id = t.id
+        LEFT JOIN tags_tag tg ON tg.id = tt.tag_id
+        {{where}}
+        GROUP BY t.id
+    """
+    # bm25 column weights: task_id (unindexed), title, tags, category, description
+    RANK = f"bm25({SEARCH_TABLE}, 0, 10.0, 5.0, 5.0, 1.0)"
+
+    def _delete(self, cursor, batch):
+        placeholders = ", ".join(["%s"] * len(batch))
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE task_id IN ({placeholders})", batch)
+
+    def index(self, task_ids):
+        with self.connection.cursor() as cursor:
+            for batch in _batches(pk.hex for pk in task_ids):
+                self._delete(cursor, batch)
+                placeholders = ", ".join(["%s"] * len(batch))
+                cursor.execute(self.DOCUMENT_SQL.format(where=f"WHERE t.id IN ({placeholders})"), batch)
+
+    def remove(self, task_ids):
+        with self.connection.cursor() as cursor:
+            for batch in _batches(pk.hex for pk in task_ids):
+                self._delete(cursor, batch)
+
+    def rebuild(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+            cursor.execute(self.DOCUMENT_SQL.format(where=""))
+
+    def search(self, queryset, value):
+        # Quote every word so user input can't inject FTS5 query syntax; each word must
+        # match (as a prefix) somewhere in the document.
+        terms = re.findall(r"\w+", value)
+        if not terms:
+            return queryset.none()
+        match = " ".join(f'"{term}"*' for term in terms)
+        matches = RawSQL(f"SELECT task_id FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s", [match])
+        # bm25() is lower-is-better.
+        rank = RawSQL(
+            f"SELECT -{self.RANK} FROM {SEARCH_TABLE} "
+            f'WHERE {SEARCH_TABLE} MATCH %s AND task_id = "tasks_task"."id"',
+            [match],
+            output_field=FloatField(),
+        )
+        return (
+            queryset.filter(pk__in=matches)
+            .annotate(search_rank=rank)
+            .order_by(F("search_rank").desc(), "-created_at", "-id")
+        )
+
+
+BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SQLiteSearchBackend,
+}
+
+
+def get_search_backend(using="default"):
+    vendor = connections[using].vendor
+    return BACKENDS.get(vendor, IContainsSearchBackend)(using)
@@ -1,9 +1,13 @@
 from rest_framework import serializers
 from activity.models import Task, ActivityLog
-from categories.serializers import CategorySerializer
-from tags.serializers import TagSerializer
 from categories.models import Category
+from categories.serializers import CategorySerializer
 from tags.models import Tag
+from tags.serializers import TagSerializer
+from categories.cache import category_cache
+from tags.cache import tag_cache
+from .models import TaskImport, TaskImportError
+from .tagging import MODES, REPLACE
 
 class TaskSerializer(serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
@@ -15,8 +19,15 @@ class TaskSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Task
-        exclude = ('category', 'tags', 'user', 'created_at', 'updated_at')
-        read_only_fields = ('id', 'user', 'created_at', 'updated_at','reminder_sent')
+        exclude = ('category', 'tags', 'user', 'created_at', 'updated_at', 'reminder_attempts')
+        read_only_fields = ('id', 'user', 'created_at', 'updated_at','reminder_sent', 'reminder_attempts')
+
+    def __init__(self, *args, fields=None, **kwargs):
+        # fields: a sparse fieldset (tasks/fieldsets.py); the other fields are dropped.
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
 
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
@@ -46,6 +57,46 @@ class TaskSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+class BulkTaskSerializer(TaskSerializer):
+    """One item of a bulk create/update payload: TaskSerializer plus category and tag ids."""
+    category_id = serializers.UUIDField(required=False, allow_null=True, write_only=True)
+    tag_ids = serializers.ListField(child=serializers.UUIDField(), required=False, write_only=True)
+
+
+class TaskImportRowSerializer(TaskSerializer):
+    """One row of an import file: TaskSerializer plus the category and tags by name."""
+    category_name = serializers.CharField(
+        required=False, allow_null=True, allow_blank=True, max_length=Category._meta.get_field("name").max_length,
+    )
+    tag_names = serializers.ListField(
+        child=serializers.CharField(max_length=Tag._meta.get_field("name").max_length), required=False,
+    )
+
+
+class TaskImportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TaskImport
+        fields = [
+            "id", "format", "status", "batch_size", "rows_read", "created", "failed", "error",
+            "created_at", "updated_at", "finished_at",
+        ]
+        read_only_fields = fields
+
+
+class TaskImportUploadSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    import_format = serializers.ChoiceField(
+        choices=TaskImport.FORMAT_CHOICES, required=False, help_text="Defaults to the file extension",
+    )
+    batch_size = serializers.IntegerField(required=False, min_value=1, max_value=10000)
+
+
+class TaskImportErrorSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TaskImportError
+        fields = ["row", "errors"]
+
+
 class ActivityLogSerializer(serializers.ModelSerializer):
     task_title = serializers.SerializerMethodField()
     user_email = serializers.SerializerMethodField()
@@ -63,10 +114,12 @@ class ActivityLogSerializer(serializers.ModelSerializer):
 class TaskCategorySerializer(serializers.Serializer):
     category_id = serializers.UUIDField()
 
-    def validate_category_id(self, value):
-        if not Category.objects.filter(id=value).exists():
-            raise serializers.ValidationError("Category not found.")
-        return value
+    def validate(self, attrs):
+        category = category_cache.get(attrs["category_id"])
+        if category is None:
+            raise serializers.ValidationError({"category_id": ["Category not found."]})
+        attrs["category"] = category
+        return attrs
 
 
 class TaskTagSerializer(serializers.Serializer):
@@ -74,8 +127,27 @@ class TaskTagSerializer(serializers.Serializer):
         child=serializers.UUIDField(), allow_empty=False
     )
 
-    def validate_tags(self, value):
-        missing = [tag_id for tag_id in value if not Tag.objects.filter(id=tag_id).exists()]
+    def validate(self, attrs):
+        # The resolved Tags travel on in validated_data["tag_objects"].
+        found = tag_cache.get_many(attrs["tags"])
+        missing = [tag_id for tag_id in attrs["tags"] if tag_id not in found]
         if missing:
-            raise serializers.ValidationError(f"Tags not found: {missing}")
-        return value
\ No newline at end of file
+            raise serializers.ValidationError({"tags": [f"Tags not found: {missing}"]})
+        attrs["tag_objects"] = [found[tag_id] for tag_id in dict.fromkeys(attrs["tags"])]
+        return attrs
+
+
+class TaskTagReplaceSerializer(TaskTagSerializer):
+    """The new tag set of a task; an empty list clears its tags."""
+    tags = serializers.ListField(child=serializers.UUIDField(), allow_empty=True)
+
+
+class BulkTaskTagSerializer(TaskTagReplaceSerializer):
+    task_ids = serializers.ListField(child=serializers.UUIDField(), allow_empty=False)
+    mode = serializers.ChoiceField(choices=MODES)
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        if not attrs["tags"] and attrs["mode"] != REPLACE:
+            raise serializers.ValidationError({"tags": ["This list may not be empty."]})
+        return attrs
@@ -0,0 +1,165 @@
+import threading
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from categories.models import Category
+from tags.models import Tag
+from . import stats
+from .models import Task, TaskTombstone, stats_snapshot
+from .search import get_search_backend
+
+_local = threading.local()
+
+
+@contextmanager
+def batch_deletes(using="default"):
+    """
+    Collect the search removals and tombstones of the tasks deleted inside the block and
+    write them at the end: one batched remove() and one bulk_create, instead of a query or
+    two per task. Used by queryset deletes (tasks/bulk.py); a single delete writes its own.
+    """
+    if getattr(_local, "deleted", None) is not None:
+        yield
+        return
+    _local.deleted, _local.tombstones = [], []
+    try:
+        yield
+        get_search_backend(using).remove(_local.deleted)
+        TaskTombstone.objects.using(using).bulk_create(_local.tombstones, batch_size=500)
+    finally:
+        _local.deleted = _local.tombstones = None
+
+
+# -------- SEARCH INDEX --------
+@receiver(post_save, sender=Task)
+def index_task(sender, instance, raw=False, using="default", **kwargs):
+    if not raw:
+        get_search_backend(using).index([instance.pk])
+
+
+@receiver(post_delete, sender=Task)
+def unindex_task(sender, instance, using="default", **kwargs):
+    deleted = getattr(_local, "deleted", None)
+    if deleted is not None:
+        deleted.append(instance.pk)
+    else:
+        get_search_backend(using).remove([instance.pk])
+
+
+@receiver(m2m_changed, sender=Task.tags.through)
+def index_task_tags(sender, instance, action, reverse, pk_set, using="default", **kwargs):
+    if reverse and action == "pre_clear":
+        # tag.task_set.clear(): remember the tasks before the links disappear.
+        instance._search_task_ids = list(instance.task_set.values_list("pk", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        task_ids = [instance.pk]
+    elif action == "post_clear":
+        task_ids = getattr(instance, "_search_task_ids", [])
+    else:
+        task_ids = pk_set
+    get_search_backend(using).index(task_ids)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Tag)
+def index_renamed(sender, instance, created, raw=False, using="default", update_fields=None, **kwargs):
+    if created or raw or (update_fields is not None and "name" not in update_fields):
+        return
+    # The name as stored before this save, loaded by the lookup cache's pre_save handler
+    # (task_manager/lookup_cache.py). Saves that keep the name leave the tasks alone.
+    if getattr(instance, "_lookup_cache_name", None) == instance.name:
+        return
+    tasks = Task.objects.using(using)
+    if sender is Category:
+        tasks = tasks.filter(category=instance)
+    else:
+        tasks = tasks.filter(tags=instance)
+    task_ids = list(tasks.values_list("pk", flat=True))
+    # category_name/tag_names changed for these tasks: bump updated_at so cached
+    # copies (ETag/Last-Modified) are revalidated.
+    Task.objects.using(using).filter(pk__in=task_ids).update(updated_at=timezone.now())
+    get_search_backend(using).index(task_ids)
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Tag)
+def remember_tasks_before_delete(sender, instance, using="default", **kwargs):
+    # The tasks lose this category/tag through SET_NULL or a cascade on the through
+    # table, neither of which fires task signals.
+    tasks = Task.objects.using(using)
+    if sender is Category:
+        tasks = tasks.filter(category=instance)
+    else:
+        tasks = tasks.filter(tags=instance)
+    instance._search_task_ids = list(tasks.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Tag)
+def index_after_delete(sender, instance, using="default", **kwargs):
+    task_ids = getattr(instance, "_search_task_ids", [])
+    Task.objects.using(using).filter(pk__in=task_ids).update(updated_at=timezone.now())
+    get_search_backend(using).index(task_ids)
+
+
+def _deleting_user(origin):
+    # The user's tombstones and counters are cascade-deleted along with them; rows written
+    # for the user now would point at a deleted user.
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model is get_user_model()
+
+
+# -------- TOMBSTONES --------
+@receiver(post_delete, sender=Task)
+def tombstone_task(sender, instance, using="default", origin=None, **kwargs):
+    # Written in the deleting transaction, so a task can never vanish without one.
+    if _deleting_user(origin):
+        return
+    tombstone = TaskTombstone(task_id=instance.pk, user_id=instance.user_id)
+    tombstones = getattr(_local, "tombstones", None)
+    if tombstones is not None:
+        tombstones.append(tombstone)
+    else:
+        tombstone.save(using=using)
+
+
+# -------- STATS COUNTERS --------
+@receiver(pre_save, sender=Task)
+def load_stats_snapshot(sender, instance, raw=False, using="default", **kwargs):
+    # Tasks loaded from the database carry their snapshot already (Task.from_db).
+    if raw or instance._state.adding or hasattr(instance, "_stats_snapshot"):
+        return
+    row = Task.objects.using(using).filter(pk=instance.pk).values("status", "priority", "category_id").first()
+    instance._stats_snapshot = stats_snapshot(Task(**row)) if row else None
+
+
+@receiver(post_save, sender=Task)
+def count_task(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    before = None if created else getattr(instance, "_stats_snapshot", None)
+    after = stats_snapshot(instance)
+    stats.record_change(instance.user_id, before, after)
+    instance._stats_snapshot = after
+
+
+@receiver(post_delete, sender=Task)
+def uncount_task(sender, instance, origin=None, **kwargs):
+    if _deleting_user(origin):
+        return
+    before = getattr(instance, "_stats_snapshot", None) or stats_snapshot(instance)
+    stats.record_change(instance.user_id, before, None)
+
+
+@receiver(pre_delete, sender=Category)
+def uncount_category(sender, instance, **kwargs):
+    # Its tasks are moved to "no category" by SET_NULL, which fires no task signals.
+    stats.reassign_category(instance.pk)
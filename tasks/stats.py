@@ -0,0 +1,129 @@
+"""
+Incrementally maintained per-user task statistics.
+
+TaskCounter holds one row per (user, dimension, key). Every task write turns into a
+delta on those rows: +1 for the keys the task now has and -1 for the keys it had. Model
+saves and deletes are covered by tasks/signals.py. Bulk writers report their changes
+through `record_change()` inside `batch()`, which adds up the deltas and applies them with
+one UPDATE per touched counter.
+
+Overdue counts depend on the clock and can't be kept as counters; `overdue_count()`
+answers them from the (user, due_date) index instead.
+"""
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import Task, TaskCounter
+
+_local = threading.local()
+
+
+def _diff(user_id, before, after):
+    deltas = Counter()
+    for snapshot, sign in ((before, -1), (after, 1)):
+        if snapshot:
+            for dimension, key in snapshot.items():
+                deltas[(user_id, dimension, key)] += sign
+    return deltas
+
+
+def apply_deltas(deltas):
+    for (user_id, dimension, key), delta in deltas.items():
+        if not delta:
+            continue
+        counters = TaskCounter.objects.filter(user_id=user_id, dimension=dimension, key=key)
+        if counters.update(count=F("count") + delta):
+            continue
+        try:
+            with transaction.atomic():
+                TaskCounter.objects.create(user_id=user_id, dimension=dimension, key=key, count=delta)
+        except IntegrityError:
+            # Another writer created the row first.
+            counters.update(count=F("count") + delta)
+
+
+def record_change(user_id, before, after):
+    """Account for one task going from snapshot `before` to `after` (either may be None)."""
+    deltas = _diff(user_id, before, after)
+    pending = getattr(_local, "pending", None)
+    if pending is not None:
+        pending.update(deltas)
+    else:
+        apply_deltas(deltas)
+
+
+@contextmanager
+def batch():
+    """Collect record_change() calls and apply their summed deltas once at the end."""
+    if getattr(_local, "pending", None) is not None:
+        yield
+        return
+    _local.pending = Counter()
+    try:
+        yield
+        apply_deltas(_local.pending)
+    finally:
+        _local.pending = None
+
+
+def reassign_category(category_id):
+    """Move counts from a category that is being deleted to 'uncategorized'."""
+    rows = list(TaskCounter.objects.filter(dimension=TaskCounter.CATEGORY, key=str(category_id)))
+    deltas = Counter()
+    for row in rows:
+        deltas[(row.user_id, TaskCounter.CATEGORY, "")] += row.count
+    apply_deltas(deltas)
+    TaskCounter.objects.filter(pk__in=[row.pk for row in rows]).delete()
+
+
+def overdue_count(user, now=None):
+    return Task.objects.filter(
+        user=user, status="Incomplete", due_date__lt=now or timezone.now()
+    ).count()
+
+
+def user_stats(user):
+    counters = TaskCounter.objects.filter(user=user, count__gt=0).values_list("dimension", "key", "count")
+    by_dimension = {TaskCounter.STATUS: {}, TaskCounter.PRIORITY: {}, TaskCounter.CATEGORY: {}}
+    for dimension, key, count in counters:
+        by_dimension[dimension][key] = count
+    return by_dimension
+
+
+def compute_counters(users=None):
+    """Recount from the tasks table: {(user_id, dimension, key): count}."""
+    tasks = Task.objects.all() if users is None else Task.objects.filter(user__in=users)
+    counts = {}
+    for dimension, field in (
+        (TaskCounter.STATUS, "status"),
+        (TaskCounter.PRIORITY, "priority"),
+        (TaskCounter.CATEGORY, "category_id"),
+    ):
+        for row in tasks.order_by().values("user_id", field).annotate(n=Count("pk")):
+            key = row[field]
+            counts[(row["user_id"], dimension, str(key) if key else "")] = row["n"]
+    return counts
+
+
+def stored_counters(users=None):
+    counters = TaskCounter.objects.all() if users is None else TaskCounter.objects.filter(user__in=users)
+    return {(c.user_id, c.dimension, c.key): c.count for c in counters if c.count}
+
+
+@transaction.atomic
+def rebuild(users=None):
+    """Replace the stored counters with a fresh recount. Returns the number of rows written."""
+    counts = compute_counters(users)
+    counters = TaskCounter.objects.all() if users is None else TaskCounter.objects.filter(user__in=users)
+    counters.delete()
+    TaskCounter.objects.bulk_create(
+        TaskCounter(user_id=user_id, dimension=dimension, key=key, count=count)
+        for (user_id, dimension, key), count in counts.items()
+    )
+    return len(counts)
+
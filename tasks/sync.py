@@ -0,0 +1,122 @@
+"""
+Delta sync for offline clients (GET /api/tasks/changes/?since=<cursor>).
+
+Changes are read in (timestamp, id) order from two streams, each served by an index on
+(user, timestamp, id):
+- tasks created or updated, by Task.updated_at (task_user_updated_idx)
+- deleted tasks, by TaskTombstone.deleted_at (tombstone_user_deleted_idx)
+
+A response holds at most PAGE_SIZE changes and an opaque cursor for the next call;
+`has_more` tells the client to call again right away. Without a cursor the stream starts
+at the beginning: a full download, with no deletions to report.
+
+Timestamps are taken when a row is saved, before its transaction commits, so a slow
+transaction can add rows behind a cursor that was already handed out. The cursor of the
+last page therefore trails the clock by SETTLE_TIME seconds: changes from those seconds
+are sent again on the next call (clients apply changes by id, so that is harmless)
+instead of being missed.
+
+Tombstones are kept for TOMBSTONE_RETENTION days (pruned daily by Celery). An older
+cursor can't be answered completely, so the endpoint rejects it with 410 and the client
+starts over without one.
+"""
+import base64
+import uuid
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from . import rows as task_rows
+from .models import TaskTombstone
+
+DEFAULTS = {
+    "PAGE_SIZE": 500,            # changes per response
+    "MAX_PAGE_SIZE": 2000,       # largest ?page_size=
+    "SETTLE_TIME": 5,            # seconds the last page's cursor trails the clock
+    "TOMBSTONE_RETENTION": 90,   # days deletions are remembered, and cursors stay valid
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "TASK_SYNC", {})}
+
+
+def encode_cursor(position):
+    timestamp, last_id = position
+    return base64.urlsafe_b64encode(f"{timestamp.isoformat()}|{last_id or ''}".encode()).decode()
+
+
+def decode_cursor(cursor):
+    """(timestamp, id or None) from encode_cursor(). Raises ValueError for anything else."""
+    try:
+        timestamp, _, last_id = base64.urlsafe_b64decode(cursor.encode()).decode().partition("|")
+        timestamp = datetime.fromisoformat(timestamp)
+        last_id = uuid.UUID(last_id) if last_id else None
+    except ValueError as exc:
+        raise ValueError("Invalid cursor.") from exc
+    if timezone.is_naive(timestamp):
+        raise ValueError("Invalid cursor.")
+    return timestamp, last_id
+
+
+def is_expired(position, now=None):
+    """Whether deletions after `position` may already have been pruned."""
+    now = now or timezone.now()
+    return position[0] < now - timedelta(days=get_config()["TOMBSTONE_RETENTION"])
+
+
+def _after(queryset, field, id_field, position):
+    # Keyset condition: (field, id_field) > position. A position without an id is inclusive.
+    timestamp, last_id = position
+    if last_id is None:
+        return queryset.filter(**{f"{field}__gte": timestamp})
+    return queryset.filter(Q(**{f"{field}__gt": timestamp}) | Q(**{field: timestamp, f"{id_field}__gt": last_id}))
+
+
+def changes(queryset, user, since=None, limit=None, fields=None, now=None):
+    """
+    The changes to `queryset` (the user's tasks) after the decoded cursor `since`:
+    {"changed": serialized tasks, "deleted": task ids, "cursor": next cursor, "has_more": bool}.
+    `fields` is a sparse fieldset for the changed tasks (tasks/fieldsets.py).
+    """
+    config = get_config()
+    limit = limit or config["PAGE_SIZE"]
+    now = now or timezone.now()
+
+    tasks = task_rows.project(queryset, fields).order_by("updated_at", "id")
+    if since is not None:
+        tasks = _after(tasks, "updated_at", "id", since)
+    entries = [(row["updated_at"], row["id"], row) for row in tasks[:limit + 1]]
+    if since is not None:
+        tombstones = _after(TaskTombstone.objects.filter(user=user), "deleted_at", "task_id", since)
+        entries += [
+            (deleted_at, task_id, None)
+            for deleted_at, task_id in tombstones.order_by("deleted_at", "task_id").values_list("deleted_at", "task_id")[:limit + 1]
+        ]
+    entries.sort(key=lambda entry: entry[:2])
+    has_more = len(entries) > limit
+    page = entries[:limit]
+
+    if has_more:
+        position = page[-1][:2]
+    else:
+        position = (now - timedelta(seconds=config["SETTLE_TIME"]), None)
+        if since is not None and since[0] > position[0]:
+            position = since
+    return {
+        "changed": task_rows.serialize([row for _, _, row in page if row is not None], fields),
+        "deleted": [str(task_id) for _, task_id, row in page if row is None],
+        "cursor": encode_cursor(position),
+        "has_more": has_more,
+    }
+
+
+def prune_tombstones(now=None):
+    """Delete tombstones older than TOMBSTONE_RETENTION days. Returns the number deleted."""
+    now = now or timezone.now()
+    deleted, _ = TaskTombstone.objects.filter(
+        deleted_at__lt=now - timedelta(days=get_config()["TOMBSTONE_RETENTION"]),
+    ).delete()
+    return deleted
@@ -0,0 +1,91 @@
+"""
+Diff-based tag editing.
+
+Adding, removing or replacing tags first reads the current links of every affected task
+with one query, works out which (task, tag) pairs actually change, and then writes only
+those: one DELETE for the links that go away and one bulk INSERT for the new ones.
+Tasks whose tags end up unchanged are not written, reindexed or logged.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from activity.models import ActivityLog
+from activity.recorder import record_activities
+from tags.cache import tag_cache
+from .models import Task
+from .search import get_search_backend
+
+TaskTag = Task.tags.through
+
+ADD, REMOVE, REPLACE = "add", "remove", "replace"
+MODES = (ADD, REMOVE, REPLACE)
+
+WRITE_BATCH_SIZE = 500
+
+
+def diff_tags(wanted, mode, linked=None):
+    """
+    Apply `mode` to the through table for {task_id: [tag_id, ...]}.
+
+    Returns {task_id: (added tag ids, removed tag ids)} for the tasks that changed. If given,
+    `linked` is filled with {task_id: [tag ids the task has afterwards]}.
+    """
+    current = {task_id: {} for task_id in wanted}
+    for link_id, task_id, tag_id in TaskTag.objects.filter(task_id__in=wanted).values_list("id", "task_id", "tag_id"):
+        current[task_id][tag_id] = link_id
+
+    changes, new_links, stale_links = {}, [], []
+    for task_id, tag_ids in wanted.items():
+        tag_ids = dict.fromkeys(tag_ids)
+        links = current[task_id]
+        added = [tag_id for tag_id in tag_ids if tag_id not in links] if mode != REMOVE else []
+        if mode == REMOVE:
+            removed = [tag_id for tag_id in tag_ids if tag_id in links]
+        elif mode == REPLACE:
+            removed = [tag_id for tag_id in links if tag_id not in tag_ids]
+        else:
+            removed = []
+        if added or removed:
+            changes[task_id] = (added, removed)
+            new_links.extend(TaskTag(task_id=task_id, tag_id=tag_id) for tag_id in added)
+            stale_links.extend(links[tag_id] for tag_id in removed)
+        if linked is not None:
+            linked[task_id] = [tag_id for tag_id in links if tag_id not in removed] + added
+
+    if stale_links:
+        TaskTag.objects.filter(pk__in=stale_links).delete()
+    # A concurrent request may have linked the same pair since the read above.
+    TaskTag.objects.bulk_create(new_links, batch_size=WRITE_BATCH_SIZE, ignore_conflicts=True)
+    return changes
+
+
+def _names(tag_ids, tags):
+    return [tags[tag_id].name for tag_id in tag_ids if tag_id in tags]
+
+
+def edit_tags(task_ids, tags, mode, user, linked=None):
+    """
+    Add, remove or replace `tags` (Tag instances, as resolved by TaskTagSerializer) on each
+    of the user's `task_ids` (already checked to exist). Returns {task_id: (added tag ids,
+    removed tag ids)} for the tasks that changed; `linked` is passed on to diff_tags().
+    """
+    tags = {tag.pk: tag for tag in tags}
+    with transaction.atomic():
+        changes = diff_tags({task_id: list(tags) for task_id in task_ids}, mode, linked)
+        if not changes:
+            return changes
+        # tag_names is part of the serialized task: bump updated_at so ETags change too.
+        Task.objects.filter(pk__in=changes).update(updated_at=timezone.now())
+        get_search_backend().index(changes)
+        # Only tags removed by a replace can be missing from the ones we were given.
+        tags.update(tag_cache.get_many({
+            tag_id for added, removed in changes.values() for tag_id in removed if tag_id not in tags
+        }))
+        # One tag_added and/or tag_removed entry per changed task, naming only the changed tags.
+        record_activities(
+            ActivityLog(task_id=task_id, user=user, action=action, details={"tags": _names(tag_ids, tags)})
+            for task_id, (added, removed) in changes.items()
+            for action, tag_ids in (("tag_added", added), ("tag_removed", removed))
+            if tag_ids
+        )
+    return changes
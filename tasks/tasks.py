@@ -1,26 +1,148 @@
 # tasks/tasks.py
+import logging
+import smtplib
+import time
+
 from celery import shared_task
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
 from django.utils import timezone
-from django.core.mail import send_mail
-from .models import Task
+from . import events as task_events
+from . import importer
+from . import sync
+from .models import Task, TaskImport
+
+logger = logging.getLogger(__name__)
+
+REMINDER_FROM_EMAIL = "yourapp@example.com"
+
+
+def due_reminders(start, end):
+    # Served by the partial index task_remind_pending_idx (remind_at WHERE NOT reminder_sent).
+    return Task.objects.filter(
+        remind_at__gte=start, remind_at__lt=end, reminder_sent=False,
+        reminder_attempts__lt=settings.REMINDER_MAX_ATTEMPTS,
+    )
+
+
+def claim_due_reminders(start, end, limit, exclude=()):
+    """
+    Lock up to `limit` unsent reminders due in [start, end), other than the task ids in
+    `exclude`, for the current transaction.
+
+    SKIP LOCKED lets several workers run this concurrently: each claims a disjoint set of
+    rows instead of waiting on (or double-sending) rows another worker is handling.
+    """
+    return list(
+        due_reminders(start, end)
+        .exclude(pk__in=exclude)
+        .select_for_update(skip_locked=True, of=("self",))
+        .order_by("remind_at")
+        .values_list("id", "title", "remind_at", "user__email", "user_id")[:limit]
+    )
+
+
+def dispatch_reminders(now=None, batch_size=None):
+    """
+    Send every unsent reminder that is due, batch by batch, and return throughput metrics.
+
+    Each batch is claimed and mailed over one SMTP connection inside one transaction, one
+    message at a time. A message the server refuses (bad recipient, rejected data) counts
+    as a failed attempt for that reminder only; after REMINDER_MAX_ATTEMPTS it is no longer
+    claimed. If the connection itself fails, the run stops: what went out is marked sent
+    and the rest is left for the next run. Outcomes are written when the batch commits, so
+    a crash mid-batch can send a reminder twice, never lose one.
+
+    The scan looks back REMINDER_CATCHUP_WINDOW rather than just the current minute, so a
+    late or skipped beat run still delivers what it missed.
+    """
+    now = timezone.localtime(now or timezone.now()).replace(second=0, microsecond=0)
+    end = now + timezone.timedelta(minutes=1)
+    start = now - settings.REMINDER_CATCHUP_WINDOW
+    batch_size = batch_size or settings.REMINDER_BATCH_SIZE
+
+    metrics = {"batches": 0, "sent": 0, "failed": 0, "max_lag_seconds": 0.0}
+    refused = set()  # not claimed again by this run
+    started = time.monotonic()
+    with get_connection() as mail:
+        interrupted = False
+        while not interrupted:
+            with transaction.atomic():
+                batch = claim_due_reminders(start, end, batch_size, exclude=refused)
+                if not batch:
+                    break
+                sent, failed = [], []
+                for task_id, title, remind_at, email, user_id in batch:
+                    message = EmailMessage(
+                        subject=f"Reminder: {title}",
+                        body=f"Your task '{title}' is due now.",
+                        from_email=REMINDER_FROM_EMAIL,
+                        to=[email],
+                        connection=mail,
+                    )
+                    try:
+                        mail.send_messages([message])
+                    except (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError, ValueError):
+                        logger.warning("[Celery] Reminder for task %s to %s was refused", task_id, email, exc_info=True)
+                        failed.append(task_id)
+                        continue
+                    except (smtplib.SMTPException, OSError):
+                        logger.exception("[Celery] Lost the mail connection; the remaining reminders wait for the next run")
+                        interrupted = True
+                        break
+                    sent.append(task_id)
+                    # Pushed to the user's event streams once the batch commits.
+                    task_events.reminder_due(user_id, task_id, title, remind_at)
+
+                # reminder_sent is part of the serialized task, so bump updated_at with it.
+                Task.objects.filter(pk__in=sent).update(reminder_sent=True, updated_at=timezone.now())
+                Task.objects.filter(pk__in=failed).update(reminder_attempts=F("reminder_attempts") + 1)
+            refused.update(failed)
+
+            metrics["batches"] += 1
+            metrics["sent"] += len(sent)
+            metrics["failed"] += len(failed)
+            oldest = min(remind_at for _, _, remind_at, _, _ in batch)
+            metrics["max_lag_seconds"] = max(metrics["max_lag_seconds"], (timezone.now() - oldest).total_seconds())
+            if len(batch) < batch_size:
+                break
+
+    metrics["seconds"] = round(time.monotonic() - started, 3)
+    metrics["per_second"] = round(metrics["sent"] / metrics["seconds"], 1) if metrics["seconds"] else 0.0
+    return metrics
+
 
 @shared_task
 def send_due_reminders():
-    now = timezone.localtime(timezone.now()).replace(second=0, microsecond=0)
-    next_minute = now + timezone.timedelta(minutes=1)
-
-    due_tasks = Task.objects.filter(remind_at__gte=now, remind_at__lt=next_minute, reminder_sent=False)
-
-    print(f"[Celery] Checked at {now}, found {due_tasks.count()} tasks")
-
-    for task in due_tasks:
-        send_mail(
-            subject=f"Reminder: {task.title}",
-            message=f"Your task '{task.title}' is due now.",
-            from_email="yourapp@example.com",
-            recipient_list=[task.user.email],
-            fail_silently=False,
-        )
-        task.reminder_sent = True
-        task.save(update_fields=['reminder_sent'])
-        print(f"[Celery] Sent reminder for task: {task.title}")
+    metrics = dispatch_reminders()
+    logger.info(
+        "[Celery] Sent %(sent)d reminders (%(failed)d refused) in %(batches)d batches, %(seconds)ss (%(per_second)s/s), "
+        "max lag %(max_lag_seconds).0fs",
+        metrics,
+    )
+    return metrics
+
+
+@shared_task
+def run_task_import(import_id):
+    try:
+        task_import = importer.run_import(TaskImport.objects.select_related("user").get(pk=import_id))
+    except importer.ImportConflict as exc:
+        logger.warning("[Celery] %s Stopping this run.", exc)
+        return {"conflict": True}
+    importer.discard_upload(task_import)
+    logger.info(
+        "[Celery] Import %s: %d tasks created, %d rows rejected",
+        task_import.pk, task_import.created, task_import.failed,
+    )
+    return {"created": task_import.created, "failed": task_import.failed}
+
+
+@shared_task
+def prune_task_tombstones():
+    """Delete tombstones past the delta sync retention."""
+    deleted = sync.prune_tombstones()
+    logger.info("[Celery] Pruned %d task tombstones", deleted)
+    return {"deleted": deleted}
@@ -1,3 +1,1032 @@
-from django.test import TestCase
+import asyncio
+import csv
+import importlib
+import io
+import json
+import smtplib
+import tempfile
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.apps import apps
+from django.core import mail
+from django.core.management import CommandError, call_command
+from django.core.mail.backends import locmem
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date
+from rest_framework.permissions import IsAdminUser
+from rest_framework.test import APITestCase
+from rest_framework.throttling import BaseThrottle
+from rest_framework_simplejwt.tokens import AccessToken
+
+from task_manager.broker import RESYNC, InMemoryBroker, TooManyConnections, get_config as get_events_config
+from task_manager.renderers import MessagePackParser, msgpack
+
+from activity import archive as activity_archive
+from activity.models import ActivityArchive, ActivityLog
+from categories.cache import category_cache
+from categories.models import Category
+from tags.cache import tag_cache
+from tags.models import Tag
+from users.models import User
+from . import export as task_export, fieldsets, importer, stats
+from . import sync as task_sync
+from .models import Task, TaskCounter, TaskImport, TaskTombstone
+from .search import SEARCH_TABLE
+from .tasks import dispatch_reminders
+from .views import TaskViewSet
+
+# Maximum number of SQL queries each task endpoint may run, independent of how many
+# tasks, tags or log rows it returns.
+TASK_QUERY_BUDGETS = {
+    "task-list": 4,         # ETag aggregate + latest tombstone + tasks page + tag names
+    "task-detail": 2,       # task + tags (activity log write is buffered)
+    "task-logs": 2,         # task lookup + logs joined with task/user
+    "task-reminders": 1,
+    "task-stats": 3,        # counters + category names + overdue count
+    "task-changes": 3,      # changed tasks + tombstones + tag names
+    "activity-feed": 1,     # one page of the user's entries joined with their tasks
+}
+
+
+# Budgets cover the request path; activity log writes happen off it.
+@override_settings(ACTIVITY_LOG={"MODE": "buffered"})
+class QueryBudgetTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="query-budget@example.com", password=None)
+        categories = [Category.objects.create(name=f"query-budget-category-{i}") for i in range(3)]
+        tags = [Tag.objects.create(name=f"query-budget-tag-{i}") for i in range(3)]
+        cls.tasks = [
+            Task.objects.create(
+                user=cls.user,
+                title=f"Task {i}",
+                category=categories[i % len(categories)],
+                remind_at="2999-01-01T00:00:00Z",
+            )
+            for i in range(20)
+        ]
+        for i, task in enumerate(cls.tasks):
+            task.tags.set(tags[: i % len(tags) + 1])
+            ActivityLog.objects.create(task=task, user=cls.user, action="created")
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def assertWithinBudget(self, name, url):
+        with self.assertNumQueries(TASK_QUERY_BUDGETS[name]):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_task_list(self):
+        self.assertWithinBudget("task-list", "/api/tasks/")
+
+    def test_task_detail(self):
+        self.assertWithinBudget("task-detail", f"/api/tasks/{self.tasks[0].pk}/")
+
+    def test_task_logs(self):
+        self.assertWithinBudget("task-logs", f"/api/tasks/{self.tasks[0].pk}/logs/")
+
+    def test_task_reminders(self):
+        self.assertWithinBudget("task-reminders", "/api/tasks/reminders/")
+
+    def test_task_stats(self):
+        self.assertWithinBudget("task-stats", "/api/tasks/stats/")
+
+    def test_task_changes(self):
+        since = task_sync.encode_cursor((timezone.now() - timedelta(days=1), None))
+        self.assertWithinBudget("task-changes", f"/api/tasks/changes/?since={since}")
+
+    def test_activity_feed(self):
+        self.assertWithinBudget("activity-feed", "/api/activity/")
+
+
+class RefusingEmailBackend(locmem.EmailBackend):
+    """locmem backend that behaves like an SMTP server for a few special recipients."""
+
+    def send_messages(self, messages):
+        for message in messages:
+            if "refused@example.com" in message.to:
+                raise smtplib.SMTPRecipientsRefused({"refused@example.com": (550, b"No such user")})
+            if "disconnect@example.com" in message.to:
+                raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_BACKEND="tasks.tests.RefusingEmailBackend", REMINDER_MAX_ATTEMPTS=3)
+class ReminderDispatchTests(TestCase):
+    def add_reminder(self, email, minutes_ago):
+        user = User.objects.filter(email=email).first() or User.objects.create_user(email=email, password=None)
+        return Task.objects.create(user=user, title=email, remind_at=timezone.now() - timedelta(minutes=minutes_ago))
+
+    def test_refused_recipient_does_not_block_the_others(self):
+        refused = self.add_reminder("refused@example.com", 10)
+        good = [self.add_reminder(f"user{i}@example.com", 5 - i) for i in range(3)]
+
+        with self.assertLogs("tasks.tasks", "WARNING"):
+            metrics = dispatch_reminders(batch_size=2)
+
+        self.assertEqual((metrics["sent"], metrics["failed"]), (3, 1))
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), [task.title for task in good])
+        self.assertFalse(Task.objects.filter(pk__in=[task.pk for task in good], reminder_sent=False).exists())
+        refused.refresh_from_db()
+        self.assertEqual((refused.reminder_sent, refused.reminder_attempts), (False, 1))
+
+    def test_refused_reminder_is_given_up_after_max_attempts(self):
+        refused = self.add_reminder("refused@example.com", 10)
+        for _ in range(3):
+            with self.assertLogs("tasks.tasks", "WARNING"):
+                dispatch_reminders()
+        self.assertEqual(dispatch_reminders()["failed"], 0)
+        refused.refresh_from_db()
+        self.assertEqual(refused.reminder_attempts, 3)
+
+    def test_lost_connection_keeps_what_was_sent(self):
+        first = self.add_reminder("user@example.com", 10)
+        self.add_reminder("disconnect@example.com", 5)
+        last = self.add_reminder("other@example.com", 1)
+
+        with self.assertLogs("tasks.tasks", "ERROR"):
+            metrics = dispatch_reminders()
+
+        self.assertEqual((metrics["sent"], metrics["failed"]), (1, 0))
+        self.assertTrue(Task.objects.get(pk=first.pk).reminder_sent)
+        self.assertEqual(Task.objects.filter(reminder_sent=False, reminder_attempts=0).count(), 2)
+        self.assertFalse(Task.objects.get(pk=last.pk).reminder_sent)
+
+
+class BulkTaskTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="bulk@example.com", password=None)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def create_tasks(self, count):
+        response = self.client.post(
+            "/api/tasks/bulk/",
+            [{"title": f"Task {i}", "status": "Incomplete", "priority": "Low"} for i in range(count)],
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        return [task["id"] for task in response.data["created"]]
+
+    def search_rows(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {SEARCH_TABLE}")
+            return cursor.fetchone()[0]
+
+    def test_bulk_delete_writes_tombstones_in_bulk(self):
+        ids = self.create_tasks(200)
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.delete("/api/tasks/bulk/", ids, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(len(captured), 20)
+        self.assertEqual(TaskTombstone.objects.filter(user=self.user).count(), 200)
+        self.assertFalse(Task.objects.filter(user=self.user).exists())
+        if connection.vendor == "sqlite":
+            self.assertEqual(self.search_rows(), 0)
+
+    def test_partial_failure_is_reported_per_item(self):
+        response = self.client.post(
+            "/api/tasks/bulk/",
+            [
+                {"title": "Good", "status": "Incomplete", "priority": "Low"},
+                {"title": "Bad", "status": "Incomplete", "priority": "Urgent"},
+                {"title": "Also good", "status": "Completed", "priority": "High"},
+            ],
+            format="json",
+        )
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([task["title"] for task in response.data["created"]], ["Good", "Also good"])
+        self.assertEqual([error["index"] for error in response.data["errors"]], [1])
+        self.assertIn("priority", response.data["errors"][0]["errors"])
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 2)
+
+    def test_atomic_batch_writes_nothing_on_error(self):
+        ids = self.create_tasks(2)
+        response = self.client.patch(
+            "/api/tasks/bulk/?atomic=true",
+            [{"id": ids[0], "title": "Renamed"}, {"id": ids[1], "priority": "Urgent"}],
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Task.objects.filter(title="Renamed").exists())
+
+    def test_unknown_ids_are_reported_and_the_rest_deleted(self):
+        ids = self.create_tasks(2)
+        other = User.objects.create_user(email="bulk-other@example.com", password=None)
+        foreign = Task.objects.create(user=other, title="Not yours")
+        response = self.client.delete("/api/tasks/bulk/", [ids[0], str(foreign.pk), "nope"], format="json")
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.data["deleted"], [ids[0]])
+        self.assertEqual([error["index"] for error in response.data["errors"]], [1, 2])
+        self.assertTrue(Task.objects.filter(pk=foreign.pk).exists())
+
+    def test_single_delete_writes_a_tombstone(self):
+        task_id = self.create_tasks(1)[0]
+        self.assertEqual(self.client.delete(f"/api/tasks/{task_id}/").status_code, 204)
+        self.assertEqual(list(TaskTombstone.objects.values_list("task_id", flat=True)), [Task._meta.pk.to_python(task_id)])
+
+
+class RenameTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="rename@example.com", password=None)
+        cls.tag = Tag.objects.create(name="rename-tag")
+        cls.task = Task.objects.create(user=cls.user, title="Tagged")
+        cls.task.tags.add(cls.tag)
+
+    def updated_at(self):
+        return Task.objects.values_list("updated_at", flat=True).get(pk=self.task.pk)
+
+    def test_save_without_rename_leaves_tasks_alone(self):
+        before = self.updated_at()
+        tag = Tag.objects.get(pk=self.tag.pk)
+        with self.assertNumQueries(2):  # stored name + UPDATE
+            tag.save()
+        self.assertEqual(self.updated_at(), before)
+
+    def test_rename_touches_tagged_tasks(self):
+        before = self.updated_at()
+        tag = Tag.objects.get(pk=self.tag.pk)
+        tag.name = "renamed-tag"
+        tag.save()
+        self.assertGreater(self.updated_at(), before)
+
+
+class TaskCounterMigrationTests(TestCase):
+    def test_counters_are_filled_from_existing_tasks(self):
+        user = User.objects.create_user(email="counters@example.com", password=None)
+        category = Category.objects.create(name="counted")
+        Task.objects.create(user=user, title="A", status="Completed", priority="High", category=category)
+        Task.objects.create(user=user, title="B")
+        TaskCounter.objects.all().delete()
+
+        migration = importlib.import_module("tasks.migrations.0008_task_counters")
+        migration.count_existing_tasks(apps, SimpleNamespace(connection=connection))
+
+        self.assertEqual(stats.stored_counters(), stats.compute_counters())
+        self.assertEqual(stats.user_stats(user)[TaskCounter.STATUS], {"Completed": 1, "Incomplete": 1})
+
+
+@override_settings(ACTIVITY_LOG={"MODE": "sync"})
+class TagEditTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="tags@example.com", password=None)
+        cls.red, cls.green, cls.blue = (Tag.objects.create(name=name) for name in ("red", "green", "blue"))
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+        self.task = Task.objects.create(user=self.user, title="Tagged")
+        self.task.tags.add(self.red)
+
+    def tag_names(self, task=None):
+        return sorted((task or self.task).tags.values_list("name", flat=True))
+
+    def test_add_keeps_existing_tags(self):
+        response = self.client.post(f"/api/tasks/{self.task.pk}/add-tag/", {"tags": [str(self.green.pk), str(self.red.pk)]}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([tag["name"] for tag in response.data["tags"]], ["green", "red"])
+        self.assertEqual(response.data["added"], [str(self.green.pk)])
+        self.assertEqual(response.data["removed"], [])
+        self.assertEqual(self.tag_names(), ["green", "red"])
+
+    def test_replace_sets_exactly_the_given_tags(self):
+        response = self.client.put(f"/api/tasks/{self.task.pk}/tags/", {"tags": [str(self.blue.pk)]}, format="json")
+        self.assertEqual([tag["name"] for tag in response.data["tags"]], ["blue"])
+        self.assertEqual((response.data["added"], response.data["removed"]), ([str(self.blue.pk)], [str(self.red.pk)]))
+        self.assertEqual(self.tag_names(), ["blue"])
+        logs = ActivityLog.objects.filter(task=self.task).order_by("action")
+        self.assertEqual(
+            [(log.action, log.details) for log in logs],
+            [("tag_added", {"tags": ["blue"]}), ("tag_removed", {"tags": ["red"]})],
+        )
+
+    def test_replace_with_no_tags_clears_them(self):
+        response = self.client.put(f"/api/tasks/{self.task.pk}/tags/", {"tags": []}, format="json")
+        self.assertEqual(response.data["tags"], [])
+        self.assertEqual(self.tag_names(), [])
+
+    def test_unchanged_tags_are_not_written(self):
+        before = Task.objects.values_list("updated_at", flat=True).get(pk=self.task.pk)
+        response = self.client.post(f"/api/tasks/{self.task.pk}/add-tag/", {"tags": [str(self.red.pk)]}, format="json")
+        self.assertEqual(response.data["added"], [])
+        self.assertEqual(Task.objects.values_list("updated_at", flat=True).get(pk=self.task.pk), before)
+        self.assertFalse(ActivityLog.objects.filter(action__in=["tag_added", "tag_removed"]).exists())
+
+    def test_bulk_add_and_remove(self):
+        other = Task.objects.create(user=self.user, title="Other")
+        task_ids = [str(self.task.pk), str(other.pk)]
+        response = self.client.post("/api/tasks/bulk-tags/", {"task_ids": task_ids, "tags": [str(self.red.pk)], "mode": "add"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(([change["task_id"] for change in response.data["changed"]], response.data["unchanged"]), ([str(other.pk)], 1))
+        self.assertEqual(self.tag_names(other), ["red"])
+
+        response = self.client.post("/api/tasks/bulk-tags/", {"task_ids": task_ids, "tags": [str(self.red.pk)], "mode": "remove"}, format="json")
+        self.assertEqual(len(response.data["changed"]), 2)
+        self.assertEqual((self.tag_names(), self.tag_names(other)), ([], []))
+
+    def test_unknown_tag_is_rejected(self):
+        response = self.client.post(f"/api/tasks/{self.task.pk}/add-tag/", {"tags": [str(self.task.pk)]}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("tags", response.data)
+
+    def test_add_category(self):
+        category = Category.objects.create(name="tag-edit-category")
+        response = self.client.post(f"/api/tasks/{self.task.pk}/add-category/", {"category_id": str(category.pk)}, format="json")
+        self.assertEqual((response.status_code, response.data["category_name"]), (200, "tag-edit-category"))
+        response = self.client.post(f"/api/tasks/{self.task.pk}/add-category/", {"category_id": str(self.task.pk)}, format="json")
+        self.assertEqual((response.status_code, list(response.data)), (400, ["category_id"]))
+
+
+class TaskImportTests(TestCase):
+    ROWS = [
+        "title,status,priority,category,tags",
+        "One,Incomplete,Low,Work,\"a,b\"",
+        "Two,Incomplete,Bogus,,",
+        "Three,Completed,High,Work,a",
+        "Four,Incomplete,Medium,,",
+        "Five,Incomplete,Low,Home,b",
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="import@example.com", password=None)
+
+    def setUp(self):
+        # Names resolved by earlier tests point at rows that were rolled back.
+        for cache in (category_cache, tag_cache):
+            cache.clear()
+            self.addCleanup(cache.clear)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "tasks.csv"
+        self.path.write_text("\n".join(self.ROWS) + "\n")
+
+    def new_import(self):
+        return TaskImport.objects.create(user=self.user, format="csv", source=str(self.path), batch_size=2)
+
+    def titles(self):
+        return sorted(Task.objects.filter(user=self.user).values_list("title", flat=True))
+
+    def test_rows_are_imported_and_rejected_per_row(self):
+        task_import = importer.run_import(self.new_import())
+        self.assertEqual((task_import.status, task_import.rows_read), (TaskImport.COMPLETED, 5))
+        self.assertEqual((task_import.created, task_import.failed), (4, 1))
+        self.assertEqual(list(task_import.row_errors.values_list("row", flat=True)), [2])
+        self.assertEqual(self.titles(), ["Five", "Four", "One", "Three"])
+        self.assertEqual(sorted(Task.objects.get(title="One").tags.values_list("name", flat=True)), ["a", "b"])
+
+    def test_resume_carries_on_from_the_checkpoint(self):
+        task_import = self.new_import()
+        write_batch = importer._write_batch
+        calls = []
+
+        def fail_second_batch(*args):
+            calls.append(args)
+            if len(calls) == 2:
+                raise RuntimeError("database went away")
+            return write_batch(*args)
+
+        with mock.patch.object(importer, "_write_batch", fail_second_batch), self.assertRaises(RuntimeError):
+            importer.run_import(task_import)
+        task_import.refresh_from_db()
+        self.assertEqual((task_import.status, task_import.rows_read), (TaskImport.FAILED, 2))
+
+        importer.run_import(task_import)
+        self.assertEqual(self.titles(), ["Five", "Four", "One", "Three"])
+        task_import.refresh_from_db()
+        self.assertEqual((task_import.created, task_import.failed), (4, 1))
+
+    def test_second_runner_does_not_write_committed_batches_again(self):
+        first = self.new_import()
+        second = TaskImport.objects.get(pk=first.pk)
+        conflicts = []
+
+        def start_second_runner(task_import):
+            # A second runner that read the import before the first batch committed.
+            if task_import.rows_read == 2:
+                with self.assertRaises(importer.ImportConflict) as raised:
+                    importer.run_import(second)
+                conflicts.append(raised.exception)
+
+        importer.run_import(first, progress=start_second_runner)
+        self.assertEqual(len(conflicts), 1)
+        self.assertEqual(self.titles(), ["Five", "Four", "One", "Three"])
+        first.refresh_from_db()
+        self.assertEqual((first.status, first.created), (TaskImport.COMPLETED, 4))
+
+    def test_command_refuses_a_running_import(self):
+        task_import = self.new_import()
+        TaskImport.objects.filter(pk=task_import.pk).update(status=TaskImport.RUNNING)
+        with self.assertRaisesMessage(CommandError, "idle"):
+            call_command("import_tasks", resume=str(task_import.pk), stdout=mock.Mock())
+
+        TaskImport.objects.filter(pk=task_import.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        call_command("import_tasks", resume=str(task_import.pk), stdout=mock.Mock())
+        self.assertEqual(len(self.titles()), 4)
+
+
+@skipUnless(MessagePackParser.available, "msgpack is not installed")
+@override_settings(ACTIVITY_LOG={"MODE": "sync"})
+class MessagePackTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="msgpack@example.com", password=None)
+        cls.task = Task.objects.create(user=cls.user, title="Packed")
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_patch_with_a_timestamp(self):
+        due = timezone.now().replace(microsecond=0) + timedelta(days=1)
+        response = self.client.patch(
+            f"/api/tasks/{self.task.pk}/",
+            msgpack.packb({"due_date": due}, datetime=True),
+            content_type="application/msgpack",
+            HTTP_ACCEPT="application/msgpack",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(parse_datetime(msgpack.unpackb(response.content)["due_date"]), due)
+        self.assertEqual(Task.objects.get(pk=self.task.pk).due_date, due)
+        log = ActivityLog.objects.get(task=self.task, action="updated")
+        self.assertEqual(log.details, {"updated_fields": {"due_date": due.isoformat()}})
+
+
+@override_settings(TASK_SYNC={"SETTLE_TIME": 0})
+class DeltaSyncTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="sync@example.com", password=None)
+        cls.tasks = [Task.objects.create(user=cls.user, title=f"Task {i}") for i in range(5)]
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def changes(self, cursor=None, **params):
+        if cursor:
+            params["since"] = cursor
+        response = self.client.get("/api/tasks/changes/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def drain(self, cursor=None, page_size=2):
+        changed, deleted = [], []
+        while True:
+            page = self.changes(cursor, page_size=page_size)
+            changed += [task["id"] for task in page["changed"]]
+            deleted += page["deleted"]
+            cursor = page["cursor"]
+            if not page["has_more"]:
+                return changed, deleted, cursor
+
+    def test_full_download_pages_without_gaps(self):
+        changed, deleted, _ = self.drain()
+        self.assertEqual(sorted(changed), sorted(str(task.pk) for task in self.tasks))
+        self.assertEqual(deleted, [])
+
+    def test_changes_since_a_cursor_include_deletions(self):
+        _, _, cursor = self.drain()
+        updated, removed = self.tasks[0], self.tasks[1].pk
+        # Timestamps are moved past the cursor, which was taken at the current time.
+        Task.objects.filter(pk=updated.pk).update(title="Changed", updated_at=timezone.now() + timedelta(seconds=1))
+        Task.objects.get(pk=removed).delete()
+        TaskTombstone.objects.filter(task_id=removed).update(deleted_at=timezone.now() + timedelta(seconds=1))
+        created = Task.objects.create(user=self.user, title="New")
+        Task.objects.filter(pk=created.pk).update(updated_at=timezone.now() + timedelta(seconds=2))
+
+        changed, deleted, cursor = self.drain(cursor, page_size=1)
+        self.assertEqual(changed, [str(updated.pk), str(created.pk)])
+        self.assertEqual(deleted, [str(removed)])
+
+    def test_invalid_and_expired_cursors(self):
+        self.assertEqual(self.client.get("/api/tasks/changes/", {"since": "garbage"}).status_code, 400)
+        expired = task_sync.encode_cursor((timezone.now() - timedelta(days=91), None))
+        self.assertEqual(self.client.get("/api/tasks/changes/", {"since": expired}).status_code, 410)
+
+
+@override_settings(TIME_ZONE="Asia/Kolkata")
+class ListFastPathTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="fast-path@example.com", password=None)
+        category = Category.objects.create(name="fast-path-category")
+        tags = [Tag.objects.create(name=name) for name in ("zeta", "alpha", "mid")]
+        due = timezone.now().replace(microsecond=123456) + timedelta(days=2)
+        for i in range(6):
+            task = Task.objects.create(
+                user=cls.user,
+                title=f"Task {i}",
+                description="" if i % 2 else f"About task {i}",
+                category=category if i % 3 else None,
+                due_date=due + timedelta(hours=i) if i % 2 else None,
+                remind_at=due if i == 4 else None,
+            )
+            # Linked out of name and creation order.
+            for tag in reversed(tags[: i % 4]):
+                task.tags.add(tag)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def assertSameWithAndWithoutFastPath(self, params):
+        responses = {}
+        for fast_path in (True, False):
+            with override_settings(TASK_LIST_FAST_PATH=fast_path):
+                response = self.client.get("/api/tasks/", params)
+            self.assertEqual(response.status_code, 200)
+            responses[fast_path] = response.json()
+        self.assertEqual(responses[True], responses[False])
+        return responses[True]["results"]
+
+    def test_full_rows_match_the_serializer(self):
+        results = self.assertSameWithAndWithoutFastPath({})
+        self.assertEqual(len(results), 6)
+        # Tasks without a category have no category_name key at all.
+        self.assertEqual(sum("category_name" not in task for task in results), 2)
+        self.assertTrue(any(task["due_date"] and task["due_date"].endswith("+05:30") for task in results))
+
+    def test_sparse_rows_match_the_serializer(self):
+        self.assertSameWithAndWithoutFastPath({"fields": "id,tag_names,due_date"})
+        self.assertSameWithAndWithoutFastPath({"exclude": "tag_names,description", "page_size": 2})
+
+
+class ConditionalGetTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="conditional@example.com", password=None)
+        cls.done = Task.objects.create(user=cls.user, title="Done", status="Completed")
+        cls.open = Task.objects.create(user=cls.user, title="Open")
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def etag(self, url, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response["ETag"]
+
+    def test_repeated_if_none_match_is_not_modified(self):
+        for url in ("/api/tasks/", f"/api/tasks/{self.done.pk}/"):
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=self.etag(url))
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b"")
+
+    def test_deletion_changes_the_list_etag(self):
+        # The deleted task isn't in the filtered list: only its tombstone can change the tag.
+        etag = self.etag("/api/tasks/", {"status": "Completed"})
+        self.open.delete()
+        response = self.client.get("/api/tasks/", {"status": "Completed"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_sparse_fieldset_has_its_own_detail_etag(self):
+        url = f"/api/tasks/{self.done.pk}/"
+        etag = self.etag(url)
+        self.assertNotEqual(self.etag(url, {"fields": "id,title"}), etag)
+        response = self.client.get(url, {"fields": "id,title"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_modified_since(self):
+        Task.objects.filter(pk=self.done.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        url = f"/api/tasks/{self.done.pk}/"
+        last_modified = self.client.get(url)["Last-Modified"]
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+    def test_no_last_modified_within_the_second_of_a_change(self):
+        url = f"/api/tasks/{self.done.pk}/"
+        self.assertEqual(self.client.patch(url, {"title": "Done again"}, format="json").status_code, 200)
+        updated_at = Task.objects.values_list("updated_at", flat=True).get(pk=self.done.pk)
+        # A client holding a Last-Modified for this second may have read before the PATCH.
+        with mock.patch("django.utils.timezone.now", return_value=updated_at):
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(updated_at.timestamp()))
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("Last-Modified", response)
+            self.assertEqual(self.client.get("/api/tasks/", HTTP_IF_MODIFIED_SINCE=http_date(updated_at.timestamp())).status_code, 200)
+
+
+@skipUnless(connection.vendor in ("sqlite", "postgresql"), "no full-text search backend for this database")
+class SearchTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="search@example.com", password=None)
+        # Created last, so it would come first in plain created_at order.
+        cls.in_description = Task.objects.create(user=cls.user, title="Weekly sync", description="Draft the budget report")
+        cls.in_title = Task.objects.create(user=cls.user, title="Budget report", description="For the board")
+        Task.objects.filter(pk=cls.in_title.pk).update(created_at=timezone.now() - timedelta(days=1))
+        Task.objects.create(user=cls.user, title="Groceries", description="Milk and eggs")
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_title_matches_rank_above_description_matches(self):
+        response = self.client.get("/api/tasks/", {"search": "report"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [task["id"] for task in response.data["results"]],
+            [str(self.in_title.pk), str(self.in_description.pk)],
+        )
+
+    def test_search_uses_offset_pagination(self):
+        response = self.client.get("/api/tasks/", {"search": "budget"})
+        self.assertEqual((response.data["count"], len(response.data["results"])), (2, 2))
+        self.assertNotIn("count", self.client.get("/api/tasks/").data)
+
+
+class TaskLogArchiveTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="log-archive@example.com", password=None)
+        cls.task = Task.objects.create(user=cls.user, title="Long history")
+        Task.objects.filter(pk=cls.task.pk).update(created_at=datetime(2025, 12, 1, tzinfo=dt_timezone.utc))
+        cls.task.refresh_from_db()
+        for action in ("live-1", "live-2"):
+            ActivityLog.objects.create(task=cls.task, user=cls.user, action=action)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        start, end = datetime(2026, 1, 1, tzinfo=dt_timezone.utc), datetime(2026, 2, 1, tzinfo=dt_timezone.utc)
+        rows = [
+            {"id": str(uuid.uuid4()), "task_id": str(self.task.pk), "user_id": str(self.user.pk),
+             "action": f"archived-{day}", "details": None, "timestamp": start.replace(day=day)}
+            for day in range(1, 6)
+        ]
+        path, index_path, count = activity_archive.write_archive(directory.name, "2026-01", rows)
+        ActivityArchive.objects.create(label="2026-01", start=start, end=end, path=path, index_path=index_path, rows=count)
+        override = override_settings(ACTIVITY_LOG_RETENTION={"ARCHIVE_LOOKUP": True})
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def walk(self, url):
+        actions, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data["results"]), 2)
+            actions += [entry["action"] for entry in response.data["results"]]
+            url, pages = response.data["next"], pages + 1
+        return actions, pages
+
+    def test_archived_entries_are_paged_after_the_live_ones(self):
+        actions, pages = self.walk(f"/api/tasks/{self.task.pk}/logs/?include_archived=true&page_size=2")
+        self.assertEqual(actions, ["live-2", "live-1", "archived-5", "archived-4", "archived-3", "archived-2", "archived-1"])
+        self.assertEqual(pages, 4)
+
+    def test_without_live_entries_the_first_page_is_bounded_too(self):
+        ActivityLog.objects.filter(task=self.task).delete()
+        response = self.client.get(f"/api/tasks/{self.task.pk}/logs/", {"include_archived": "true", "page_size": 2})
+        self.assertEqual(response.data["results"], [])
+        response = self.client.get(response.data["next"])
+        self.assertEqual([entry["action"] for entry in response.data["results"]], ["archived-5", "archived-4"])
+        self.assertIsNone(response.data["previous"])
+        response = self.client.get(response.data["next"])
+        self.assertEqual([entry["action"] for entry in response.data["results"]], ["archived-3", "archived-2"])
+        self.assertIn("archived=0", response.data["previous"])
+
+    def test_archive_is_left_out_unless_asked_for(self):
+        actions, _ = self.walk(f"/api/tasks/{self.task.pk}/logs/?page_size=2")
+        self.assertEqual(actions, ["live-2", "live-1"])
+        response = self.client.get(f"/api/tasks/{self.task.pk}/logs/", {"include_archived": "true", "archived": "-1"})
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(ACTIVITY_LOG={"MODE": "sync"})
+class TaskCounterTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="counted@example.com", password=None)
+        cls.other = User.objects.create_user(email="counted-other@example.com", password=None)
+        cls.work, cls.home = (Category.objects.create(name=name) for name in ("counted-work", "counted-home"))
+        Task.objects.create(user=cls.other, title="Someone else's", category=cls.work)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def assertCountersMatch(self, step):
+        with self.subTest(step=step):
+            self.assertEqual(stats.stored_counters(), stats.compute_counters())
+
+    def test_counters_follow_every_kind_of_write(self):
+        new = {"title": "One", "status": "Incomplete", "priority": "Low"}
+        task_id = self.client.post("/api/tasks/", new, format="json").data["id"]
+        self.assertCountersMatch("create")
+
+        self.client.patch(f"/api/tasks/{task_id}/", {"status": "Completed"}, format="json")
+        self.assertCountersMatch("patch status")
+        self.client.put(f"/api/tasks/{task_id}/", {**new, "priority": "High"}, format="json")
+        self.assertCountersMatch("put priority")
+        self.client.post(f"/api/tasks/{task_id}/add-category/", {"category_id": str(self.home.pk)}, format="json")
+        self.assertCountersMatch("add category")
+
+        created = self.client.post("/api/tasks/bulk/", [
+            {**new, "title": "Bulk 1", "category_id": str(self.work.pk)},
+            {**new, "title": "Bulk 2", "priority": "Medium"},
+            {**new, "title": "Bulk 3", "status": "Completed", "category_id": str(self.home.pk)},
+        ], format="json").data["created"]
+        self.assertCountersMatch("bulk create")
+        ids = [task["id"] for task in created]
+        response = self.client.patch("/api/tasks/bulk/", [
+            {"id": ids[0], "status": "Completed", "category_id": str(self.home.pk)},
+            {"id": ids[1], "priority": "High", "category_id": None},
+        ], format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertCountersMatch("bulk update")
+        self.assertEqual(self.client.delete("/api/tasks/bulk/", ids[1:], format="json").status_code, 200)
+        self.assertCountersMatch("bulk delete")
+
+        self.client.delete(f"/api/tasks/{task_id}/")
+        self.assertCountersMatch("delete")
+        self.assertEqual(self.client.delete(f"/api/categories/{self.work.pk}/").status_code, 204)
+        self.assertCountersMatch("category delete")
+        counts = stats.user_stats(self.user)
+        self.assertEqual(counts[TaskCounter.CATEGORY], {str(self.home.pk): 1})
+        self.assertEqual(counts[TaskCounter.STATUS], {"Completed": 1})
+
+
+class SparseFieldsetTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="fields@example.com", password=None)
+        category = Category.objects.create(name="fields-category")
+        cls.task = Task.objects.create(user=cls.user, title="Sparse", description="Long text", category=category)
+        cls.task.tags.add(Tag.objects.create(name="fields-tag"))
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def get(self, url, params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data["results"][0] if "results" in response.data else response.data
+
+    def test_fields_and_exclude(self):
+        everything_but = [name for name in fieldsets.FIELDS if name not in ("description", "tag_names")]
+        for fast_path in (True, False):
+            for url in ("/api/tasks/", f"/api/tasks/{self.task.pk}/"):
+                with self.subTest(url=url, fast_path=fast_path), override_settings(TASK_LIST_FAST_PATH=fast_path):
+                    task = self.get(url, {"fields": "title,id"})
+                    self.assertEqual(task, {"id": str(self.task.pk), "title": "Sparse"})
+                    self.assertEqual(list(self.get(url, {"exclude": "description,tag_names"})), everything_but)
+                    task = self.get(url, {"fields": "id,category_name,tag_names", "exclude": "id"})
+                    self.assertEqual(task, {"category_name": "fields-category", "tag_names": ["fields-tag"]})
+
+    def test_unselected_relations_are_not_loaded(self):
+        for fast_path in (True, False):
+            with self.subTest(fast_path=fast_path), override_settings(TASK_LIST_FAST_PATH=fast_path):
+                # ETag aggregate + latest tombstone + the page, without the tags query.
+                with self.assertNumQueries(3):
+                    self.get("/api/tasks/", {"fields": "id,title"})
+
+    def test_unknown_fields_are_rejected(self):
+        for url in ("/api/tasks/", f"/api/tasks/{self.task.pk}/"):
+            with self.subTest(url=url):
+                response = self.client.get(url, {"fields": "id,owner", "exclude": "secret"})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(sorted(response.data), ["exclude", "fields"])
+                self.assertIn("owner", str(response.data["fields"][0]))
+
+
+class TaskPaginationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="pages@example.com", password=None)
+        tasks = [Task.objects.create(user=cls.user, title=f"Task {i}") for i in range(12)]
+        # Several tasks share a created_at: only the id tiebreaker orders them.
+        same = timezone.now() - timedelta(hours=1)
+        Task.objects.filter(pk__in=[task.pk for task in tasks[3:9]]).update(created_at=same)
+        cls.ids = [str(pk) for pk in Task.objects.filter(user=cls.user).order_by("-created_at", "-id").values_list("pk", flat=True)]
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_cursor_pages_have_no_duplicates_or_gaps(self):
+        url, seen, pages = "/api/tasks/?page_size=5", [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("count", response.data)
+            seen += [task["id"] for task in response.data["results"]]
+            url, pages = response.data["next"], pages + 1
+        self.assertEqual(seen, self.ids)
+        self.assertEqual(pages, 3)
+
+    def test_previous_link_returns_the_same_page(self):
+        first = self.client.get("/api/tasks/", {"page_size": 5})
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+        self.assertEqual([task["id"] for task in back.data["results"]], self.ids[:5])
+
+    def test_limit_offset_still_counts(self):
+        response = self.client.get("/api/tasks/", {"limit": 4, "offset": 4})
+        self.assertEqual(response.data["count"], 12)
+        self.assertEqual([task["id"] for task in response.data["results"]], self.ids[4:8])
+        self.assertIn("offset=8", response.data["next"])
+
+
+class TagFilterTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="tag-filter@example.com", password=None)
+        urgent, home = (Tag.objects.create(name=name) for name in ("filter-urgent", "filter-home"))
+        cls.both = Task.objects.create(user=cls.user, title="Both")
+        cls.both.tags.add(urgent, home)
+        cls.urgent_only = Task.objects.create(user=cls.user, title="Urgent only")
+        cls.urgent_only.tags.add(urgent)
+        Task.objects.create(user=cls.user, title="Untagged")
+
+    def setUp(self):
+        # Names resolved by earlier tests may point at rows that were rolled back.
+        tag_cache.clear()
+        self.addCleanup(tag_cache.clear)
+        self.client.force_authenticate(self.user)
+
+    def titles(self, **params):
+        response = self.client.get("/api/tasks/", params)
+        self.assertEqual(response.status_code, 200)
+        return sorted(task["title"] for task in response.data["results"])
+
+    def test_any_lists_each_matching_task_once(self):
+        self.assertEqual(self.titles(tags="filter-urgent,filter-home"), ["Both", "Urgent only"])
+        self.assertEqual(self.titles(tags="filter-home"), ["Both"])
+        self.assertEqual(self.titles(tags="filter-urgent,filter-unknown"), ["Both", "Urgent only"])
+
+    def test_all_requires_every_tag(self):
+        self.assertEqual(self.titles(tags="filter-urgent,filter-home", tags_mode="all"), ["Both"])
+        self.assertEqual(self.titles(tags="filter-urgent", tags_mode="all"), ["Both", "Urgent only"])
+        self.assertEqual(self.titles(tags="filter-urgent,filter-unknown", tags_mode="all"), [])
+        self.assertEqual(self.client.get("/api/tasks/", {"tags": "filter-home", "tags_mode": "some"}).status_code, 400)
+
+
+class RefusingThrottle(BaseThrottle):
+    def allow_request(self, request, view):
+        return False
+
+
+@override_settings(ACTIVITY_LOG={"MODE": "sync"})
+class AsyncViewTests(APITestCase):
+    """The ASGI handlers (tasks/async_views.py) answer exactly as TaskViewSet does."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="async@example.com", password=None)
+        other = User.objects.create_user(email="async-other@example.com", password=None)
+        cls.task = Task.objects.create(user=cls.user, title="Served", remind_at=timezone.now() + timedelta(days=1))
+        Task.objects.create(user=cls.user, title="Later", status="Completed")
+        cls.foreign = Task.objects.create(user=other, title="Foreign")
+        ActivityLog.objects.create(task=cls.task, user=cls.user, action="created")
+
+    def setUp(self):
+        self.headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+
+    def assertSameResponse(self, path, headers=None):
+        headers = self.headers if headers is None else headers
+        expected = self.client.get(path, headers=headers)
+        response = async_to_sync(self.async_client.get)(path, headers=headers)
+        self.assertEqual(response.resolver_match.func.__module__, "tasks.async_views")
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.json(), expected.json())
+        self.assertEqual(response.get("WWW-Authenticate"), expected.get("WWW-Authenticate"))
+        return response
+
+    def test_list_matches_the_sync_view(self):
+        self.assertEqual(len(self.assertSameResponse("/api/tasks/").json()["results"]), 2)
+        self.assertSameResponse("/api/tasks/?status=Completed&fields=id,title")
+
+    def test_detail_matches_the_sync_view(self):
+        self.assertSameResponse(f"/api/tasks/{self.task.pk}/")
+
+    def test_logs_match_the_sync_view(self):
+        response = self.assertSameResponse(f"/api/tasks/{self.task.pk}/logs/")
+        self.assertEqual([entry["action"] for entry in response.json()["results"]], ["created"])
+
+    def test_reminders_match_the_sync_view(self):
+        response = self.assertSameResponse("/api/tasks/reminders/")
+        self.assertEqual([reminder["title"] for reminder in response.json()], ["Served"])
+
+    def test_unauthenticated_requests_get_401(self):
+        for path in ("/api/tasks/", f"/api/tasks/{self.task.pk}/", "/api/tasks/reminders/"):
+            with self.subTest(path=path):
+                self.assertEqual(self.assertSameResponse(path, headers={}).status_code, 401)
+        response = self.assertSameResponse("/api/tasks/", headers={"Authorization": "Bearer not-a-token"})
+        self.assertEqual(response.status_code, 401)
+
+    def test_unknown_and_foreign_tasks_get_404(self):
+        for pk in (uuid.uuid4(), self.foreign.pk):
+            for path in (f"/api/tasks/{pk}/", f"/api/tasks/{pk}/logs/"):
+                with self.subTest(path=path):
+                    self.assertEqual(self.assertSameResponse(path).status_code, 404)
+
+    def test_view_permissions_and_throttles_apply(self):
+        with mock.patch.object(TaskViewSet, "permission_classes", [IsAdminUser]):
+            self.assertEqual(self.assertSameResponse("/api/tasks/").status_code, 403)
+        with mock.patch.object(TaskViewSet, "throttle_classes", [RefusingThrottle]):
+            self.assertEqual(self.assertSameResponse(f"/api/tasks/{self.task.pk}/").status_code, 429)
+
+
+class EventBrokerTests(SimpleTestCase):
+    def broker(self, **config):
+        return InMemoryBroker({**get_events_config(), **config})
+
+    async def test_events_reach_the_users_subscriptions_only(self):
+        broker = self.broker()
+        subscription, other = broker.subscribe(1), broker.subscribe(2)
+        broker.publish(1, "task.updated", {"id": 7})
+        self.assertEqual(await asyncio.wait_for(subscription.get(), 1), ("task.updated", '{"id":7}'))
+        self.assertTrue(other.queue.empty())
+
+        broker.unsubscribe(subscription)
+        broker.publish(1, "task.updated", {"id": 8})
+        await asyncio.sleep(0)
+        self.assertTrue(subscription.queue.empty())
+
+    async def test_overflow_collapses_into_one_resync(self):
+        broker = self.broker(QUEUE_SIZE=2)
+        subscription = broker.subscribe(1)
+        for pk in range(3):
+            broker.publish(1, "task.updated", {"id": pk})
+        await asyncio.sleep(0)
+        self.assertEqual(await subscription.get(), (RESYNC, "{}"))
+        self.assertTrue(subscription.queue.empty())
+        self.assertEqual(broker.metrics()["dropped"], 2)
+
+    async def test_connection_limits(self):
+        broker = self.broker(MAX_CONNECTIONS=2, MAX_CONNECTIONS_PER_USER=1)
+        first = broker.subscribe(1)
+        with self.assertRaises(TooManyConnections) as raised:
+            broker.subscribe(1)
+        self.assertTrue(raised.exception.per_user)
+        broker.subscribe(2)
+        with self.assertRaises(TooManyConnections) as raised:
+            broker.subscribe(3)
+        self.assertFalse(raised.exception.per_user)
+
+        broker.unsubscribe(first)
+        broker.subscribe(3)
+        self.assertEqual(
+            {key: broker.metrics()[key] for key in ("connections", "peak_connections", "rejected")},
+            {"connections": 2, "peak_connections": 2, "rejected": 2},
+        )
+
+
+@override_settings(TASK_EXPORT_CHUNK_SIZE=1)
+class TaskExportTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="export@example.com", password=None)
+        other = User.objects.create_user(email="export-other@example.com", password=None)
+        category = Category.objects.create(name="export-category")
+        cls.tagged = Task.objects.create(user=cls.user, title="Tagged", category=category)
+        cls.tagged.tags.add(*(Tag.objects.create(name=name) for name in ("export-zeta", "export-alpha")))
+        cls.plain = Task.objects.create(user=cls.user, title="Plain", status="Completed")
+        Task.objects.create(user=other, title="Not mine", category=category)
+
+    def setUp(self):
+        # Names resolved by earlier tests may point at rows that were rolled back.
+        category_cache.clear()
+        tag_cache.clear()
+        self.addCleanup(category_cache.clear)
+        self.addCleanup(tag_cache.clear)
+        self.client.force_authenticate(self.user)
+
+    def export(self, **params):
+        response = self.client.get("/api/tasks/export/", params)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def test_ndjson_has_the_users_tasks_with_tags_and_category(self):
+        rows = {row["title"]: row for row in map(json.loads, self.export().splitlines())}
+        self.assertEqual(set(rows), {"Tagged", "Plain"})
+        self.assertEqual(rows["Tagged"]["id"], str(self.tagged.pk))
+        self.assertEqual(rows["Tagged"]["tags"], ["export-alpha", "export-zeta"])
+        self.assertEqual(rows["Tagged"]["category_name"], "export-category")
+        self.assertEqual((rows["Plain"]["tags"], rows["Plain"]["category_name"]), ([], None))
+
+    def test_csv_has_the_users_tasks_with_tags_and_category(self):
+        reader = csv.DictReader(io.StringIO(self.export(export_format="csv")))
+        rows = {row["title"]: row for row in reader}
+        self.assertNotIn("user_id", reader.fieldnames)
+        self.assertEqual(set(rows), {"Tagged", "Plain"})
+        self.assertEqual(rows["Tagged"]["tags"], "export-alpha,export-zeta")
+        self.assertEqual(rows["Tagged"]["category_name"], "export-category")
+        self.assertEqual((rows["Plain"]["tags"], rows["Plain"]["category_name"]), ("", ""))
+
+    def test_filters_apply(self):
+        self.assertEqual([json.loads(line)["title"] for line in self.export(status="Completed").splitlines()], ["Plain"])
+        self.assertEqual(self.export(export_format="csv", status="Completed", tags="export-alpha").splitlines(), [",".join(task_export.FIELDS)])
+
+    def test_unknown_format_is_rejected(self):
+        self.assertEqual(self.client.get("/api/tasks/export/", {"export_format": "xml"}).status_code, 400)
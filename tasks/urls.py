@@ -1,8 +1,10 @@
 # tasks/urls.py
 from rest_framework.routers import DefaultRouter
-from .views import TaskViewSet
+from .views import TaskImportViewSet, TaskViewSet
 
 router = DefaultRouter()
+# Registered first: the task routes would otherwise match "imports" as a task id.
+router.register(r'imports', TaskImportViewSet, basename='task-import')
 router.register(r'', TaskViewSet, basename='task')
 
 urlpatterns = router.urls
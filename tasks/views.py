@@ -1,46 +1,42 @@
-from rest_framework import viewsets
+from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q
-from django.shortcuts import get_object_or_404
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import StreamingHttpResponse
 from django.utils import timezone
-from django_filters.rest_framework import DjangoFilterBackend, FilterSet, CharFilter, DateFilter, ChoiceFilter
-from drf_yasg.utils import swagger_auto_schema
+from django_filters.rest_framework import DjangoFilterBackend
+from drf_yasg.utils import no_body, swagger_auto_schema
 from drf_yasg import openapi
 
-from .models import Task
-from .serializers import TaskSerializer, ActivityLogSerializer, TaskCategorySerializer, TaskTagSerializer
+from .bulk import bulk_create_tasks, bulk_delete_tasks, bulk_update_tasks
+from .conditional import detail_validators, list_validators, not_modified, set_validators
+from . import events as task_events
+from . import export as task_export
+from . import fieldsets
+from . import importer
+from . import rows as task_rows
+from .filters import TaskFilter
+from . import stats as task_stats
+from . import sync as task_sync
+from .models import Task, TaskCounter, TaskImport
+from .pagination import TaskCursorPagination, TaskImportErrorPagination, TaskOffsetPagination
+from .serializers import (
+    TaskSerializer, ActivityLogSerializer, BulkTaskSerializer, BulkTaskTagSerializer,
+    TaskCategorySerializer, TaskTagSerializer, TaskTagReplaceSerializer,
+    TaskImportSerializer, TaskImportUploadSerializer, TaskImportErrorSerializer,
+)
+from .tasks import run_task_import
+from .tagging import ADD, REMOVE, REPLACE, edit_tags
+from activity.archive import archived_task_logs
 from activity.models import ActivityLog
-from categories.models import Category
-from tags.models import Tag
-
-
-class TaskFilter(FilterSet):
-    """
-    Explicit/structured filters for tasks list endpoint.
-    - priority, status: Choice filters using Task model choices
-    - category: match by category name (case-insensitive)
-    - tags: comma-separated tag names -> tasks that have any of these tags
-    - due_before, due_after: date filters against due_date
-    """
-    priority = ChoiceFilter(field_name="priority", choices=Task.PRIORITY_CHOICES, lookup_expr='iexact')
-    status = ChoiceFilter(field_name="status", choices=Task.STATUS_CHOICES, lookup_expr='iexact')
-    category = CharFilter(field_name="category__name", lookup_expr="iexact")
-    tags = CharFilter(method='filter_tags')  # comma-separated names
-    due_before = DateFilter(field_name="due_date", lookup_expr="lte")
-    due_after = DateFilter(field_name="due_date", lookup_expr="gte")
-
-    class Meta:
-        model = Task
-        fields = ["priority", "status", "category", "tags", "due_before", "due_after"]
-
-    def filter_tags(self, queryset, name, value):
-        # allow comma-separated tag names: ?tags=Urgent,Important
-        names = [t.strip() for t in value.split(",") if t.strip()]
-        if not names:
-            return queryset
-        return queryset.filter(tags__name__in=names).distinct()
+from activity.pagination import ActivityArchivePagination
+from activity.recorder import record_activity
+from categories.cache import category_cache
+from tags.cache import tag_cache
 
 
 # Manual swagger parameters for list (so they appear in Swagger UI)
@@ -49,22 +45,75 @@ SWAGGER_TASK_LIST_PARAMS = [
     openapi.Parameter("status", openapi.IN_QUERY, description="Filter by status (Incomplete|Completed)", type=openapi.TYPE_STRING),
     openapi.Parameter("category", openapi.IN_QUERY, description="Filter by category name (case-insensitive)", type=openapi.TYPE_STRING),
     openapi.Parameter("tags", openapi.IN_QUERY, description="Filter by tag names (comma-separated)", type=openapi.TYPE_STRING),
+    openapi.Parameter("tags_mode", openapi.IN_QUERY, description="How to match tags: any (default) or all", type=openapi.TYPE_STRING, enum=["any", "all"]),
     openapi.Parameter("due_before", openapi.IN_QUERY, description="Tasks due on or before date (YYYY-MM-DD)", type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE),
     openapi.Parameter("due_after", openapi.IN_QUERY, description="Tasks due on or after date (YYYY-MM-DD)", type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE),
+    openapi.Parameter("search", openapi.IN_QUERY, description="Full-text search over title, description, tags and category; results are ranked by relevance", type=openapi.TYPE_STRING),
+    openapi.Parameter("cursor", openapi.IN_QUERY, description="Opaque cursor from the previous page's next/previous link", type=openapi.TYPE_STRING),
+    openapi.Parameter("page_size", openapi.IN_QUERY, description="Tasks per page (cursor mode, max 500)", type=openapi.TYPE_INTEGER),
+    openapi.Parameter("limit", openapi.IN_QUERY, description="Opt into offset pagination: tasks per page (max 500)", type=openapi.TYPE_INTEGER),
+    openapi.Parameter("offset", openapi.IN_QUERY, description="Opt into offset pagination: number of tasks to skip", type=openapi.TYPE_INTEGER),
+]
+
+SWAGGER_TASK_FIELDS_PARAMS = [
+    openapi.Parameter("fields", openapi.IN_QUERY, description=f"Only these fields (comma-separated): {', '.join(fieldsets.FIELDS)}", type=openapi.TYPE_STRING),
+    openapi.Parameter("exclude", openapi.IN_QUERY, description="Leave out these fields (comma-separated)", type=openapi.TYPE_STRING),
 ]
 
+SWAGGER_TASK_CHANGES_PARAMS = [
+    openapi.Parameter("since", openapi.IN_QUERY, description="Cursor from the previous call; omit for a full download", type=openapi.TYPE_STRING),
+    openapi.Parameter("page_size", openapi.IN_QUERY, description="Changes per response (max 2000)", type=openapi.TYPE_INTEGER),
+] + SWAGGER_TASK_FIELDS_PARAMS
+
+SWAGGER_TASK_EXPORT_PARAMS = [
+    param for param in SWAGGER_TASK_LIST_PARAMS if param.name not in ("cursor", "page_size", "limit", "offset")
+] + [
+    openapi.Parameter("export_format", openapi.IN_QUERY, description="ndjson (default) or csv", type=openapi.TYPE_STRING, enum=list(task_export.FORMATS)),
+]
+
+
+def reminder_data(task):
+    return {"task_id": str(task["id"]), "title": task["title"], "remind_at": task["remind_at"]}
+
 
 class TaskViewSet(viewsets.ModelViewSet):
     """
     ModelViewSet for Task:
-    - List (GET /tasks/) supports explicit filters: priority, status, category, tags, due_before, due_after
+    - List (GET /tasks/) supports explicit filters: priority, status, category, tags, tags_mode, due_before, due_after
+    - List is cursor-paginated; passing ?limit= or ?offset= switches to offset pagination,
+      as does ?search= (relevance order has no stable keyset to page on)
+    - List and Retrieve send ETag/Last-Modified and answer If-None-Match/If-Modified-Since with 304
+    - List and Retrieve take ?fields= / ?exclude= (sparse fieldsets): only the chosen fields
+      are serialized, and only the columns and relations they need are loaded
     - Create / Retrieve / Update / Delete operations
-    - Extra actions: add-category, add-tag, logs, reminders
+    - Extra actions: add-category, add-tag, remove-tag, tags (PUT replaces), bulk-tags, logs,
+      reminders, stats. Tag edits only write the links that change.
+    - Export (GET /tasks/export/): every matching task streamed as NDJSON or CSV, same filters
+      as the list
+    - Changes (GET /tasks/changes/?since=<cursor>): tasks created, updated or deleted since the
+      previous call, for offline clients (delta sync)
+    - Bulk (POST/PATCH/DELETE /tasks/bulk/): many tasks in one request and one transaction;
+      per-item errors are reported unless ?atomic=true, which rejects the whole batch
+    - Every write publishes task.created/updated/deleted to the user's event streams
+      (tasks/events.py)
     """
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_class = TaskFilter
+    pagination_class = TaskCursorPagination
+
+    @property
+    def paginator(self):
+        # Offset pagination is opt-in: any request carrying limit/offset gets it. Search
+        # results are ordered by rank, which the created_at cursor can't follow.
+        if not hasattr(self, "_paginator"):
+            params = self.request.query_params if self.request is not None else {}
+            if "limit" in params or "offset" in params or params.get("search"):
+                self._paginator = TaskOffsetPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
 
     # Don't set a global queryset attribute because get_queryset customizes it per-user.
     def get_queryset(self):
@@ -72,36 +121,92 @@ class TaskViewSet(viewsets.ModelViewSet):
         # Avoid evaluating `self.request.user` in that case.
         if getattr(self, "swagger_fake_view", False):
             return Task.objects.none()
-        return Task.objects.filter(user=self.request.user).distinct()
+        queryset = Task.objects.filter(user=self.request.user)
+        if self.action == "retrieve" or (self.action == "list" and not settings.TASK_LIST_FAST_PATH):
+            if self.selected_fields is not None:
+                return fieldsets.narrow(queryset, self.selected_fields)
+            # category and tags are rendered by TaskSerializer; load them up front so a page
+            # of tasks costs a constant number of queries instead of two per row.
+            queryset = queryset.select_related("category").prefetch_related("tags")
+        return queryset
+
+    @property
+    def selected_fields(self):
+        """The sparse fieldset of a list, retrieve or changes request, or None for every field."""
+        if not hasattr(self, "_selected_fields"):
+            self._selected_fields = None
+            if self.action in ("list", "retrieve", "changes") and not getattr(self, "swagger_fake_view", False):
+                self._selected_fields = fieldsets.selected_fields(self.request.query_params)
+        return self._selected_fields
+
+    def get_serializer(self, *args, **kwargs):
+        if self.selected_fields is not None:
+            kwargs.setdefault("fields", self.selected_fields)
+        return super().get_serializer(*args, **kwargs)
 
-    @swagger_auto_schema(manual_parameters=SWAGGER_TASK_LIST_PARAMS)
+    @swagger_auto_schema(manual_parameters=SWAGGER_TASK_LIST_PARAMS + SWAGGER_TASK_FIELDS_PARAMS)
     def list(self, request, *args, **kwargs):
         """List tasks (supports explicit filtering via query params)."""
-        return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        etag, last_modified = list_validators(request, queryset)
+        cached = not_modified(request, etag, last_modified)
+        if cached is not None:
+            return set_validators(cached, etag, last_modified)
+        return set_validators(self.get_paginated_response(self.list_page(queryset)), etag, last_modified)
+
+    def list_page(self, queryset):
+        """Serialized tasks of the requested page; shared with the async view."""
+        if settings.TASK_LIST_FAST_PATH:
+            # Read-only rows instead of model instances and TaskSerializer (tasks/rows.py).
+            fields = self.selected_fields
+            return task_rows.serialize(self.paginate_queryset(task_rows.project(queryset, fields)), fields)
+        return self.get_serializer(self.paginate_queryset(queryset), many=True).data
 
     def perform_create(self, serializer):
         task = serializer.save(user=self.request.user)
-        ActivityLog.objects.create(
-            task=task,
-            user=self.request.user,
-            action="created",
-            details={"title": task.title},
-        )
+        record_activity(task, self.request.user, "created", {"title": task.title})
+        task_events.tasks_changed(self.request.user.pk, task_events.CREATED, [task.pk])
 
     def perform_update(self, serializer):
         task = serializer.save()
-        ActivityLog.objects.create(
-            task=task,
-            user=self.request.user,
-            action="updated",
-            details={"updated_fields": self.request.data},
-        )
+        record_activity(task, self.request.user, "updated", {"updated_fields": self.request.data})
+        task_events.tasks_changed(self.request.user.pk, task_events.UPDATED, [task.pk])
+
+    def perform_destroy(self, instance):
+        task_id = instance.pk
+        instance.delete()
+        task_events.tasks_changed(self.request.user.pk, task_events.DELETED, [task_id])
 
+    def get_object(self):
+        # The viewset lives for one request: look the task up (and check permissions) once,
+        # then let retrieve and the detail actions reuse it.
+        if not hasattr(self, "_object"):
+            self._object = super().get_object()
+        return self._object
+
+    @swagger_auto_schema(manual_parameters=SWAGGER_TASK_FIELDS_PARAMS)
     def retrieve(self, request, *args, **kwargs):
+        if request.headers.get("If-None-Match") or request.headers.get("If-Modified-Since"):
+            # Revalidation: compare against updated_at without loading or serializing the task.
+            try:
+                updated_at = (
+                    Task.objects.filter(user=request.user, pk=kwargs[self.lookup_field])
+                    .values_list("updated_at", flat=True)
+                    .first()
+                )
+            except (ValueError, ValidationError):
+                updated_at = None
+            if updated_at is not None:
+                etag, last_modified = detail_validators(kwargs[self.lookup_field], updated_at, self.selected_fields)
+                cached = not_modified(request, etag, last_modified)
+                if cached is not None:
+                    return set_validators(cached, etag, last_modified)
+
         response = super().retrieve(request, *args, **kwargs)
         task = self.get_object()
-        ActivityLog.objects.create(task=task, user=request.user, action="retrieved")
-        return response
+        if settings.TASK_AUDIT_READS:
+            record_activity(task, request.user, "retrieved")
+        return set_validators(response, *detail_validators(task.pk, task.updated_at, self.selected_fields))
 
     # -------- CATEGORY --------
     @swagger_auto_schema(request_body=TaskCategorySerializer)
@@ -110,37 +215,289 @@ class TaskViewSet(viewsets.ModelViewSet):
         task = self.get_object()
         serializer = TaskCategorySerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        category = get_object_or_404(Category, id=serializer.validated_data["category_id"])
+        category = serializer.validated_data["category"]
         task.category = category
-        task.save()
-        ActivityLog.objects.create(task=task, user=request.user, action="category_added", details={"category": category.name})
+        task.save(update_fields=["category", "updated_at"])
+        record_activity(task, request.user, "category_added", {"category": category.name})
+        task_events.tasks_changed(request.user.pk, task_events.UPDATED, [task.pk])
         return Response({"task_id": str(task.id), "category_id": str(category.id), "category_name": category.name})
 
     # -------- TAGS --------
+    def _edit_tags(self, request, serializer_class, mode):
+        task = self.get_object()
+        serializer = serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        known = {tag.pk: tag for tag in serializer.validated_data["tag_objects"]}
+        linked = {}
+        changes = edit_tags([task.pk], known.values(), mode, request.user, linked=linked)
+        task_events.tasks_changed(request.user.pk, task_events.UPDATED, changes)
+        added, removed = changes.get(task.pk, ([], []))
+        # Tags the task already had are the only ones the serializer didn't resolve.
+        known.update(tag_cache.get_many([tag_id for tag_id in linked[task.pk] if tag_id not in known]))
+        tags = [known[tag_id] for tag_id in linked[task.pk] if tag_id in known]
+        return Response({
+            "task_id": str(task.id),
+            "tags": [{"id": str(tag.id), "name": tag.name} for tag in sorted(tags, key=lambda tag: tag.name)],
+            "added": [str(tag_id) for tag_id in added],
+            "removed": [str(tag_id) for tag_id in removed],
+        })
+
     @swagger_auto_schema(request_body=TaskTagSerializer)
     @action(detail=True, methods=["post"], url_path="add-tag")
     def add_tag(self, request, pk=None):
-        task = self.get_object()
-        serializer = TaskTagSerializer(data=request.data)
+        """Add tags to the task, keeping the ones it already has."""
+        return self._edit_tags(request, TaskTagSerializer, ADD)
+
+    @swagger_auto_schema(request_body=TaskTagSerializer)
+    @action(detail=True, methods=["post"], url_path="remove-tag")
+    def remove_tag(self, request, pk=None):
+        return self._edit_tags(request, TaskTagSerializer, REMOVE)
+
+    @swagger_auto_schema(request_body=TaskTagReplaceSerializer)
+    @action(detail=True, methods=["put"], url_path="tags")
+    def set_tags(self, request, pk=None):
+        """Replace the task's tags with the given set."""
+        return self._edit_tags(request, TaskTagReplaceSerializer, REPLACE)
+
+    @swagger_auto_schema(request_body=BulkTaskTagSerializer)
+    @action(detail=False, methods=["post"], url_path="bulk-tags")
+    def bulk_tags(self, request):
+        """Add, remove or replace the same tags on many tasks at once."""
+        serializer = BulkTaskTagSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        tags = Tag.objects.filter(id__in=serializer.validated_data["tags"])
-        task.tags.set(tags)
-        task.save()
-        ActivityLog.objects.create(task=task, user=request.user, action="tag_added", details={"tags": [tag.name for tag in tags]})
-        return Response({"task_id": str(task.id), "tags": [{"id": str(tag.id), "name": tag.name} for tag in tags]})
+        data = serializer.validated_data
+        task_ids = list(dict.fromkeys(data["task_ids"]))
+        if len(task_ids) > settings.TASK_BULK_MAX_ITEMS:
+            return Response({"detail": f"At most {settings.TASK_BULK_MAX_ITEMS} items per request."}, status=status.HTTP_400_BAD_REQUEST)
+        found = set(self.get_queryset().filter(pk__in=task_ids).values_list("pk", flat=True))
+        missing = [str(task_id) for task_id in task_ids if task_id not in found]
+        if missing:
+            return Response({"task_ids": [f"Tasks not found: {missing}"]}, status=status.HTTP_400_BAD_REQUEST)
+        changes = edit_tags(task_ids, data["tag_objects"], data["mode"], request.user)
+        task_events.tasks_changed(request.user.pk, task_events.UPDATED, changes)
+        return Response({
+            "changed": [
+                {
+                    "task_id": str(task_id),
+                    "added": [str(tag_id) for tag_id in added],
+                    "removed": [str(tag_id) for tag_id in removed],
+                }
+                for task_id, (added, removed) in changes.items()
+            ],
+            "unchanged": len(task_ids) - len(changes),
+        })
 
     # -------- LOGS --------
+    @swagger_auto_schema(manual_parameters=[
+        openapi.Parameter("include_archived", openapi.IN_QUERY, description="Also return entries from archived months (if ACTIVITY_LOG_RETENTION allows it); they follow the last page of live entries", type=openapi.TYPE_BOOLEAN),
+        openapi.Parameter("cursor", openapi.IN_QUERY, description="Opaque cursor from the previous page's next/previous link", type=openapi.TYPE_STRING),
+        openapi.Parameter("archived", openapi.IN_QUERY, description="Position in the archived entries, from the previous page's next/previous link", type=openapi.TYPE_INTEGER),
+        openapi.Parameter("page_size", openapi.IN_QUERY, description="Entries per page (max 500)", type=openapi.TYPE_INTEGER),
+    ])
     @action(detail=True, methods=["get"], url_path="logs")
     def logs(self, request, pk=None):
-        task = self.get_object()
-        logs = ActivityLog.objects.filter(task=task, user=request.user).order_by("-timestamp")
-        serializer = ActivityLogSerializer(logs, many=True)
-        return Response(serializer.data)
+        paginator, data = self.logs_page(self.get_object())
+        return paginator.get_paginated_response(data)
+
+    def logs_page(self, task):
+        """(paginator, serialized entries) for one page of the task's log; shared with the async view."""
+        request = self.request
+        archived = None
+        if request.query_params.get("include_archived") in ("1", "true", "True"):
+            archived = (
+                ActivityLog(
+                    id=entry["id"], task=task, user=request.user, action=entry["action"],
+                    details=entry["details"], timestamp=entry["timestamp"],
+                )
+                for entry in archived_task_logs(task.pk, since=task.created_at)
+                if str(entry["user_id"]) == str(request.user.pk)
+            )
+        paginator = ActivityArchivePagination()
+        logs = paginator.paginate_queryset(
+            ActivityLog.objects.filter(task=task, user=request.user).select_related("task", "user"),
+            request,
+            view=self,
+            archived=archived,
+        )
+        return paginator, ActivityLogSerializer(logs, many=True).data
+
+    # -------- BULK --------
+    def _bulk_payload(self, request, key):
+        payload = request.data
+        if isinstance(payload, dict):
+            payload = payload.get(key)
+        if not isinstance(payload, list) or not payload:
+            return None, Response({"detail": f"Expected a non-empty list (or {{\"{key}\": [...]}})."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(payload) > settings.TASK_BULK_MAX_ITEMS:
+            return None, Response({"detail": f"At most {settings.TASK_BULK_MAX_ITEMS} items per request."}, status=status.HTTP_400_BAD_REQUEST)
+        return payload, None
+
+    def _bulk_atomic(self, request):
+        return request.query_params.get("atomic", "").lower() in ("1", "true", "yes")
+
+    def _bulk_response(self, key, results, errors, success_status):
+        if errors and not results:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif errors:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = success_status
+        return Response({key: results, "errors": errors}, status=response_status)
+
+    def _serialize_bulk(self, tasks):
+        # Re-read with relations loaded so the response costs a constant number of queries.
+        loaded = Task.objects.filter(pk__in=[task.pk for task in tasks]).select_related("category").prefetch_related("tags")
+        loaded = {task.pk: task for task in loaded}
+        return self.get_serializer([loaded[task.pk] for task in tasks], many=True).data
+
+    @swagger_auto_schema(request_body=BulkTaskSerializer(many=True))
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        payload, error = self._bulk_payload(request, "tasks")
+        if error:
+            return error
+        tasks, errors = bulk_create_tasks(payload, request.user, self.get_serializer_context(), atomic=self._bulk_atomic(request))
+        task_events.tasks_changed(request.user.pk, task_events.CREATED, [task.pk for task in tasks])
+        return self._bulk_response("created", self._serialize_bulk(tasks), errors, status.HTTP_201_CREATED)
+
+    @swagger_auto_schema(request_body=BulkTaskSerializer(many=True))
+    @bulk.mapping.patch
+    def bulk_update(self, request):
+        payload, error = self._bulk_payload(request, "tasks")
+        if error:
+            return error
+        tasks, errors = bulk_update_tasks(payload, request.user, self.get_serializer_context(), atomic=self._bulk_atomic(request))
+        task_events.tasks_changed(request.user.pk, task_events.UPDATED, [task.pk for task in tasks])
+        return self._bulk_response("updated", self._serialize_bulk(tasks), errors, status.HTTP_200_OK)
+
+    @bulk.mapping.delete
+    def bulk_destroy(self, request):
+        payload, error = self._bulk_payload(request, "ids")
+        if error:
+            return error
+        deleted, errors = bulk_delete_tasks(payload, request.user, atomic=self._bulk_atomic(request))
+        task_events.tasks_changed(request.user.pk, task_events.DELETED, deleted)
+        return self._bulk_response("deleted", [str(task_id) for task_id in deleted], errors, status.HTTP_200_OK)
+
+    # -------- EXPORT --------
+    @swagger_auto_schema(manual_parameters=SWAGGER_TASK_EXPORT_PARAMS)
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        """Stream all of the user's tasks matching the list filters, unpaginated."""
+        export_format = request.query_params.get("export_format", task_export.NDJSON)
+        if export_format not in task_export.FORMATS:
+            return Response({"export_format": [f"Must be one of: {', '.join(task_export.FORMATS)}."]}, status=status.HTTP_400_BAD_REQUEST)
+        content = task_export.stream_tasks(self.filter_queryset(self.get_queryset()), export_format)
+        if isinstance(request._request, ASGIRequest):
+            content = task_export.astream(content)
+        response = StreamingHttpResponse(content, content_type=task_export.FORMATS[export_format])
+        response["Content-Disposition"] = f'attachment; filename="tasks.{export_format}"'
+        return response
+
+    # -------- DELTA SYNC --------
+    @swagger_auto_schema(manual_parameters=SWAGGER_TASK_CHANGES_PARAMS)
+    @action(detail=False, methods=["get"], url_path="changes")
+    def changes(self, request):
+        """Tasks created or updated, and ids of tasks deleted, since `since` (see tasks/sync.py)."""
+        config = task_sync.get_config()
+        since = request.query_params.get("since")
+        try:
+            position = task_sync.decode_cursor(since) if since else None
+        except ValueError as exc:
+            return Response({"since": [str(exc)]}, status=status.HTTP_400_BAD_REQUEST)
+        if position is not None and task_sync.is_expired(position):
+            return Response(
+                {"detail": "This cursor has expired; sync again without since."}, status=status.HTTP_410_GONE,
+            )
+        try:
+            page_size = int(request.query_params.get("page_size", config["PAGE_SIZE"]))
+        except ValueError:
+            page_size = 0
+        if page_size < 1:
+            return Response({"page_size": ["A positive integer is required."]}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(task_sync.changes(
+            self.get_queryset(), request.user, position, min(page_size, config["MAX_PAGE_SIZE"]), self.selected_fields,
+        ))
+
+    # -------- STATS --------
+    @action(detail=False, methods=["get"], url_path="stats")
+    def stats(self, request):
+        """Task counts by status, priority and category, plus overdue tasks, for the current user."""
+        counts = task_stats.user_stats(request.user)
+        by_category = counts[TaskCounter.CATEGORY]
+        categories = category_cache.get_many([key for key in by_category if key])
+        names = {str(pk): category.name for pk, category in categories.items()}
+        return Response({
+            "total": sum(counts[TaskCounter.STATUS].values()),
+            "by_status": counts[TaskCounter.STATUS],
+            "by_priority": counts[TaskCounter.PRIORITY],
+            "by_category": [
+                {"category_id": key or None, "category_name": names.get(key), "count": count}
+                for key, count in sorted(by_category.items(), key=lambda item: -item[1])
+            ],
+            "overdue": task_stats.overdue_count(request.user),
+        })
 
     # -------- REMINDERS (no extra structured filters here) --------
     @action(detail=False, methods=["get"], url_path="reminders")
     def reminders(self, request):
-        now = timezone.now()
-        tasks = Task.objects.filter(user=request.user, remind_at__isnull=False, remind_at__gte=now)
-        reminders = [{"task_id": str(task.id), "title": task.title, "remind_at": task.remind_at} for task in tasks]
+        reminders = [reminder_data(task) for task in self.get_reminders_queryset()]
         return Response(reminders)
+
+    def get_reminders_queryset(self):
+        now = timezone.now()
+        return (
+            Task.objects.filter(user=self.request.user, remind_at__isnull=False, remind_at__gte=now)
+            .values("id", "title", "remind_at")
+        )
+
+
+class TaskImportViewSet(mixins.CreateModelMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Bulk imports of tasks from CSV or NDJSON files (see tasks/importer.py):
+    - POST /tasks/imports/ (multipart: file, optional import_format and batch_size) stores
+      the file and queues the import; 202 with the import and its progress fields
+    - GET /tasks/imports/ and /tasks/imports/<id>/ report progress
+    - GET /tasks/imports/<id>/errors/: the rejected rows with their validation errors
+    - POST /tasks/imports/<id>/resume/ restarts a failed or stalled import from its checkpoint
+    """
+    serializer_class = TaskImportSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = TaskCursorPagination
+
+    def get_queryset(self):
+        if getattr(self, "swagger_fake_view", False):
+            return TaskImport.objects.none()
+        return TaskImport.objects.filter(user=self.request.user)
+
+    @swagger_auto_schema(request_body=TaskImportUploadSerializer, responses={202: TaskImportSerializer})
+    def create(self, request, *args, **kwargs):
+        serializer = TaskImportUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        import_format = data.get("import_format") or importer.detect_format(data["file"].name)
+        if import_format is None:
+            return Response({"import_format": ["Could not tell the format from the file name; pass csv or ndjson."]}, status=status.HTTP_400_BAD_REQUEST)
+        task_import = importer.save_upload(data["file"], request.user, import_format, data.get("batch_size"))
+        transaction.on_commit(lambda: run_task_import.delay(str(task_import.pk)))
+        return Response(TaskImportSerializer(task_import).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=["get"], url_path="errors")
+    def errors(self, request, pk=None):
+        paginator = TaskImportErrorPagination()
+        page = paginator.paginate_queryset(self.get_object().row_errors.all(), request, view=self)
+        return paginator.get_paginated_response(TaskImportErrorSerializer(page, many=True).data)
+
+    @swagger_auto_schema(request_body=no_body, responses={202: TaskImportSerializer})
+    @action(detail=True, methods=["post"], url_path="resume")
+    def resume(self, request, pk=None):
+        task_import = self.get_object()
+        # Only the request that moves the import out of the state it was read in requeues it.
+        claimed = importer.is_resumable(task_import) and TaskImport.objects.filter(
+            pk=task_import.pk, status=task_import.status, updated_at=task_import.updated_at,
+        ).update(status=TaskImport.PENDING, updated_at=timezone.now())
+        if not claimed:
+            return Response({"detail": f"An import that is {task_import.status} can't be resumed."}, status=status.HTTP_409_CONFLICT)
+        task_import.refresh_from_db()
+        transaction.on_commit(lambda: run_task_import.delay(str(task_import.pk)))
+        return Response(TaskImportSerializer(task_import).data, status=status.HTTP_202_ACCEPTED)
@@ -0,0 +1,198 @@
+"""
+JWT authentication without a User query per request.
+
+CachedJWTAuthentication behaves like simplejwt's JWTAuthentication, but how the token's
+user is resolved depends on settings.JWT_USER_CACHE["MODE"]:
+- "cached" (default): Users are served from a size-bounded cache keyed by user id, with
+  entries living TTL seconds. User saves and deletes evict the entry, so a deactivated
+  user or a changed password is seen on the next request. Queryset.update() skips those
+  signals; TTL bounds how long such changes go unnoticed.
+- "stateless": no lookup at all. The user is a TokenUser rebuilt from the token's id,
+  email and username claims (see CustomTokenObtainPairSerializer.get_token). It stays
+  valid until the token expires even if the account is deactivated.
+- "off": one query per request, as with JWTAuthentication.
+
+The cache is an in-process LRU, or the Django cache named by CACHE_ALIAS so that every
+process sees invalidations immediately (task_manager/lookup_cache.py stores).
+
+In every mode, revoked tokens are rejected (users/revocation.py).
+"""
+import copy
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from task_manager.lookup_cache import DjangoCacheStore, LocalStore
+from . import revocation
+
+DEFAULTS = {
+    "MODE": "cached",       # "cached", "stateless" or "off"
+    "TTL": 30,              # seconds a cached User is trusted
+    "MAX_ENTRIES": 10000,   # in-process cache size
+    "CACHE_ALIAS": None,    # shared Django cache instead of the in-process one
+}
+
+CACHED = "cached"
+STATELESS = "stateless"
+TOKEN_USER_CLAIMS = ("email", "username")
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "JWT_USER_CACHE", {})}
+
+
+class UserCache:
+    """Users by USER_ID_FIELD value, evicted from the User model's post_save/post_delete."""
+
+    def __init__(self):
+        self._store = None
+
+    @property
+    def store(self):
+        if self._store is None:
+            config = get_config()
+            if config["CACHE_ALIAS"]:
+                self._store = DjangoCacheStore(config["CACHE_ALIAS"], "jwt-user", config["TTL"])
+            else:
+                self._store = LocalStore(config["MAX_ENTRIES"], config["TTL"])
+        return self._store
+
+    def get(self, user_id):
+        user = self.store.get_many([str(user_id)]).get(str(user_id))
+        # Every request gets its own copy: views may set attributes on request.user.
+        return copy.copy(user) if user is not None else None
+
+    def set(self, user_id, user):
+        self.store.set_many({str(user_id): copy.copy(user)})
+
+    def invalidate(self, instance, **kwargs):
+        self.store.delete_many([str(getattr(instance, api_settings.USER_ID_FIELD))])
+
+    def connect(self, model):
+        from django.db.models.signals import post_delete, post_save
+
+        post_save.connect(self.invalidate, sender=model, weak=False)
+        post_delete.connect(self.invalidate, sender=model, weak=False)
+
+    def clear(self):
+        self.store.clear()
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the user per settings.JWT_USER_CACHE (see module docstring).
+
+    aauthenticate() is the coroutine entry point the async views (tasks/async_views.py) use.
+    Header parsing and signature checks are pure computation and are shared. A user lookup
+    that misses the cache goes through the async ORM, and the revocation check runs in a
+    thread only when it needs the database. Failures raise the same exceptions, with the
+    same messages and codes, as authenticate().
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if revocation.is_revoked(validated_token.payload):
+            raise InvalidToken(_("Token has been revoked"), code="token_revoked")
+        return validated_token
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+    def check_user(self, user, validated_token):
+        # The checks JWTAuthentication.get_user applies to the loaded user.
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
+
+    def get_token_user(self, user_id, validated_token):
+        """A TokenUser from the token's claims, or None for tokens issued without them."""
+        from .models import TokenUser
+
+        if any(claim not in validated_token for claim in TOKEN_USER_CLAIMS):
+            return None
+        user = TokenUser(**{api_settings.USER_ID_FIELD: user_id}, is_active=True)
+        for claim in TOKEN_USER_CLAIMS:
+            setattr(user, claim, validated_token[claim])
+        user._state.adding = False
+        user._state.db = router.db_for_read(TokenUser)
+        return user
+
+    def get_user(self, validated_token):
+        mode = get_config()["MODE"]
+        if mode not in (CACHED, STATELESS):
+            return super().get_user(validated_token)
+
+        user_id = self.get_user_id(validated_token)
+        if mode == STATELESS:
+            user = self.get_token_user(user_id, validated_token)
+            if user is not None:
+                return user
+
+        user = user_cache.get(user_id)
+        if user is None:
+            try:
+                user = self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist as e:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+            user_cache.set(user_id, user)
+        return self.check_user(user, validated_token)
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = await self.aget_validated_token(raw_token)
+
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_validated_token(self, raw_token):
+        # Mirrors get_validated_token; the revocation check only leaves the event loop when
+        # its filter needs a sync or reports a possible hit.
+        validated_token = JWTAuthentication.get_validated_token(self, raw_token)
+        revoked = revocation.is_revoked_in_memory(validated_token.payload)
+        if revoked is None:
+            revoked = await sync_to_async(revocation.is_revoked)(validated_token.payload)
+        if revoked:
+            raise InvalidToken(_("Token has been revoked"), code="token_revoked")
+        return validated_token
+
+    async def aget_user(self, validated_token):
+        # Mirrors get_user.
+        mode = get_config()["MODE"]
+        user_id = self.get_user_id(validated_token)
+        if mode == STATELESS:
+            user = self.get_token_user(user_id, validated_token)
+            if user is not None:
+                return user
+
+        user = user_cache.get(user_id) if mode in (CACHED, STATELESS) else None
+        if user is None:
+            try:
+                user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist as e:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+            if mode in (CACHED, STATELESS):
+                user_cache.set(user_id, user)
+        return self.check_user(user, validated_token)
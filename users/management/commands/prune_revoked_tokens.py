@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from users import revocation
+
+
+class Command(BaseCommand):
+    help = "Delete token revocations whose tokens have expired (also run hourly by Celery)."
+
+    def handle(self, *args, **options):
+        tokens, users = revocation.prune()
+        self.stdout.write(self.style.SUCCESS(f"Pruned {tokens} revoked tokens and {users} user revocations."))
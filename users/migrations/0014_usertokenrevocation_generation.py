@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0013_token_revocation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usertokenrevocation',
+            name='generation',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
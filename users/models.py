@@ -1,5 +1,6 @@
 # users/models.py
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.contrib.auth.hashers import make_password, check_password
 
@@ -36,3 +37,44 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     def __str__(self):
         return self.email
+
+
+class TokenUser(User):
+    """
+    A user rebuilt from access token claims (id, email, username) without a database read;
+    see users.authentication. Only the claimed fields are set, so it can't be saved.
+    """
+
+    class Meta:
+        proxy = True
+
+    def save(self, *args, **kwargs):
+        raise TypeError("TokenUser is built from token claims and can't be saved; load the User instead.")
+
+    def delete(self, *args, **kwargs):
+        raise TypeError("TokenUser is built from token claims and can't be deleted; load the User instead.")
+
+
+class RevokedToken(models.Model):
+    """A revoked JWT, by its jti claim; kept until the token would have expired anyway (users/revocation.py)."""
+    jti = models.CharField(max_length=255, unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name="revoked_tokens", db_index=False)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"{self.jti} (revoked {self.revoked_at})"
+
+
+class UserTokenRevocation(models.Model):
+    """
+    Log out everywhere: every token of the user carrying a generation claim below
+    `generation` is revoked (tokens issued without the claim: issued at or before `revoked_before`).
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="token_revocation")
+    generation = models.PositiveIntegerField(default=0)
+    revoked_before = models.DateTimeField(db_index=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.user} tokens before {self.revoked_before}"
@@ -0,0 +1,245 @@
+"""
+JWT revocation, by token (jti) and by user ("log out everywhere").
+
+Revocations are stored in RevokedToken and UserTokenRevocation. Each process also keeps
+a Bloom filter of the revoked jtis and user ids, so checking a token is a few hash
+lookups in memory; the database is only asked when the filter reports a (possible) hit.
+
+"Log out everywhere" bumps the user's revocation generation. Tokens carry the generation
+they were issued under (GENERATION_CLAIM, set at login) and are revoked once it is below
+the stored one. A timestamp can't do this: `iat` has whole-second precision, so tokens
+from a login in the same second as the logout would look older than it. Tokens issued
+without the claim fall back to comparing `iat` with `revoked_before`.
+
+- Propagation: every process pulls revocations newer than its last sync (minus
+  SYNC_OVERLAP, for transactions that committed late) at most SYNC_INTERVAL seconds
+  apart, on the next check. A revocation is seen everywhere within about SYNC_INTERVAL
+  seconds; the process that revoked sees it at once.
+- Pruning: entries are only useful until the tokens they cover expire. `prune()` deletes
+  expired rows (run hourly by Celery, or `manage.py prune_revoked_tokens`), and each
+  process rebuilds its filter from the live rows every REBUILD_INTERVAL seconds, which
+  also resizes it if it outgrew FILTER_CAPACITY.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .models import RevokedToken, UserTokenRevocation
+
+DEFAULTS = {
+    "FILTER_CAPACITY": 100000,   # revocations the filter is sized for before a rebuild grows it
+    "FILTER_ERROR_RATE": 0.001,  # false positives (checks that go to the database needlessly)
+    "SYNC_INTERVAL": 5,          # seconds between pulls of other processes' revocations
+    "SYNC_OVERLAP": 30,          # seconds each pull reaches back before the previous one
+    "REBUILD_INTERVAL": 3600,    # seconds between full rebuilds, which drop expired entries
+}
+
+
+GENERATION_CLAIM = "revocation_generation"
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "TOKEN_REVOCATION", {})}
+
+
+class BloomFilter:
+    """Set membership with false positives but no false negatives, in a fixed bit array."""
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.capacity = capacity
+        self.count = 0
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+def token_key(jti):
+    return f"jti:{jti}"
+
+
+def user_key(user_id):
+    return f"user:{user_id}"
+
+
+class RevocationFilter:
+    def __init__(self):
+        self._filter = None
+        self._synced_at = None     # database time the last pull started from
+        self._next_sync = 0.0      # time.monotonic() deadlines
+        self._next_rebuild = 0.0
+        self._lock = threading.Lock()
+
+    def sync_due(self):
+        return time.monotonic() >= self._next_sync
+
+    def sync(self):
+        """Rebuild or pull new revocations if their interval has passed."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._next_sync:
+                return
+            config = get_config()
+            if self._filter is None or now >= self._next_rebuild:
+                self._rebuild(config)
+                self._next_rebuild = now + config["REBUILD_INTERVAL"]
+            else:
+                self._pull(config)
+            self._next_sync = now + config["SYNC_INTERVAL"]
+
+    def _keys(self, since=None):
+        now = timezone.now()
+        tokens = RevokedToken.objects.filter(expires_at__gt=now)
+        users = UserTokenRevocation.objects.filter(expires_at__gt=now)
+        if since is not None:
+            tokens = tokens.filter(revoked_at__gte=since)
+            users = users.filter(revoked_before__gte=since)
+        for jti in tokens.values_list("jti", flat=True).iterator():
+            yield token_key(jti)
+        for user_id in users.values_list("user_id", flat=True).iterator():
+            yield user_key(user_id)
+
+    def _rebuild(self, config):
+        started = timezone.now()
+        keys = list(self._keys())
+        bloom = BloomFilter(max(config["FILTER_CAPACITY"], 2 * len(keys)), config["FILTER_ERROR_RATE"])
+        for key in keys:
+            bloom.add(key)
+        self._filter, self._synced_at = bloom, started
+
+    def _pull(self, config):
+        started = timezone.now()
+        for key in self._keys(since=self._synced_at - timedelta(seconds=config["SYNC_OVERLAP"])):
+            self._filter.add(key)
+        self._synced_at = started
+        if self._filter.count > self._filter.capacity:
+            # Past capacity the false positive rate climbs: rebuild bigger at the next sync.
+            self._next_rebuild = 0.0
+
+    def add(self, key):
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(key)
+
+    def might_contain(self, key):
+        bloom = self._filter
+        return bloom is None or key in bloom
+
+    def reset(self):
+        with self._lock:
+            self._filter = None
+            self._next_sync = self._next_rebuild = 0.0
+
+
+revocation_filter = RevocationFilter()
+
+
+def _max_lifetime():
+    return max(api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME)
+
+
+def revoke_token(payload):
+    """Revoke one token, given its decoded payload."""
+    jti = payload[api_settings.JTI_CLAIM]
+    RevokedToken.objects.get_or_create(
+        jti=jti,
+        defaults={
+            "user_id": payload.get(api_settings.USER_ID_CLAIM),
+            "expires_at": datetime_from_epoch(payload["exp"]),
+        },
+    )
+    transaction.on_commit(lambda: revocation_filter.add(token_key(jti)))
+
+
+def user_generation(user):
+    """The revocation generation to put in tokens issued to `user` now."""
+    generation = UserTokenRevocation.objects.filter(user_id=user.pk).values_list("generation", flat=True).first()
+    return generation or 0
+
+
+def revoke_user(user):
+    """Revoke every token issued to `user` so far."""
+    now = timezone.now()
+    revocation, created = UserTokenRevocation.objects.get_or_create(
+        user_id=user.pk, defaults={"generation": 1, "revoked_before": now, "expires_at": now + _max_lifetime()},
+    )
+    if not created:
+        UserTokenRevocation.objects.filter(pk=revocation.pk).update(
+            generation=F("generation") + 1, revoked_before=now, expires_at=now + _max_lifetime(),
+        )
+    transaction.on_commit(lambda: revocation_filter.add(user_key(user.pk)))
+
+
+def _check_database(payload, token_hit, user_hit):
+    if token_hit and RevokedToken.objects.filter(jti=payload[api_settings.JTI_CLAIM]).exists():
+        return True
+    if user_hit:
+        revocation = (
+            UserTokenRevocation.objects.filter(user_id=payload[api_settings.USER_ID_CLAIM])
+            .values_list("generation", "revoked_before")
+            .first()
+        )
+        if revocation is not None:
+            generation, revoked_before = revocation
+            if GENERATION_CLAIM in payload:
+                return payload[GENERATION_CLAIM] < generation
+            issued_at = payload.get("iat")
+            return issued_at is None or datetime_from_epoch(issued_at) <= revoked_before
+    return False
+
+
+def _filter_hits(payload):
+    jti = payload.get(api_settings.JTI_CLAIM)
+    user_id = payload.get(api_settings.USER_ID_CLAIM)
+    token_hit = jti is not None and revocation_filter.might_contain(token_key(jti))
+    user_hit = user_id is not None and revocation_filter.might_contain(user_key(user_id))
+    return token_hit, user_hit
+
+
+def is_revoked(payload):
+    revocation_filter.sync()
+    token_hit, user_hit = _filter_hits(payload)
+    if not (token_hit or user_hit):
+        return False
+    return _check_database(payload, token_hit, user_hit)
+
+
+def is_revoked_in_memory(payload):
+    """
+    False if the token is certainly not revoked without touching the database, None if
+    is_revoked() has to decide (a sync is due or the filter reports a possible hit).
+    """
+    if revocation_filter.sync_due():
+        return None
+    token_hit, user_hit = _filter_hits(payload)
+    return None if token_hit or user_hit else False
+
+
+def prune(now=None):
+    """Delete revocations whose tokens have expired. Returns (tokens, users) deleted."""
+    now = now or timezone.now()
+    tokens, _ = RevokedToken.objects.filter(expires_at__lte=now).delete()
+    users, _ = UserTokenRevocation.objects.filter(expires_at__lte=now).delete()
+    return tokens, users
@@ -1,7 +1,13 @@
 # users/serializers.py
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .authentication import user_cache
+from .revocation import GENERATION_CLAIM, is_revoked, revoke_token, user_generation
 
 User = get_user_model()
 
@@ -34,9 +40,54 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         token = super().get_token(user)
         token["email"] = user.email
         token["username"] = user.username
+        token[GENERATION_CLAIM] = user_generation(user)
         return token
 
     def validate(self, attrs):
         data = super().validate(attrs)
         data.update({"user": UserSerializer(self.user).data})
         return data
+
+
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    TokenRefreshSerializer that rejects revoked refresh tokens and, with
+    ROTATE_REFRESH_TOKENS and BLACKLIST_AFTER_ROTATION, revokes the token it replaces
+    (users/revocation.py stands in for simplejwt's token_blacklist app).
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        if is_revoked(refresh.payload):
+            raise InvalidToken("Token has been revoked", code="token_revoked")
+
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        if user_id:
+            user = user_cache.get(user_id) or User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+            if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+                raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+
+        data = {"access": str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                revoke_token(refresh.payload)
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data["refresh"] = str(refresh)
+
+        return data
+
+
+class LogoutSerializer(serializers.Serializer):
+    refresh = serializers.CharField(required=False, help_text="Also revoke this refresh token")
+
+    def validate_refresh(self, value):
+        try:
+            refresh = RefreshToken(value)
+        except TokenError:
+            raise serializers.ValidationError("Token is invalid or expired.")
+        if str(refresh.payload.get(api_settings.USER_ID_CLAIM)) != str(getattr(self.context["request"].user, api_settings.USER_ID_FIELD)):
+            raise serializers.ValidationError("Token belongs to another user.")
+        return refresh
@@ -0,0 +1,15 @@
+import logging
+
+from celery import shared_task
+
+from . import revocation
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def prune_revoked_tokens():
+    """Delete revocations whose tokens have expired."""
+    tokens, users = revocation.prune()
+    logger.info("[Celery] Pruned %d revoked tokens and %d user revocations", tokens, users)
+    return {"tokens": tokens, "users": users}
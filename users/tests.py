@@ -1,3 +1,129 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from .authentication import CachedJWTAuthentication, user_cache
+from .models import TokenUser, User, UserTokenRevocation
+from .revocation import revocation_filter
+
+
+class TokenRevocationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="revoke@example.com", password="s3cret-pass")
+        cls.other = User.objects.create_user(email="keep@example.com", password="s3cret-pass")
+
+    def setUp(self):
+        # The filter outlives each test's rolled-back revocations.
+        revocation_filter.reset()
+        self.addCleanup(revocation_filter.reset)
+
+    def login(self, user):
+        response = self.client.post("/api/auth/login/", {"email": user.email, "password": "s3cret-pass"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        return response.data["access"], response.data["refresh"]
+
+    def profile(self, access):
+        return self.client.get("/api/auth/profile/", HTTP_AUTHORIZATION=f"Bearer {access}").status_code
+
+    def refresh(self, refresh):
+        return self.client.post("/api/auth/token/refresh/", {"refresh": refresh}, format="json").status_code
+
+    def test_logout_revokes_the_access_and_refresh_token(self):
+        access, refresh = self.login(self.user)
+        other_access, other_refresh = self.login(self.user)
+        self.assertEqual(self.profile(access), 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/api/auth/logout/", {"refresh": refresh}, format="json", HTTP_AUTHORIZATION=f"Bearer {access}")
+        self.assertEqual(response.status_code, 204)
+
+        self.assertEqual(self.profile(access), 401)
+        self.assertEqual(self.refresh(refresh), 401)
+        # Other sessions of the same user are unaffected.
+        self.assertEqual(self.profile(other_access), 200)
+
+    def test_logout_all_revokes_every_token_of_the_user(self):
+        first, first_refresh = self.login(self.user)
+        second, _ = self.login(self.user)
+        other, _ = self.login(self.other)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/api/auth/logout-all/", HTTP_AUTHORIZATION=f"Bearer {first}")
+        self.assertEqual(response.status_code, 204)
+
+        self.assertEqual((self.profile(first), self.profile(second)), (401, 401))
+        self.assertEqual(self.refresh(first_refresh), 401)
+        self.assertEqual(self.profile(other), 200)
+
+    def test_login_right_after_logout_all_is_not_revoked(self):
+        access, _ = self.login(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/api/auth/logout-all/", HTTP_AUTHORIZATION=f"Bearer {access}")
+        # Issued within the same second, so `iat` alone can't tell them from the revoked ones.
+        revoked_before = UserTokenRevocation.objects.get(user=self.user).revoked_before
+        with mock.patch("rest_framework_simplejwt.tokens.aware_utcnow", return_value=revoked_before):
+            fresh, fresh_refresh = self.login(self.user)
+        self.assertEqual(self.profile(fresh), 200)
+        self.assertEqual(self.refresh(fresh_refresh), 200)
+        self.assertEqual(self.profile(access), 401)
+
+    def test_refresh_token_of_another_user_is_rejected(self):
+        access, _ = self.login(self.user)
+        _, other_refresh = self.login(self.other)
+        response = self.client.post("/api/auth/logout/", {"refresh": other_refresh}, format="json", HTTP_AUTHORIZATION=f"Bearer {access}")
+        self.assertEqual(response.status_code, 400)
+
+
+class CachedJWTAuthenticationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="cached@example.com", password="s3cret-pass")
+
+    def setUp(self):
+        # Neither the cache nor the filter is rolled back with the test's transaction.
+        user_cache.clear()
+        revocation_filter.reset()
+        self.addCleanup(user_cache.clear)
+        self.addCleanup(revocation_filter.reset)
+        response = self.client.post("/api/auth/login/", {"email": self.user.email, "password": "s3cret-pass"}, format="json")
+        self.access = response.data["access"]
+
+    def authenticate(self):
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {self.access}")
+        user, _ = CachedJWTAuthentication().authenticate(request)
+        return user
+
+    def test_every_mode_authenticates(self):
+        for mode, user_class in (("cached", User), ("stateless", TokenUser), ("off", User)):
+            with self.subTest(mode=mode), override_settings(JWT_USER_CACHE={"MODE": mode}):
+                user_cache.clear()
+                self.authenticate()
+                user = self.authenticate()
+                self.assertIs(type(user), user_class)
+                self.assertEqual(str(user.pk), str(self.user.pk))
+                response = self.client.get("/api/auth/profile/", HTTP_AUTHORIZATION=f"Bearer {self.access}")
+                self.assertEqual(response.status_code, 200)
+
+    def test_only_the_off_mode_queries_the_user_on_every_request(self):
+        for mode, queries in (("cached", 0), ("stateless", 0), ("off", 1)):
+            with self.subTest(mode=mode), override_settings(JWT_USER_CACHE={"MODE": mode}):
+                self.authenticate()
+                with self.assertNumQueries(queries):
+                    self.authenticate()
+
+    def test_saving_a_user_evicts_the_cached_copy(self):
+        with override_settings(JWT_USER_CACHE={"MODE": "cached"}):
+            self.authenticate()
+            self.user.first_name = "Renamed"
+            self.user.save()
+            self.assertEqual(self.authenticate().first_name, "Renamed")
+
+            self.user.is_active = False
+            self.user.save()
+            with self.assertRaises(AuthenticationFailed):
+                self.authenticate()
+            response = self.client.get("/api/auth/profile/", HTTP_AUTHORIZATION=f"Bearer {self.access}")
+            self.assertEqual(response.status_code, 401)
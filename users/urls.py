@@ -1,9 +1,12 @@
 # users/urls.py
 from django.urls import path
-from .views import RegisterView, CustomLoginView, profile_view
+from .views import RegisterView, CustomLoginView, CustomTokenRefreshView, logout_view, logout_all_view, profile_view
 
 urlpatterns = [
     path("register/", RegisterView.as_view(), name="register"),
     path("login/", CustomLoginView.as_view(), name="login"),
+    path("token/refresh/", CustomTokenRefreshView.as_view(), name="token-refresh"),
+    path("logout/", logout_view, name="logout"),
+    path("logout-all/", logout_all_view, name="logout-all"),
     path("profile/", profile_view, name="profile"),
 ]
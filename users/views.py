@@ -2,11 +2,15 @@
 from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework.decorators import api_view, permission_classes
-from drf_yasg.utils import swagger_auto_schema
+from drf_yasg.utils import no_body, swagger_auto_schema
 
-from .serializers import UserRegistrationSerializer, CustomTokenObtainPairSerializer, UserSerializer
+from .revocation import revoke_token, revoke_user
+from .serializers import (
+    UserRegistrationSerializer, CustomTokenObtainPairSerializer, UserSerializer,
+    RevocableTokenRefreshSerializer, LogoutSerializer,
+)
 
 
 class RegisterView(TokenObtainPairView):
@@ -36,6 +40,37 @@ class CustomLoginView(TokenObtainPairView):
         return super().post(request, *args, **kwargs)
 
 
+class CustomTokenRefreshView(TokenRefreshView):
+    permission_classes = [AllowAny]
+    serializer_class = RevocableTokenRefreshSerializer
+
+    @swagger_auto_schema(security=[])
+    def post(self, request, *args, **kwargs):
+        return super().post(request, *args, **kwargs)
+
+
+@swagger_auto_schema(method="post", request_body=LogoutSerializer, responses={204: "Tokens revoked"})
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def logout_view(request):
+    """Revoke the access token of this request, and the given refresh token."""
+    serializer = LogoutSerializer(data=request.data, context={"request": request})
+    serializer.is_valid(raise_exception=True)
+    revoke_token(request.auth.payload)
+    if serializer.validated_data.get("refresh"):
+        revoke_token(serializer.validated_data["refresh"].payload)
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@swagger_auto_schema(method="post", request_body=no_body, responses={204: "Tokens revoked"})
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def logout_all_view(request):
+    """Revoke every access and refresh token issued to the current user so far."""
+    revoke_user(request.user)
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def profile_view(request):